@@ -13,9 +13,12 @@ import connexion
 from connexion import FlaskApp
 from flask import Flask
 
+from ..cache import setup_cache
 from ..config import Config, basedir
+from ..database import setup_indices, setup_outbox, setup_search
 from ..database.utils import setup_db
 from ..log.handlers import FlaskHandler
+from .commands import create_commands
 from .routes import create_routes
 
 
@@ -42,7 +45,12 @@ def create_app(config_class=Config) -> Flask:
     app.config.from_object(config_class)
 
     setup_db(app)
+    setup_search(app)
+    setup_indices(app)
+    setup_outbox(app)
+    setup_cache(app)
     create_routes(app)
+    create_commands(app)
 
     app.logger.name = "api"
     app.logger.handlers.clear()
@@ -0,0 +1,79 @@
+# SPDX-License-Identifier: MIT
+# --------------------------------------------------------------
+# |																|
+# |             Copyright 2023 - 2023, Amulya Paritosh			|
+# |																|
+# |  This file is part of Component Library Plugin for FreeCAD.	|
+# |																|
+# --------------------------------------------------------------
+
+import click
+from flask import Flask
+
+from ..log import logger
+
+
+def create_commands(app: Flask):
+    @app.cli.command("create-indices")
+    def create_indices_command():
+        """Creates the missing search indices with their mappings and settings."""
+
+        from ..database import indices
+
+        indices.ensure_all()
+        click.echo(f"indices ready: {', '.join(indices.names())}")
+
+    @app.cli.command("create-db-indexes")
+    def create_db_indexes_command():
+        """Creates the database indexes declared on the models that the database lacks."""
+
+        from ..database import create_missing_indexes, db
+
+        created = create_missing_indexes(db.engine)
+        logger.info(f"database indexes created: {created}")
+        click.echo(f"{len(created)} database indexes created: {', '.join(created) or '-'}")
+
+    @app.cli.command("index-components")
+    def index_components_command():
+        """Indexes every component into the components search index."""
+
+        from ..models.components import index_all_components
+
+        count = index_all_components()
+        logger.info(f"{count} components indexed")
+        click.echo(f"{count} components indexed")
+
+    @app.cli.command("drain-outbox")
+    def drain_outbox_command():
+        """Applies the search outbox to Elasticsearch until it is empty or only retries remain."""
+
+        from ..database import OutboxIndexer
+
+        indexer = OutboxIndexer(app)
+        while indexer.drain():
+            pass
+        click.echo(f"{indexer.processed} applied, {indexer.failed} failed")
+
+    @app.cli.command("reindex")
+    @click.option("--index", "names", multiple=True, help="An index to rebuild, all by default.")
+    @click.option("--workers", default=4, show_default=True, help="Parallel bulk requests.")
+    def reindex_command(names, workers):
+        """Rebuilds search indices from the database, swapping them in without downtime."""
+
+        from ..database import indices, reindex
+
+        for name in names or indices.names():
+            count = reindex(name, workers=workers)
+            logger.info(f"{count} {name} documents reindexed")
+            click.echo(f"{count} {name} documents reindexed")
+
+    @app.cli.command("rekey-indices")
+    def rekey_indices_command():
+        """Moves search documents indexed under generated ids to the id of their row."""
+
+        from ..database import ElasticSearchBase
+
+        for model in ElasticSearchBase.__subclasses__():
+            count = model.rekey()
+            logger.info(f"{count} {model.__tablename__} documents rekeyed")
+            click.echo(f"{count} {model.__tablename__} documents rekeyed")
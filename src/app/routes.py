@@ -7,6 +7,8 @@ from ..authentication.utils import (
     exchange_code_for_token,
     get_github_user,
 )
+from ..database import outbox as outbox_module
+from ..database import breaker, outbox_metrics, staged_search
 from ..models.users import User
 
 
@@ -25,6 +27,18 @@ def create_routes(app: Flask):
     def api():
         return "Component Management System API", 200
 
+    @app.route("/api/outbox", methods=["GET"])
+    def outbox():
+        return outbox_metrics(outbox_module.indexer), 200
+
+    @app.route("/api/search/stages", methods=["GET"])
+    def search_stages():
+        return staged_search.metrics(), 200
+
+    @app.route("/api/search/breaker", methods=["GET"])
+    def search_breaker():
+        return breaker.metrics(), 200
+
     # @app.route("/login/app/authorize", methods=["GET"])
     # def auth_with_access_token():  # -> tuple[Literal['No access token received'], Literal[400]] ...:
     #     access_token = request.headers.get("access_token")
@@ -0,0 +1,15 @@
+# SPDX-License-Identifier: MIT
+# --------------------------------------------------------------
+# |																|
+# |             Copyright 2023 - 2023, Amulya Paritosh			|
+# |																|
+# |  This file is part of Component Library Plugin for FreeCAD.	|
+# |																|
+# |               This file was created as a part of				|
+# |              Google Summer Of Code Program - 2023			|
+# |																|
+# --------------------------------------------------------------
+
+from .backends import CacheBackend, LocalCache, MemoryStore, SharedCache
+from .response import ResponseCache, response_cache
+from .utils import setup_cache
@@ -0,0 +1,183 @@
+# SPDX-License-Identifier: MIT
+# --------------------------------------------------------------
+# |																|
+# |             Copyright 2023 - 2023, Amulya Paritosh			|
+# |																|
+# |  This file is part of Component Library Plugin for FreeCAD.	|
+# |																|
+# |               This file was created as a part of				|
+# |              Google Summer Of Code Program - 2023			|
+# |																|
+# --------------------------------------------------------------
+
+import json
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Iterable, Optional
+
+
+class CacheBackend:
+    """
+    Interface of the key value stores the caches are kept in.
+
+    Methods:
+        get(key): Returns the value of a key, or None when missing or expired.
+        get_many(keys): Returns the values of several keys.
+        set(key, value, ttl): Stores a value, optionally expiring after `ttl` seconds.
+        incr(key): Atomically increments an integer counter and returns its new value.
+    """
+
+    def get(self, key: str) -> Any:
+        raise NotImplementedError
+
+    def get_many(self, keys: Iterable[str]) -> list:
+        return [self.get(key) for key in keys]
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        raise NotImplementedError
+
+    def incr(self, key: str) -> int:
+        raise NotImplementedError
+
+
+class LocalCache(CacheBackend):
+    """
+    In-process cache backend: a bounded LRU whose entries expire after their time to live.
+
+    Counters made by `incr` are kept apart from the LRU so that they are never evicted.
+
+    Args:
+        max_entries (int): The maximum number of cached values. Defaults to 1024.
+
+    Example:
+        ```python
+        cache = LocalCache(max_entries=128)
+        cache.set("key", {"a": 1}, ttl=30)
+        cache.get("key")
+        ```
+    """
+
+    def __init__(self, max_entries: int = 1024) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[Optional[float], Any]] = OrderedDict()
+        self._counters: dict[str, int] = {}
+        self._lock = Lock()
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            if key in self._counters:
+                return self._counters[key]
+
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = None if ttl is None else time.monotonic() + ttl
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+
+class SharedCache(CacheBackend):
+    """
+    Cache backend kept in a store shared by every API process, such as Redis.
+
+    Values are stored as json, so cached responses must be json serializable.
+
+    Args:
+        client: A client with redis' `get`, `mget`, `set(name, value, ex=...)` and `incr` methods.
+        prefix (str): The prefix of every key written to the store. Defaults to "cms:".
+
+    Example:
+        ```python
+        cache = SharedCache(redis.Redis.from_url("redis://localhost:6379/0"))
+        ```
+    """
+
+    def __init__(self, client, prefix: str = "cms:") -> None:
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key: str) -> Any:
+        return self._decode(self.client.get(self.prefix + key))
+
+    def get_many(self, keys: Iterable[str]) -> list:
+        raw_values = self.client.mget([self.prefix + key for key in keys])
+        return [self._decode(raw) for raw in raw_values]
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        self.client.set(
+            self.prefix + key,
+            json.dumps(value),
+            ex=None if ttl is None else max(1, int(ttl)),
+        )
+
+    def incr(self, key: str) -> int:
+        return int(self.client.incr(self.prefix + key))
+
+    @staticmethod
+    def _decode(raw) -> Any:
+        return None if raw is None else json.loads(raw)
+
+
+class MemoryStore:
+    """
+    A local stand-in for the redis client of `SharedCache`, for tests and single node setups.
+
+    It implements the subset of the redis client used by `SharedCache`, and like redis it
+    stores and returns bytes.
+    """
+
+    def __init__(self) -> None:
+        self._values: dict[str, tuple[Optional[float], bytes]] = {}
+        self._lock = Lock()
+
+    def get(self, name: str) -> Optional[bytes]:
+        with self._lock:
+            return self._get(name)
+
+    def mget(self, names: Iterable[str]) -> list[Optional[bytes]]:
+        with self._lock:
+            return [self._get(name) for name in names]
+
+    def set(self, name: str, value, ex: Optional[int] = None) -> bool:
+        if isinstance(value, str):
+            value = value.encode("utf-8")
+        expires_at = None if ex is None else time.monotonic() + ex
+        with self._lock:
+            self._values[name] = (expires_at, value)
+        return True
+
+    def incr(self, name: str) -> int:
+        with self._lock:
+            count = int(self._get(name) or 0) + 1
+            self._values[name] = (None, str(count).encode("utf-8"))
+            return count
+
+    def _get(self, name: str) -> Optional[bytes]:
+        entry = self._values.get(name)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._values[name]
+            return None
+        return value
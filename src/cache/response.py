@@ -0,0 +1,132 @@
+# SPDX-License-Identifier: MIT
+# --------------------------------------------------------------
+# |																|
+# |             Copyright 2023 - 2023, Amulya Paritosh			|
+# |																|
+# |  This file is part of Component Library Plugin for FreeCAD.	|
+# |																|
+# |               This file was created as a part of				|
+# |              Google Summer Of Code Program - 2023			|
+# |																|
+# --------------------------------------------------------------
+
+import hashlib
+import json
+from threading import Event, Lock
+from typing import Any, Callable, Optional
+
+from ..database.events import generations
+from .backends import CacheBackend
+
+
+class _Call:
+    def __init__(self) -> None:
+        self.done = Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class ResponseCache:
+    """
+    Caches computed responses by their normalized request parameters.
+
+    Every key embeds the generations of the tables the response is read from, so a commit
+    writing to any of them makes the previous entries unreachable; they then age out of the
+    backend through its LRU or TTL. Concurrent misses on the same key are coalesced: only the
+    first caller computes the response while the others wait for its result.
+
+    Cached responses are shared between requests and must be treated as read only.
+
+    Args:
+        backend (CacheBackend | None): The store of the responses, None disables caching.
+        ttl (float | None): The time to live of the responses in seconds. Defaults to 60.
+
+    Example:
+        ```python
+        response = response_cache.get_or_compute(
+            "component", {"page": 1}, ("metadatas",), lambda: read_components(page=1)
+        )
+        ```
+    """
+
+    def __init__(self, backend: Optional[CacheBackend] = None, ttl: Optional[float] = 60) -> None:
+        self.backend = backend
+        self.ttl = ttl
+        self._inflight: dict[str, _Call] = {}
+        self._lock = Lock()
+
+    def get_or_compute(
+        self,
+        namespace: str,
+        params: dict,
+        tables: tuple[str, ...],
+        compute: Callable[[], Any],
+        cacheable: Optional[Callable[[Any], bool]] = None,
+    ) -> Any:
+        """
+        Returns the cached response of `params`, computing and caching it on a miss.
+
+        Args:
+            namespace (str): The name of the cached endpoint.
+            params (dict): The normalized, json serializable request parameters.
+            tables (tuple[str, ...]): The tables the response is read from.
+            compute (Callable[[], Any]): Computes the response on a miss.
+            cacheable (Callable[[Any], bool], optional): Tells whether a computed response
+                may be cached. Defaults to None, all of them.
+
+        Returns:
+            Any: The cached or computed response.
+        """
+
+        if self.backend is None:
+            return compute()
+
+        key = self.make_key(namespace, params, tables)
+        cached = self.backend.get(key)
+        if cached is not None:
+            return cached
+
+        with self._lock:
+            call = self._inflight.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = self._inflight[key] = _Call()
+
+        if not is_leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value
+
+        try:
+            call.value = compute()
+            if cacheable is None or cacheable(call.value):
+                self.backend.set(key, call.value, self.ttl)
+            return call.value
+        except BaseException as err:
+            call.error = err
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            call.done.set()
+
+    @staticmethod
+    def make_key(namespace: str, params: dict, tables: tuple[str, ...]) -> str:
+        """
+        Builds the cache key of a request from its parameters and the table generations.
+
+        Args:
+            namespace (str): The name of the cached endpoint.
+            params (dict): The normalized, json serializable request parameters.
+            tables (tuple[str, ...]): The tables the response is read from.
+
+        Returns:
+            str: The cache key.
+        """
+
+        raw = json.dumps([params, generations.current(*tables)], sort_keys=True, default=str)
+        return f"{namespace}:{hashlib.sha1(raw.encode('utf-8')).hexdigest()}"
+
+
+response_cache = ResponseCache()
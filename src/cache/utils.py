@@ -0,0 +1,74 @@
+# SPDX-License-Identifier: MIT
+# --------------------------------------------------------------
+# |																|
+# |             Copyright 2023 - 2023, Amulya Paritosh			|
+# |																|
+# |  This file is part of Component Library Plugin for FreeCAD.	|
+# |																|
+# |               This file was created as a part of				|
+# |              Google Summer Of Code Program - 2023			|
+# |																|
+# --------------------------------------------------------------
+
+from typing import Optional
+
+from flask import Flask
+
+from ..database.events import generations
+from .backends import CacheBackend, LocalCache, MemoryStore, SharedCache
+from .response import response_cache
+
+
+def make_backend(name: str, url: str = "", max_entries: int = 1024) -> Optional[CacheBackend]:
+    """
+    Creates the cache backend selected by name.
+
+    Args:
+        name (str): One of "local", "redis", "memory" or "none".
+        url (str): The url of the redis server, only used by "redis".
+        max_entries (int): The size of the LRU, only used by "local".
+
+    Returns:
+        CacheBackend | None: The backend, or None when caching is disabled.
+
+    Raises:
+        ValueError: Raised when the backend name is unknown.
+    """
+
+    if name == "none":
+        return None
+    if name == "local":
+        return LocalCache(max_entries)
+    if name == "memory":
+        return SharedCache(MemoryStore())
+    if name == "redis":
+        import redis
+
+        return SharedCache(redis.Redis.from_url(url))
+
+    raise ValueError(f"Unknown cache backend {name}")
+
+
+def setup_cache(app: Flask) -> None:
+    """
+    Configures the response cache from the application config.
+
+    Shared backends also hold the table generations, so that a write made by one API
+    process invalidates the responses cached by all of them.
+
+    Args:
+        app (Flask): The application to read the config from.
+
+    Returns:
+        None
+    """
+
+    backend = make_backend(
+        app.config["CACHE_BACKEND"],
+        app.config["CACHE_URL"],
+        app.config["CACHE_MAX_ENTRIES"],
+    )
+
+    response_cache.backend = backend
+    response_cache.ttl = app.config["CACHE_TTL"]
+    generations.store = backend if isinstance(backend, SharedCache) else None
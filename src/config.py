@@ -33,6 +33,39 @@ class Config:
         The URI for the SQLAlchemy database connection. Defaults to a SQLite database located at "{basedir}/app.db".
     SQLALCHEMY_TRACK_MODIFICATIONS : bool
         Flag indicating whether SQLAlchemy should track modifications. Defaults to False.
+    CACHE_BACKEND : str
+        The store of the response cache: "local", "redis", "memory" or "none". Defaults to "local".
+    CACHE_URL : str
+        The url of the redis server used by the "redis" cache backend.
+    CACHE_MAX_ENTRIES : int
+        The maximum number of responses kept by the "local" cache backend. Defaults to 1024.
+    CACHE_TTL : int
+        The time to live of cached responses in seconds. Defaults to 60.
+    SEARCH_BACKEND : str
+        How models are searched: "elasticsearch", or "fts" for the full text search of the
+        database itself (SQLite FTS5 or PostgreSQL tsvector). Defaults to "elasticsearch".
+    SEARCH_COMPONENT_DOCUMENTS : bool
+        Whether component searches are answered by the denormalized components index instead of
+        the metadatas and attributes indices. Only used by the "elasticsearch" search backend.
+        Defaults to True.
+    SEARCH_MIN_HITS : int
+        The number of hits under which an Elasticsearch search escalates from exact to prefix,
+        then to fuzzy matching. Defaults to 10.
+    ELASTICSEARCH_SEARCH_TIMEOUT : float
+        The seconds after which an Elasticsearch search call is abandoned. Defaults to 2.
+    ELASTICSEARCH_BREAKER_FAILURES : int
+        The number of failed or slow Elasticsearch calls in a row after which searches fall
+        back to SQL. Defaults to 5.
+    ELASTICSEARCH_BREAKER_LATENCY : float
+        The seconds above which an Elasticsearch search call counts as failed. Defaults to 1.
+    ELASTICSEARCH_BREAKER_RESET : float
+        The seconds searches fall back to SQL before Elasticsearch is tried again.
+        Defaults to 30.
+    SEARCH_OUTBOX_WORKER : bool
+        Whether this process runs the indexer draining the search outbox into Elasticsearch.
+        Defaults to True.
+    SEARCH_OUTBOX_INTERVAL : float
+        The seconds the outbox indexer waits when the outbox is empty. Defaults to 1.
 
     Notes
     -----
@@ -45,6 +78,32 @@ class Config:
         os.environ.get("SQLALCHEMY_TRACK_MODIFICATIONS", "0") == "1"
     )
 
+    CACHE_BACKEND: str = os.environ.get("CACHE_BACKEND", "local")
+    CACHE_URL: str = os.environ.get("CACHE_URL", "")
+    CACHE_MAX_ENTRIES: int = int(os.environ.get("CACHE_MAX_ENTRIES", "1024"))
+    CACHE_TTL: int = int(os.environ.get("CACHE_TTL", "60"))
+
+    SEARCH_BACKEND: str = os.environ.get("SEARCH_BACKEND", "elasticsearch")
+    SEARCH_COMPONENT_DOCUMENTS: bool = (
+        os.environ.get("SEARCH_COMPONENT_DOCUMENTS", "1") == "1"
+    )
+
+    SEARCH_MIN_HITS: int = int(os.environ.get("SEARCH_MIN_HITS", "10"))
+    ELASTICSEARCH_SEARCH_TIMEOUT: float = float(
+        os.environ.get("ELASTICSEARCH_SEARCH_TIMEOUT", "2")
+    )
+    ELASTICSEARCH_BREAKER_FAILURES: int = int(
+        os.environ.get("ELASTICSEARCH_BREAKER_FAILURES", "5")
+    )
+    ELASTICSEARCH_BREAKER_LATENCY: float = float(
+        os.environ.get("ELASTICSEARCH_BREAKER_LATENCY", "1")
+    )
+    ELASTICSEARCH_BREAKER_RESET: float = float(
+        os.environ.get("ELASTICSEARCH_BREAKER_RESET", "30")
+    )
+    SEARCH_OUTBOX_WORKER: bool = os.environ.get("SEARCH_OUTBOX_WORKER", "1") == "1"
+    SEARCH_OUTBOX_INTERVAL: float = float(os.environ.get("SEARCH_OUTBOX_INTERVAL", "1"))
+
     LOG_LEVEL = logging.DEBUG
 
     GITHUB_OAUTH_CLIENT_ID: Optional[str] = os.environ.get("GITHUB_OAUTH_CLIENT_ID")
@@ -10,5 +10,22 @@
 # |																|
 # --------------------------------------------------------------
 
-from .base import Base, ElasticSearchBase
-from .definations import db, es, ma
+from .base import Base, BulkResult, ElasticSearchBase, is_unique_violation
+from .definations import breaker, db, es, ma
+from .events import generations, record_written_tables
+from .indices import IndexManager, indices, setup_indices
+from .migrations import create_missing_indexes, missing_indexes
+from .outbox import OutboxIndexer, outbox_metrics, setup_outbox
+from .rebuild import reindex
+from .resilience import (
+    SEARCH_UNAVAILABLE_ERRORS,
+    CircuitBreaker,
+    CircuitOpenError,
+    GuardedClient,
+    is_degraded,
+    is_search_unavailable,
+    mark_degraded,
+)
+from .search_backends import SearchBackend, fulltext_rank, setup_search
+from .staged_search import SearchStage, StagedSearch, staged_search
+from .unit_of_work import unit_of_work
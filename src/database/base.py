@@ -11,15 +11,61 @@
 # --------------------------------------------------------------
 
 import uuid
-from typing import Any
+from typing import Iterator, NamedTuple, Optional, Sequence
 
+from elasticsearch import helpers
 from marshmallow_sqlalchemy.schema import SQLAlchemyAutoSchema
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from .definations import db, es
+from .events import record_written_tables
 from .guid import GUID
+from .indices import indices
+from .outbox import record_documents, register_collector, register_index
+from .rebuild import register_source
+from .search_backends import ElasticsearchBackend, SearchBackend
 from .utils import make_elasticsearch_query
 
+SEARCH_PAGE_SIZE = 1000
+PIT_KEEP_ALIVE = "1m"
+
+# * the inserts supporting ON CONFLICT, by dialect
+_CONFLICT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def is_unique_violation(err: IntegrityError) -> bool:
+    """
+    Returns whether an integrity error comes from a unique constraint, rather than a foreign
+    key or not null one.
+
+    Args:
+        err (IntegrityError): The error raised by the database.
+
+    Returns:
+        bool: True for unique violations on PostgreSQL and SQLite.
+    """
+
+    code = getattr(err.orig, "pgcode", None) or getattr(err.orig, "sqlstate", None)
+    return code == "23505" or "UNIQUE constraint failed" in str(err.orig)
+
+
+class BulkResult(NamedTuple):
+    """
+    The outcome of a bulk write.
+
+    Attributes:
+        ids (list[str | None]): The id of the row written for each given row, None for the rows
+            skipped.
+        conflicts (list[int]): The positions of the given rows that conflicted with existing
+            rows, or with a later row of the same write.
+    """
+
+    ids: list[Optional[str]]
+    conflicts: list[int]
+
 
 class Base(db.Model):
     """
@@ -37,6 +83,8 @@ class Base(db.Model):
         update(): Commits the changes to the session.
         delete(): Deletes the instance from the session and commits the changes.
         commit(): Commits the changes to the session.
+        bulk_create(rows, commit): Inserts rows in batches, skipping conflicting ones.
+        bulk_upsert(rows, conflict_cols, commit): Inserts or updates rows in batches.
     """
 
     __abstract__ = True
@@ -94,129 +142,340 @@ class Base(db.Model):
 
     def commit(self) -> None:
         """
-        Commits the changes to the session.
+        Commits the changes to the session, rolling them back when the commit fails so that
+        the session stays usable.
 
         Args:
             self: The instance to be committed.
 
         Returns:
             None
+
+        Raises:
+            IntegrityError: Raised when the changes violate a constraint, see
+                `is_unique_violation`.
+        """
+
+        try:
+            self.__session.commit()
+        except Exception:
+            self.__session.rollback()
+            raise
+
+    @classmethod
+    def bulk_create(cls, rows: list[dict], commit: bool = True) -> BulkResult:
+        """
+        Inserts rows with batched `INSERT ... ON CONFLICT DO NOTHING` statements, skipping the
+        rows conflicting with existing ones on any unique column.
+
+        The rows go through the validators of the model, and the search outbox entries and
+        table generations of the written rows are recorded as for instances written through
+        the session, so their documents are indexed with one bulk request by the outbox
+        indexer.
+
+        Args:
+            rows (list[dict]): The column values of the rows.
+            commit (bool, optional): Whether to commit the rows. Defaults to True.
+
+        Returns:
+            BulkResult: The ids of the rows created and the positions of the conflicting ones.
+
+        Raises:
+            ValueError: Raised when a row has unknown columns or the database does not support
+                ON CONFLICT. The validators of the model raise their own errors.
+
+        Example:
+            ```python
+            result = Tag.bulk_create([{"label": "screw"}, {"label": "bolt"}])
+            skipped = [rows[i] for i in result.conflicts]
+            ```
+        """
+
+        return cls._bulk_write(rows, None, commit)
+
+    @classmethod
+    def bulk_upsert(
+        cls, rows: list[dict], conflict_cols: Sequence[str], commit: bool = True
+    ) -> BulkResult:
+        """
+        Inserts rows with batched `INSERT ... ON CONFLICT DO UPDATE` statements, updating the
+        existing rows having the same values of `conflict_cols` instead.
+
+        Existing rows keep their id and creation time. When several given rows have the same
+        values of `conflict_cols`, the last one is written and the others count as conflicts.
+        See `bulk_create` for validation and indexing.
+
+        Args:
+            rows (list[dict]): The column values of the rows.
+            conflict_cols (Sequence[str]): The columns of a unique constraint identifying rows.
+            commit (bool, optional): Whether to commit the rows. Defaults to True.
+
+        Returns:
+            BulkResult: The ids of the rows written and the positions of the rows that updated
+                existing ones.
+
+        Raises:
+            ValueError: Raised when a row has unknown columns or the database does not support
+                ON CONFLICT. The validators of the model raise their own errors.
+
+        Example:
+            ```python
+            SPDX.bulk_upsert(licenses, conflict_cols=["fullname"])
+            ```
         """
 
-        self.__session.commit()
+        return cls._bulk_write(rows, list(conflict_cols), commit)
+
+    @classmethod
+    def _bulk_write(
+        cls, rows: list[dict], conflict_cols: Optional[list[str]], commit: bool
+    ) -> BulkResult:
+        session = cls.__session
+        if not rows:
+            return BulkResult([], [])
+
+        dialect = session.get_bind().dialect.name
+        if dialect not in _CONFLICT_INSERTS:
+            raise ValueError(f"Bulk writes are not supported on {dialect}")
+
+        table = cls.__table__
+        columns = list(dict.fromkeys(["id", *(key for row in rows for key in row)]))
+        if unknown := [column for column in columns if column not in table.c]:
+            raise ValueError(f"Unknown columns of {table.name}: {', '.join(unknown)}")
+
+        # * transient instances run the validators, and are what the outbox collects
+        instances = [cls(**row) for row in rows]
+        for instance in instances:
+            instance.id = instance.id or str(uuid.uuid4())
+
+        def key_of(values) -> tuple:
+            return tuple(str(value) for value in values)
+
+        keys = [key_of(getattr(i, col) for col in conflict_cols or ["id"]) for i in instances]
+        last = {key: position for position, key in enumerate(keys)}
+        written = [position for position, key in enumerate(keys) if last[key] == position]
+
+        stmt = _CONFLICT_INSERTS[dialect](table)
+        if conflict_cols is None:
+            stmt = stmt.on_conflict_do_nothing()
+            existing = set()
+        else:
+            updated = [col for col in columns if col not in {*conflict_cols, "id", "created_at"}]
+            stmt = stmt.on_conflict_do_update(
+                index_elements=conflict_cols,
+                set_={
+                    **{col: stmt.excluded[col] for col in updated},
+                    "updated_at": func.current_timestamp(),
+                },
+            )
+            key_columns = [table.c[col] for col in conflict_cols]
+            given = [tuple(getattr(instances[p], col) for col in conflict_cols) for p in written]
+            existing = {
+                key_of(row)
+                for row in session.execute(
+                    select(*key_columns).where(tuple_(*key_columns).in_(given))
+                )
+            }
+
+        returned = session.execute(
+            stmt.returning(table.c.id, *(table.c[col] for col in conflict_cols or [])),
+            [{col: getattr(instances[p], col) for col in columns} for p in written],
+        )
+        ids_by_key = {
+            key_of(row[1:] if conflict_cols else row[:1]): str(row[0]) for row in returned
+        }
+
+        ids: list[Optional[str]] = [None] * len(rows)
+        for position in written:
+            ids[position] = ids_by_key.get(keys[position])
+            if ids[position] is not None:
+                instances[position].id = ids[position]
+        conflicts = [
+            position
+            for position, key in enumerate(keys)
+            if ids[position] is None or key in existing or last[key] != position
+        ]
+
+        record_written_tables(session, table.name)
+        record_documents(session, (instances[p] for p in written if ids[p] is not None))
+        if commit:
+            session.commit()
+        return BulkResult(ids, conflicts)
 
 
 class ElasticSearchBase(Base):
     """
     Abstract base class for Elasticsearch models.
 
+    The index named after the table holds one document per instance, with the instance id as
+    document id. Writes only record the changed documents in the search outbox, within their
+    transaction; the outbox indexer then rebuilds them with `document_actions`.
+
     Attributes:
         __abstract__ (bool): Indicates if the class is abstract.
         __es: The Elasticsearch client.
         __schema (SQLAlchemyAutoSchema): The schema for a single instance.
         __schema_many (SQLAlchemyAutoSchema): The schema for multiple instances.
+        __index_mappings__ (dict | None): The mappings of the index, None for dynamic mappings.
+        __index_settings__ (dict | None): The settings of the index.
+        __index_version__ (int): The version of the index definition, bumped when it changes.
+        search_backend (SearchBackend): The backend `search` runs with, see `setup_search`.
 
     Methods:
-        __init__(*args, **kwargs): Initializes the ElasticsearchBase instance.
-        create(): Creates a new instance in the database and indexes it in Elasticsearch.
-        update(field_name, value): Updates the instance in the database and Elasticsearch based on the specified field and value.
-        delete(field_name, value): Deletes the instance from the database and Elasticsearch based on the specified field and value.
+        document_actions(session, ids): Makes the bulk actions syncing the documents of the given instances.
+        iter_documents(session, chunk_size): Streams the document of every instance.
+        rekey(chunk_size): Moves the documents indexed under generated ids to the id of their instance.
+        search(search_key): Searches the instances matching the search key with the configured search backend.
+        sql_search(search_key): Searches the instances in SQL, when Elasticsearch is unavailable.
         elasticsearch(search_key): Performs an Elasticsearch search and returns a set of matching names.
+        iter_hits(index, query, source, page_size, keep_alive): Streams every hit of an Elasticsearch search.
+        search_ids(index, query, id_field): Performs an Elasticsearch search and returns the ranked ids of all hits.
         set_schemas(schema, schema_many): Sets the schemas for the ElasticsearchBase class.
     """
 
     __abstract__ = True
 
     __es = es
+    __index_mappings__: dict | None = None
+    __index_settings__: dict | None = None
+    __index_version__: int = 1
+    search_backend: SearchBackend = ElasticsearchBackend()
     __schema: SQLAlchemyAutoSchema
     __schema_many: SQLAlchemyAutoSchema
 
-    def __init__(self, *args, **kwargs) -> None:
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        indices.register(
+            cls.__tablename__,
+            cls.__index_mappings__,
+            cls.__index_settings__,
+            cls.__index_version__,
+        )
+        register_index(cls.__tablename__, cls.document_actions)
+        register_source(cls.__tablename__, cls, cls.iter_documents)
+
+    @classmethod
+    def document_actions(cls, session: Session, ids: list[str]) -> list[dict]:
         """
-        Initializes the ElasticsearchBase instance.
+        Makes the bulk actions bringing the documents of the given instances in line with the
+        database: existing instances are indexed, the others deleted.
 
         Args:
-            *args: Variable length argument list.
-            **kwargs: Arbitrary keyword arguments.
+            session: The session to read the instances with.
+            ids: The ids of the instances.
 
         Returns:
-            None
+            list[dict]: The bulk actions.
         """
 
-        super().__init__(*args, **kwargs)
-        self.__es.options(ignore_status=[400, 404]).indices.create(
-            index=self.__tablename__
+        instances = session.scalars(select(cls).where(cls.id.in_(ids)))
+        actions = [
+            {
+                "_op_type": "index",
+                "_index": cls.__tablename__,
+                "_id": str(instance.id),
+                "_source": cls.__schema.dump(instance),
+            }
+            for instance in instances
+        ]
+
+        indexed = {action["_id"] for action in actions}
+        actions.extend(
+            {"_op_type": "delete", "_index": cls.__tablename__, "_id": id_}
+            for id_ in ids
+            if id_ not in indexed
         )
+        return actions
 
-    def create(self) -> None:
+    @classmethod
+    def iter_documents(cls, session: Session, chunk_size: int) -> Iterator[tuple[str, dict]]:
         """
-        Creates a new instance in the database and indexes it in Elasticsearch.
+        Streams the document of every instance, for `reindex`.
 
-        Raises:
-            Exception: If an error occurs during the creation process.
+        Args:
+            session: The session to read the instances with.
+            chunk_size: The number of rows fetched at a time.
 
         Returns:
-            None
+            Iterator[tuple[str, dict]]: The id and source of every document.
         """
 
-        try:
-            super().create()
-        except:
-            raise
-
-        doc = self.__schema.dump(self)
-        self.__es.index(index=self.__tablename__, document=doc)
+        instances = session.scalars(select(cls).execution_options(yield_per=chunk_size))
+        for instance in instances:
+            yield str(instance.id), cls.__schema.dump(instance)
 
-    def update(self, field_name, value) -> None:
+    @classmethod
+    def rekey(cls, chunk_size: int = SEARCH_PAGE_SIZE) -> int:
         """
-        Updates the instance in the database and Elasticsearch based on the specified field and value.
+        Moves the documents of the index indexed under generated ids to the id of their instance.
 
-        Args:
-            field_name: The name of the field to match.
-            value: The value to match.
+        Documents written before they were keyed by instance id are deleted, and the documents
+        of their instances are rebuilt from the database under the instance id. The index is
+        streamed from a point in time, one chunk of documents in memory at a time.
 
-        Raises:
-            Exception: If an error occurs during the update process.
+        Args:
+            chunk_size: The number of documents rekeyed per bulk request.
+                Defaults to SEARCH_PAGE_SIZE.
 
         Returns:
-            None
+            int: The number of documents rekeyed.
         """
 
-        try:
-            super().update()
-        except:
-            raise
+        def chunks() -> Iterator[list[dict]]:
+            chunk = []
+            for hit in cls.iter_hits(cls.__tablename__, {"match_all": {}}, source=["id"]):
+                if hit["_id"] != str(hit["_source"].get("id")):
+                    chunk.append(hit)
+                if len(chunk) == chunk_size:
+                    yield chunk
+                    chunk = []
+            if chunk:
+                yield chunk
+
+        rekeyed = 0
+        with Session(db.engine) as session:
+            for chunk in chunks():
+                actions = [
+                    {"_op_type": "delete", "_index": cls.__tablename__, "_id": hit["_id"]}
+                    for hit in chunk
+                ]
+                ids = {str(hit["_source"]["id"]) for hit in chunk if hit["_source"].get("id")}
+                actions.extend(cls.document_actions(session, sorted(ids)))
+                helpers.bulk(cls.__es, actions, raise_on_error=False)
+                rekeyed += len(chunk)
+
+        return rekeyed
 
-        sq = self.__es.search(
-            index=self.__tablename__, query={"match": {field_name: value}}
-        )
+    @classmethod
+    def search(cls, search_key: str):
+        """
+        Searches the instances matching the search key with the configured search backend.
 
-        self.__es.update(
-            index="index_name",
-            id=sq["hits"]["hits"]["_id"],
-            doc=self.__schema.dump(self),
-        )
+        Args:
+            search_key: The key to search for.
 
-    def delete(self, field_name: str, value: Any) -> None:
+        Returns:
+            The result of `elasticsearch` or `fulltext`, depending on the backend.
         """
-        Deletes the instance from the database and Elasticsearch based on the specified field and value.
 
-        Args:
-            field_name: The name of the field to match.
-            value: The value to match.
+        return cls.search_backend.search(cls, search_key)
 
-        Raises:
-            Exception: If an error occurs during the deletion process.
+    @classmethod
+    def sql_search(cls, search_key: str):
+        """
+        Searches the instances in SQL, when Elasticsearch is unavailable.
+
+        Defaults to the `fulltext` search of the model; models whose `fulltext` needs the
+        full text index of the "fts" backend override this with a plain SQL search.
+
+        Args:
+            search_key: The key to search for.
 
         Returns:
-            None
+            The same result as `elasticsearch`.
         """
 
-        try:
-            super().delete()
-        except:
-            raise
-        self.__es.delete_by_query(index=self.__tablename__, q={field_name: value})
+        return cls.fulltext(search_key)
 
     @classmethod
     def elasticsearch(cls, index, query):
@@ -236,9 +495,86 @@ class ElasticSearchBase(Base):
         )
 
     @classmethod
-    def set_schemas(
-        cls, schema: SQLAlchemyAutoSchema, schema_many: SQLAlchemyAutoSchema
-    ) -> None:
+    def iter_hits(
+        cls,
+        index: str,
+        query: dict,
+        source: list[str] | None = None,
+        page_size: int = SEARCH_PAGE_SIZE,
+        keep_alive: str = PIT_KEEP_ALIVE,
+    ) -> Iterator[dict]:
+        """
+        Streams every hit of an Elasticsearch search, best first, one page in memory at a time.
+
+        The pages are read from a point in time of the index with `search_after`, so they are
+        consistent with each other and not limited by the index' result window. The point in
+        time is closed once the hits are exhausted or the generator is closed.
+
+        Args:
+            index: The index to search.
+            query: The Elasticsearch query.
+            source: The source fields to fetch from each document. Defaults to None, all fields.
+            page_size: The number of hits fetched per request. Defaults to SEARCH_PAGE_SIZE.
+            keep_alive: How long the point in time is kept between two pages. Defaults to "1m".
+
+        Returns:
+            Iterator[dict]: The hits.
+
+        Example:
+            ```python
+            for hit in Metadata.iter_hits("metadatas", {"match_all": {}}, source=["id"]):
+                print(hit["_source"]["id"], hit["_score"])
+            ```
+        """
+
+        pit_id = cls.__es.open_point_in_time(index=index, keep_alive=keep_alive)["id"]
+        search_after = None
+        try:
+            while True:
+                response = cls.__es.search(
+                    pit={"id": pit_id, "keep_alive": keep_alive},
+                    query=query,
+                    sort=[{"_score": "desc"}, {"_shard_doc": "asc"}],
+                    search_after=search_after,
+                    source=source,
+                    size=page_size,
+                    track_total_hits=False,
+                )
+                pit_id = response.get("pit_id", pit_id)
+                hits = response["hits"]["hits"]
+                yield from hits
+
+                if len(hits) < page_size:
+                    return
+                search_after = hits[-1]["sort"]
+        finally:
+            cls.__es.close_point_in_time(id=pit_id)
+
+    @classmethod
+    def search_ids(cls, index: str, query: dict, id_field: str = "id") -> list[tuple[str, float]]:
+        """
+        Performs an Elasticsearch search and returns the id and score of every hit, best first.
+
+        Only `id_field` is fetched from each document source, and all the hits are read with
+        `iter_hits` instead of stopping at the first 10.
+
+        Args:
+            index: The index to search.
+            query: The Elasticsearch query.
+            id_field: The source field holding the id to return. Defaults to "id".
+
+        Returns:
+            list[tuple[str, float]]: The distinct ids with the score of their best hit, in relevance order.
+        """
+
+        scores: dict[str, float] = {}
+        for hit in cls.iter_hits(index, query, source=[id_field]):
+            scores.setdefault(hit["_source"][id_field], hit["_score"])
+
+        return list(scores.items())
+
+    @classmethod
+    def set_schemas(cls, schema: SQLAlchemyAutoSchema, schema_many: SQLAlchemyAutoSchema) -> None:
         """
         Sets the schemas for the ElasticsearchBase class.
 
@@ -252,3 +588,11 @@ class ElasticSearchBase(Base):
 
         cls.__schema = schema
         cls.__schema_many = schema_many
+
+
+@register_collector
+def _collect_documents(session: Session, instance) -> list[tuple[str, str]]:
+    # * the document of an instance is named after its table and id
+    if isinstance(instance, ElasticSearchBase):
+        return [(instance.__tablename__, str(instance.id))]
+    return []
@@ -20,34 +20,29 @@ from werkzeug.exceptions import NotAcceptable
 
 from ...models.files.operations import create as create_file
 from ...models.licenses.models import SPDX
-from ...models.licenses.operations import create as create_license
 from ...models.metadatas.models import Metadata
 from ...models.metadatas.operations import add_tags
 from ...models.metadatas.operations import create as create_meatdata
-from ...models.tags.operations import create as create_tag
+from ...models.tags.models import Tag
 
 
 def db_license_entry(license_csv_path):
     with open(license_csv_path, encoding="utf-8") as csv_file:
         csv_reader = csv.reader(csv_file, delimiter=",")
-        line_count = 0
-        for row in csv_reader:
-            if line_count == 0:
-                line_count += 1
-            else:
-                if SPDX.query.filter(SPDX.fullname == row[0]).one_or_none() is not None:
-                    continue
-
-                data = {
-                    "fullname": row[0],
-                    "identifier": row[1].lower(),
-                    "fsf_free": row[2] == "Y",
-                    "osi_approved": row[3] == "Y",
-                    "license_page": row[4],
-                }
-
-                with contextlib.suppress(NotAcceptable):
-                    create_license(data)
+        next(csv_reader, None)
+        licenses = [
+            {
+                "fullname": row[0],
+                "identifier": row[1].lower(),
+                "fsf_free": row[2] == "Y",
+                "osi_approved": row[3] == "Y",
+                "license_page": row[4],
+            }
+            for row in csv_reader
+        ]
+
+    # * licenses already there are skipped
+    SPDX.bulk_create(licenses)
 
 
 def db_tags_entry(tags_file_path):
@@ -56,10 +51,8 @@ def db_tags_entry(tags_file_path):
 
     tags = [t.replace("\n", "").lower() for t in tags]
 
-    for tag in tags:
-        tag.strip()
-        with contextlib.suppress(NotAcceptable):
-            create_tag({"label": tag})
+    # * tags already there are skipped
+    Tag.bulk_create([{"label": tag} for tag in tags])
 
 
 def _get_tags(files: dict) -> list[str]:
@@ -17,16 +17,29 @@ from elasticsearch import Elasticsearch
 from flask_marshmallow import Marshmallow
 from flask_sqlalchemy import SQLAlchemy
 
+from ..config import Config
+from .resilience import CircuitBreaker, GuardedClient
+
 db = SQLAlchemy()
 
 ma = Marshmallow()
 
-es = Elasticsearch(
-    "https://elasticsearch.localhost:9200/",
-    basic_auth=(
-        os.environ.get("ELASTICSEARCH_USERNAME", ""),
-        os.environ.get("ELASTICSEARCH_PASSWORD", ""),
+breaker = CircuitBreaker(
+    failure_threshold=Config.ELASTICSEARCH_BREAKER_FAILURES,
+    latency_threshold=Config.ELASTICSEARCH_BREAKER_LATENCY,
+    reset_timeout=Config.ELASTICSEARCH_BREAKER_RESET,
+)
+
+es = GuardedClient(
+    Elasticsearch(
+        "https://elasticsearch.localhost:9200/",
+        basic_auth=(
+            os.environ.get("ELASTICSEARCH_USERNAME", ""),
+            os.environ.get("ELASTICSEARCH_PASSWORD", ""),
+        ),
+        # ca_certs=certifi.where(),
+        verify_certs=False,
     ),
-    # ca_certs=certifi.where(),
-    verify_certs=False,
+    breaker,
+    deadline=Config.ELASTICSEARCH_SEARCH_TIMEOUT,
 )
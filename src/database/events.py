@@ -0,0 +1,123 @@
+# SPDX-License-Identifier: MIT
+# --------------------------------------------------------------
+# |																|
+# |             Copyright 2023 - 2023, Amulya Paritosh			|
+# |																|
+# |  This file is part of Component Library Plugin for FreeCAD.	|
+# |																|
+# |               This file was created as a part of				|
+# |              Google Summer Of Code Program - 2023			|
+# |																|
+# --------------------------------------------------------------
+
+from itertools import chain
+from threading import Lock
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+
+class GenerationCounter:
+    """
+    Per table counters that are bumped every time a transaction writing to the table commits.
+
+    Anything derived from table contents, such as cached counts or responses, can store the
+    generations it was computed at and consider itself stale as soon as they change.
+
+    The counters live in process unless a `store` is set, in which case they are kept in
+    that shared cache backend and writes made by any API process are seen by all of them.
+
+    Attributes:
+        store (CacheBackend | None): The shared backend of the counters, if any.
+
+    Methods:
+        bump(*tables): Increments the generation of the given tables.
+        current(*tables): Returns the current generations of the given tables.
+
+    Example:
+        ```python
+        seen = generations.current("metadatas", "tags")
+        ...
+        is_stale = generations.current("metadatas", "tags") != seen
+        ```
+    """
+
+    def __init__(self) -> None:
+        self.store = None
+        self._counts: dict[str, int] = {}
+        self._lock = Lock()
+
+    def bump(self, *tables: str) -> None:
+        """
+        Increments the generation of the given tables.
+
+        Args:
+            *tables (str): The names of the written tables.
+
+        Returns:
+            None
+        """
+
+        if self.store is not None:
+            for table in tables:
+                self.store.incr(f"generation:{table}")
+            return
+
+        with self._lock:
+            for table in tables:
+                self._counts[table] = self._counts.get(table, 0) + 1
+
+    def current(self, *tables: str) -> tuple[int, ...]:
+        """
+        Returns the current generations of the given tables.
+
+        Args:
+            *tables (str): The names of the tables.
+
+        Returns:
+            tuple[int, ...]: The generations, in the order of `tables`.
+        """
+
+        if self.store is not None:
+            counts = self.store.get_many([f"generation:{table}" for table in tables])
+            return tuple(count or 0 for count in counts)
+
+        with self._lock:
+            return tuple(self._counts.get(table, 0) for table in tables)
+
+
+generations = GenerationCounter()
+
+
+def record_written_tables(session: Session, *tables: str) -> None:
+    """
+    Records tables written with statements rather than instances, such as association tables,
+    so that their generations are bumped when the transaction commits.
+
+    Args:
+        session (Session): The session the statements were executed in.
+        *tables (str): The names of the written tables.
+
+    Returns:
+        None
+    """
+
+    session.info.setdefault("written_tables", set()).update(tables)
+
+
+@event.listens_for(Session, "after_flush")
+def _record_written_tables(session: Session, flush_context) -> None:
+    written: set[str] = session.info.setdefault("written_tables", set())
+    for instance in chain(session.new, session.dirty, session.deleted):
+        if table := getattr(instance, "__tablename__", None):
+            written.add(table)
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_written_tables(session: Session) -> None:
+    generations.bump(*session.info.pop("written_tables", ()))
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_written_tables(session: Session) -> None:
+    session.info.pop("written_tables", None)
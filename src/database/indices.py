@@ -0,0 +1,356 @@
+# SPDX-License-Identifier: MIT
+# --------------------------------------------------------------
+# |																|
+# |             Copyright 2023 - 2023, Amulya Paritosh			|
+# |																|
+# |  This file is part of Component Library Plugin for FreeCAD.	|
+# |																|
+# |               This file was created as a part of				|
+# |              Google Summer Of Code Program - 2023			|
+# |																|
+# --------------------------------------------------------------
+
+from threading import Lock
+from time import time
+from typing import Optional
+
+from elasticsearch import BadRequestError
+from flask import Flask
+
+from ..log import logger
+from .definations import es
+
+ANALYSIS_SETTINGS: dict = {
+    "analysis": {
+        "filter": {
+            "prefix_edge_ngram": {"type": "edge_ngram", "min_gram": 1, "max_gram": 20},
+        },
+        "analyzer": {
+            "prefix": {
+                "type": "custom",
+                "tokenizer": "standard",
+                "filter": ["lowercase", "asciifolding", "prefix_edge_ngram"],
+            },
+            "prefix_search": {
+                "type": "custom",
+                "tokenizer": "standard",
+                "filter": ["lowercase", "asciifolding"],
+            },
+        },
+        "normalizer": {
+            "folded": {"type": "custom", "filter": ["lowercase", "asciifolding"]},
+        },
+    }
+}
+
+# * a name is matched as words, as word prefixes through its edge n-grams, and exactly
+NAME_MAPPING: dict = {
+    "type": "text",
+    "fields": {
+        "prefix": {
+            "type": "text",
+            "analyzer": "prefix",
+            "search_analyzer": "prefix_search",
+        },
+        "keyword": {"type": "keyword", "normalizer": "folded"},
+    },
+}
+
+# * keys and values of attributes are only filtered on, never sorted or aggregated
+NORMALIZED_KEYWORD_MAPPING: dict = {
+    "type": "keyword",
+    "normalizer": "folded",
+    "doc_values": False,
+}
+
+
+class IndexManager:
+    """
+    Creates the Elasticsearch indices of the application, once, with their mappings and settings.
+
+    Indices are registered when their models are defined and created at app startup, by the
+    `create-indices` command, or on first use. An index known to exist is never checked again
+    by this process, so creating models and writing documents do not touch the network for it.
+
+    Methods:
+        register(name, mappings, settings, version): Registers the definition of an index.
+        ensure(name): Creates the index unless it is known to exist.
+        ensure_all(): Creates every registered index unless it is known to exist.
+        create(name): Creates the index.
+        start_rebuild(name): Creates a new version of the index to rebuild it into.
+        finish_rebuild(name, new_index): Moves the alias of the index to the rebuilt index.
+        abort_rebuild(new_index): Deletes an index whose rebuild failed.
+        rebuilding(names): Finds the indices being rebuilt.
+        delete(name): Deletes the index.
+        is_ready(name): Returns whether the index is known to exist.
+        names(): Returns the names of the registered indices.
+        version(name): Returns the version of the registered definition of the index.
+
+    Example:
+        ```python
+        indices.register("metadatas", mappings={"properties": {"name": {"type": "text"}}})
+        indices.ensure("metadatas")
+        ```
+    """
+
+    def __init__(self, client) -> None:
+        self.client = client
+        self._definitions: dict[str, dict] = {}
+        self._ready: set[str] = set()
+        self._lock = Lock()
+
+    def register(
+        self,
+        name: str,
+        mappings: Optional[dict] = None,
+        settings: Optional[dict] = None,
+        version: int = 1,
+    ) -> None:
+        """
+        Registers the definition of an index.
+
+        The definition is installed as an index template matching the index and its versioned
+        copies, `<name>_v<n>`. The version is stored in the `_meta` of the mappings and must be
+        bumped whenever the definition changes, so that outdated indices can be told apart.
+
+        Args:
+            name (str): The name of the index.
+            mappings (dict, optional): The mappings of the index. Defaults to None, dynamic mappings.
+            settings (dict, optional): The settings of the index. Defaults to None.
+            version (int, optional): The version of the definition. Defaults to 1.
+
+        Returns:
+            None
+        """
+
+        if mappings is not None:
+            mappings = {**mappings, "_meta": {"version": version}}
+        self._definitions[name] = {
+            "mappings": mappings,
+            "settings": settings,
+            "version": version,
+        }
+
+    def ensure(self, name: str) -> None:
+        """
+        Creates the index unless it is known to exist.
+
+        Args:
+            name (str): The name of the index.
+
+        Returns:
+            None
+        """
+
+        if name in self._ready:
+            return
+
+        with self._lock:
+            if name not in self._ready:
+                self.create(name)
+
+    def ensure_all(self) -> None:
+        """
+        Creates every registered index unless it is known to exist.
+
+        Returns:
+            None
+        """
+
+        for name in self._definitions:
+            self.ensure(name)
+
+    def create(self, name: str) -> None:
+        """
+        Installs the index template of the index, then creates the index from it, an existing
+        index, or alias of a rebuilt index, being left as is.
+
+        Args:
+            name (str): The name of the index.
+
+        Returns:
+            None
+
+        Raises:
+            BadRequestError: Raised when Elasticsearch rejects the definition of the index.
+        """
+
+        self._put_template(name)
+        try:
+            self.client.indices.create(index=name)
+        except BadRequestError as err:
+            if err.error not in (
+                "resource_already_exists_exception",
+                "invalid_index_name_exception",
+            ):
+                raise
+        self._ready.add(name)
+
+    def _put_template(self, name: str) -> None:
+        definition = self._definitions.get(name)
+        if not definition:
+            return
+
+        self.client.indices.put_index_template(
+            name=f"{name}-template",
+            index_patterns=[name, f"{name}_v*"],
+            template={
+                key: definition[key]
+                for key in ("mappings", "settings")
+                if definition[key] is not None
+            },
+            version=definition["version"],
+        )
+
+    def start_rebuild(self, name: str) -> str:
+        """
+        Creates a new version of the index to rebuild it into, while searches and writes keep
+        using the current one.
+
+        The new index has refresh and replicas disabled until `finish_rebuild`, and the
+        `<name>_next` alias, through which the search outbox copies its writes into it.
+
+        Args:
+            name (str): The name of the index.
+
+        Returns:
+            str: The name of the new index, `<name>_v<version>_<timestamp>`.
+        """
+
+        self.ensure(name)
+        self._put_template(name)
+
+        version = self._definitions.get(name, {}).get("version", 1)
+        new_index = f"{name}_v{version}_{int(time() * 1000)}"
+        self.client.indices.create(
+            index=new_index,
+            settings={"index": {"refresh_interval": "-1", "number_of_replicas": 0}},
+            aliases={f"{name}_next": {}},
+        )
+        return new_index
+
+    def finish_rebuild(self, name: str, new_index: str) -> list[str]:
+        """
+        Restores refresh and replicas of the rebuilt index, then moves the alias of the index
+        to it in one atomic request and deletes the indices it replaced.
+
+        An index created before aliases were used is replaced by the alias in the same request.
+
+        Args:
+            name (str): The name of the index.
+            new_index (str): The rebuilt index, returned by `start_rebuild`.
+
+        Returns:
+            list[str]: The indices replaced.
+        """
+
+        self.client.indices.put_settings(
+            index=new_index,
+            settings={"index": {"refresh_interval": None, "number_of_replicas": None}},
+        )
+        self.client.indices.refresh(index=new_index)
+
+        aliased = self.client.options(ignore_status=[404]).indices.get_alias(name=name)
+        old_indices = [index for index in aliased if index not in ("error", "status")]
+        is_concrete = not old_indices and self.client.indices.exists(index=name)
+
+        actions: list[dict] = [{"remove": {"index": index, "alias": name}} for index in old_indices]
+        if is_concrete:
+            actions.append({"remove_index": {"index": name}})
+        actions += [
+            {"add": {"index": new_index, "alias": name}},
+            {"remove": {"index": new_index, "alias": f"{name}_next"}},
+        ]
+        self.client.indices.update_aliases(actions=actions)
+
+        for index in old_indices:
+            self.client.options(ignore_status=[404]).indices.delete(index=index)
+        self._ready.add(name)
+        return old_indices + ([name] if is_concrete else [])
+
+    def abort_rebuild(self, new_index: str) -> None:
+        """
+        Deletes an index whose rebuild failed, leaving the current one in use.
+
+        Args:
+            new_index (str): The rebuilt index, returned by `start_rebuild`.
+
+        Returns:
+            None
+        """
+
+        self.client.options(ignore_status=[404]).indices.delete(index=new_index)
+
+    def rebuilding(self, names: list[str]) -> dict[str, str]:
+        """
+        Finds the indices being rebuilt, in this process or another one.
+
+        Args:
+            names (list[str]): The names of the indices.
+
+        Returns:
+            dict[str, str]: The `<name>_next` alias of each index being rebuilt, by name.
+        """
+
+        aliases = {f"{name}_next": name for name in names}
+        response = self.client.options(ignore_status=[404]).indices.get_alias(
+            name=",".join(aliases)
+        )
+        found = {
+            alias
+            for index, value in response.items()
+            if isinstance(value, dict)
+            for alias in value.get("aliases", {})
+        }
+        return {aliases[alias]: alias for alias in found if alias in aliases}
+
+    def delete(self, name: str) -> None:
+        """
+        Deletes the index, or the indices behind its alias, if any.
+
+        Args:
+            name (str): The name of the index.
+
+        Returns:
+            None
+        """
+
+        self._ready.discard(name)
+        concrete = list(self.client.indices.get(index=f"{name},{name}_v*", ignore_unavailable=True))
+        if concrete:
+            self.client.options(ignore_status=[404]).indices.delete(index=",".join(concrete))
+
+    def is_ready(self, name: str) -> bool:
+        return name in self._ready
+
+    def names(self) -> list[str]:
+        return list(self._definitions)
+
+    def version(self, name: str) -> int:
+        return self._definitions[name]["version"]
+
+
+indices = IndexManager(es)
+
+
+def setup_indices(app: Flask) -> None:
+    """
+    Creates the registered indices at startup when searches run on Elasticsearch.
+
+    Elasticsearch being unreachable does not prevent the app from starting, the indices are
+    then created on first use.
+
+    Args:
+        app (Flask): The application to read the config from.
+
+    Returns:
+        None
+    """
+
+    if app.config["SEARCH_BACKEND"] != "elasticsearch":
+        return
+
+    try:
+        indices.ensure_all()
+    except Exception as err:
+        logger.error(f"Error creating the search indices: {err}")
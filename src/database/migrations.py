@@ -0,0 +1,87 @@
+# SPDX-License-Identifier: MIT
+# --------------------------------------------------------------
+# |																|
+# |             Copyright 2023 - 2023, Amulya Paritosh			|
+# |																|
+# |  This file is part of Component Library Plugin for FreeCAD.	|
+# |																|
+# |               This file was created as a part of				|
+# |              Google Summer Of Code Program - 2023			|
+# |																|
+# --------------------------------------------------------------
+
+from typing import Iterator
+
+from sqlalchemy import Index, inspect, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.schema import CreateIndex
+
+from .definations import db
+
+
+def missing_indexes(connection: Connection) -> Iterator[Index]:
+    """
+    Yields the indexes declared on the models that an existing database lacks.
+
+    Tables that do not exist yet are skipped, `db.create_all()` creates them with their
+    indexes.
+
+    Args:
+        connection (Connection): A connection to the database.
+
+    Returns:
+        Iterator[Index]: The missing indexes.
+    """
+
+    inspector = inspect(connection)
+    for table in db.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in sorted(table.indexes, key=lambda index: index.name):
+            if index.name not in existing:
+                yield index
+
+
+def create_missing_indexes(engine: Engine) -> list[str]:
+    """
+    Creates the indexes declared on the models that an existing database lacks.
+
+    On PostgreSQL the indexes are built with `CREATE INDEX CONCURRENTLY`, one at a time, so
+    the tables stay writable while they are built; an index left invalid by a failed build
+    has to be dropped before running this again.
+
+    Args:
+        engine (Engine): The engine of the database.
+
+    Returns:
+        list[str]: The names of the indexes created.
+
+    Example:
+        ```python
+        with app.app_context():
+            create_missing_indexes(db.engine)
+        ```
+    """
+
+    with engine.connect() as connection:
+        indexes = list(missing_indexes(connection))
+
+    if engine.dialect.name == "postgresql":
+        # * CONCURRENTLY cannot run inside a transaction
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            preparer = engine.dialect.identifier_preparer
+            for index in indexes:
+                columns = ", ".join(preparer.quote(column.name) for column in index.columns)
+                connection.execute(
+                    text(
+                        f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {preparer.quote(index.name)} "
+                        f"ON {preparer.format_table(index.table)} ({columns})"
+                    )
+                )
+    else:
+        with engine.begin() as connection:
+            for index in indexes:
+                connection.execute(CreateIndex(index, if_not_exists=True))
+
+    return [index.name for index in indexes]
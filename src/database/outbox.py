@@ -0,0 +1,392 @@
+# SPDX-License-Identifier: MIT
+# --------------------------------------------------------------
+# |																|
+# |             Copyright 2023 - 2023, Amulya Paritosh			|
+# |																|
+# |  This file is part of Component Library Plugin for FreeCAD.	|
+# |																|
+# |               This file was created as a part of				|
+# |              Google Summer Of Code Program - 2023			|
+# |																|
+# --------------------------------------------------------------
+
+from datetime import datetime, timedelta, timezone
+from itertools import chain
+from threading import Event, Thread
+from typing import Callable, Iterable
+
+from elasticsearch import helpers
+from flask import Flask
+from sqlalchemy import (
+    Column,
+    Index,
+    Integer,
+    String,
+    case,
+    delete,
+    event,
+    func,
+    insert,
+    select,
+)
+from sqlalchemy import update as sql_update
+from sqlalchemy.orm import Session
+from sqlalchemy.types import DateTime
+
+from ..log import logger
+from .definations import db, es
+from .events import generations
+from .indices import indices
+
+BATCH_SIZE = 500
+POLL_INTERVAL = 1.0
+MAX_BACKOFF = 300
+
+Collector = Callable[[Session, object], Iterable[tuple[str, str]]]
+ActionsBuilder = Callable[[Session, list[str]], list[dict]]
+
+_collectors: list[Collector] = []
+_builders: dict[str, ActionsBuilder] = {}
+
+# * off when searches do not run on Elasticsearch, nothing would drain the entries
+enabled = True
+
+
+class OutboxEntry(db.Model):
+    """
+    A search document to bring in line with the database, written in the same transaction
+    as the row change it comes from.
+
+    Entries only name the document; the indexer rebuilds it from the rows current when the
+    entry is drained, or deletes it when they are gone. Draining an entry twice is therefore
+    harmless, and several entries for one document cost a single bulk action.
+
+    Attributes:
+        __tablename__ (str): The name of the database table.
+        id (Column): The primary key, in write order.
+        index (Column): The Elasticsearch index of the document.
+        doc_id (Column): The id of the document.
+        attempts (Column): The number of failed attempts to apply the entry.
+        created_at (Column): When the entry was written.
+        available_at (Column): When the entry may be attempted again.
+    """
+
+    __tablename__: str = "search_outbox"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    index = Column(String(64), nullable=False)
+    doc_id = Column(String(64), nullable=False)
+    attempts = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, nullable=False)
+    available_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (Index("ix_search_outbox_available_at", "available_at"),)
+
+
+def register_collector(collector: Collector) -> Collector:
+    """
+    Registers a function telling which documents a written instance changes.
+
+    Args:
+        collector (Collector): Called with the session and each new, dirty or deleted instance
+            of a flush, returns the `(index, doc_id)` pairs of the documents to sync.
+
+    Returns:
+        Collector: The collector, so that this can be used as a decorator.
+    """
+
+    _collectors.append(collector)
+    return collector
+
+
+def register_index(index: str, builder: ActionsBuilder) -> None:
+    """
+    Registers how the documents of an index are rebuilt from the database.
+
+    Args:
+        index (str): The Elasticsearch index.
+        builder (ActionsBuilder): Called with a session and document ids, returns the bulk
+            actions indexing the documents whose rows exist and deleting the others.
+
+    Returns:
+        None
+    """
+
+    _builders[index] = builder
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def record_documents(session: Session, instances: Iterable) -> None:
+    """
+    Writes the outbox entries of instances written with statements rather than through the
+    session, such as bulk inserts, in the current transaction.
+
+    Args:
+        session (Session): The session the statements were executed in.
+        instances (Iterable): The written instances, transient ones holding the written values
+            will do.
+
+    Returns:
+        None
+    """
+
+    if not enabled:
+        return
+
+    documents = {
+        document
+        for instance in instances
+        if not isinstance(instance, OutboxEntry)
+        for collector in _collectors
+        for document in collector(session, instance)
+    }
+    if not documents:
+        return
+
+    now = _now()
+    session.connection().execute(
+        insert(OutboxEntry.__table__),
+        [
+            {"index": index, "doc_id": doc_id, "created_at": now, "available_at": now}
+            for index, doc_id in sorted(documents)
+        ],
+    )
+
+
+@event.listens_for(Session, "after_flush")
+def _write_outbox_entries(session: Session, flush_context) -> None:
+    record_documents(session, chain(session.new, session.dirty, session.deleted))
+
+
+class OutboxIndexer:
+    """
+    Drains the outbox into Elasticsearch with the bulk API, in a background thread.
+
+    Failed entries are retried with an exponential backoff, capped at `max_backoff` seconds,
+    so that Elasticsearch converges with the database once it is reachable again.
+
+    Attributes:
+        batch_size (int): The maximum number of entries drained per bulk request.
+        interval (float): The seconds waited when the outbox is empty.
+        max_backoff (int): The maximum seconds between two attempts of an entry.
+        processed (int): The number of entries applied since the indexer was created.
+        failed (int): The number of failed attempts since the indexer was created.
+        last_drained_at (datetime | None): When the last batch was applied.
+
+    Methods:
+        drain(): Applies one batch of available entries.
+        start(): Starts draining in a background thread.
+        stop(): Stops the background thread.
+
+    Example:
+        ```python
+        indexer = OutboxIndexer(app)
+        indexer.start()
+        ```
+    """
+
+    def __init__(
+        self,
+        app: Flask,
+        batch_size: int = BATCH_SIZE,
+        interval: float = POLL_INTERVAL,
+        max_backoff: int = MAX_BACKOFF,
+    ) -> None:
+        self.app = app
+        self.batch_size = batch_size
+        self.interval = interval
+        self.max_backoff = max_backoff
+        self.processed = 0
+        self.failed = 0
+        self.last_drained_at: datetime | None = None
+        self._stopped = Event()
+        self._thread: Thread | None = None
+
+    def drain(self) -> int:
+        """
+        Applies one batch of available entries.
+
+        Must be called within an application context. Once entries are applied, the generation
+        of the outbox table is bumped, so that responses cached from searches made before the
+        documents changed are stale.
+
+        Returns:
+            int: The number of entries drained, applied or postponed.
+        """
+
+        with Session(db.engine) as session:
+            entries = session.scalars(
+                select(OutboxEntry)
+                .where(OutboxEntry.available_at <= _now())
+                .order_by(OutboxEntry.id)
+                .limit(self.batch_size)
+            ).all()
+            if not entries:
+                return 0
+
+            failed_docs = self._apply(session, entries)
+            done = [e.id for e in entries if (e.index, e.doc_id) not in failed_docs]
+            retried = [e for e in entries if (e.index, e.doc_id) in failed_docs]
+
+            session.execute(delete(OutboxEntry).where(OutboxEntry.id.in_(done)))
+            for entry in retried:
+                delay = min(self.max_backoff, 2**entry.attempts)
+                session.execute(
+                    sql_update(OutboxEntry)
+                    .where(OutboxEntry.id == entry.id)
+                    .values(
+                        attempts=entry.attempts + 1,
+                        available_at=_now() + timedelta(seconds=delay),
+                    )
+                )
+            session.commit()
+
+        if done:
+            generations.bump(OutboxEntry.__tablename__)
+        self.processed += len(done)
+        self.failed += len(retried)
+        self.last_drained_at = _now()
+        return len(entries)
+
+    def _apply(self, session: Session, entries: list[OutboxEntry]) -> set[tuple[str, str]]:
+        ids_by_index: dict[str, set[str]] = {}
+        for entry in entries:
+            ids_by_index.setdefault(entry.index, set()).add(entry.doc_id)
+
+        actions, failed = [], set()
+        for index, ids in ids_by_index.items():
+            if index not in _builders:
+                logger.error(f"No document builder registered for index {index}")
+                failed.update((index, id_) for id_ in ids)
+                continue
+            actions.extend(_builders[index](session, sorted(ids)))
+
+        try:
+            for index in ids_by_index:
+                indices.ensure(index)
+            # * indices being rebuilt get the writes too, not to miss them once swapped in
+            rebuilding = indices.rebuilding(list(ids_by_index))
+            actions.extend(
+                {**action, "_index": rebuilding[action["_index"]]}
+                for action in list(actions)
+                if action["_index"] in rebuilding
+            )
+            _, errors = helpers.bulk(es, actions, raise_on_error=False)
+            # * searches see the documents before the responses cached from them go stale
+            es.indices.refresh(index=list(ids_by_index))
+        except Exception as err:
+            logger.error(f"Error applying the search outbox: {err}")
+            return {(entry.index, entry.doc_id) for entry in entries}
+
+        for error in errors:
+            ((op, item),) = error.items()
+            if op == "delete" and item.get("status") == 404:
+                continue
+            logger.error(f"Error applying the search outbox: {error}")
+            failed.add((_index_name(item["_index"], ids_by_index), item["_id"]))
+        return failed
+
+    def start(self) -> None:
+        """
+        Starts draining in a background daemon thread.
+
+        Returns:
+            None
+        """
+
+        self._stopped.clear()
+        self._thread = Thread(target=self._run, name="outbox-indexer", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Stops the background thread once its current batch is applied.
+
+        Returns:
+            None
+        """
+
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self) -> None:
+        with self.app.app_context():
+            while not self._stopped.is_set():
+                try:
+                    drained = self.drain()
+                except Exception as err:
+                    logger.error(f"Error draining the search outbox: {err}")
+                    drained = 0
+                if drained < self.batch_size:
+                    self._stopped.wait(self.interval)
+
+
+def _index_name(index: str, names: Iterable[str]) -> str:
+    # * bulk items name the concrete index, `<name>_v<n>_<timestamp>` behind an alias
+    for name in names:
+        if index == name or index.startswith(f"{name}_v"):
+            return name
+    return index
+
+
+def outbox_metrics(indexer: OutboxIndexer | None = None) -> dict:
+    """
+    Measures how far Elasticsearch lags behind the database.
+
+    Args:
+        indexer (OutboxIndexer | None): The indexer of this process, whose counters are added.
+
+    Returns:
+        dict: The number of pending and retried entries, and the age in seconds of the oldest one.
+    """
+
+    pending, retried, oldest = db.session.execute(
+        select(
+            func.count(OutboxEntry.id),
+            func.sum(case((OutboxEntry.attempts > 0, 1), else_=0)),
+            func.min(OutboxEntry.created_at),
+        )
+    ).one()
+
+    metrics = {
+        "pending": pending,
+        "retried": retried or 0,
+        "lag_seconds": 0.0 if oldest is None else (_now() - oldest).total_seconds(),
+    }
+    if indexer is not None:
+        metrics.update(
+            processed=indexer.processed,
+            failed=indexer.failed,
+            last_drained_at=indexer.last_drained_at and indexer.last_drained_at.isoformat(),
+        )
+    return metrics
+
+
+indexer: OutboxIndexer | None = None
+
+
+def setup_outbox(app: Flask) -> None:
+    """
+    Enables the outbox when searches run on Elasticsearch, creating its table in databases
+    made before it, and starts the indexer of this process when the config asks for it.
+
+    Args:
+        app (Flask): The application to read the config from.
+
+    Returns:
+        None
+    """
+
+    global enabled, indexer
+    enabled = app.config["SEARCH_BACKEND"] == "elasticsearch"
+    if enabled:
+        # * every write records its entries, `db.create_all()` only runs when resetting
+        with app.app_context():
+            OutboxEntry.__table__.create(db.engine, checkfirst=True)
+    if enabled and app.config["SEARCH_OUTBOX_WORKER"]:
+        indexer = OutboxIndexer(app, interval=app.config["SEARCH_OUTBOX_INTERVAL"])
+        indexer.start()
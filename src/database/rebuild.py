@@ -0,0 +1,131 @@
+# SPDX-License-Identifier: MIT
+# --------------------------------------------------------------
+# |																|
+# |             Copyright 2023 - 2023, Amulya Paritosh			|
+# |																|
+# |  This file is part of Component Library Plugin for FreeCAD.	|
+# |																|
+# |               This file was created as a part of				|
+# |              Google Summer Of Code Program - 2023			|
+# |																|
+# --------------------------------------------------------------
+
+from typing import Callable, Iterator
+
+from elasticsearch import helpers
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from ..log import logger
+from .definations import db, es
+from .indices import indices
+
+REINDEX_CHUNK_SIZE = 1000
+REINDEX_WORKERS = 4
+
+Source = Callable[[Session, int], Iterator[tuple[str, dict]]]
+
+_sources: dict[str, tuple[type, Source]] = {}
+
+
+def register_source(index: str, model: type, source: Source) -> None:
+    """
+    Registers how every document of an index is streamed from the database.
+
+    Args:
+        index (str): The Elasticsearch index.
+        model (type): The model whose rows the documents are made of, one per row.
+        source (Source): Called with a session and a chunk size, yields the id and source of
+            every document, reading the rows `chunk_size` at a time.
+
+    Returns:
+        None
+    """
+
+    _sources[index] = (model, source)
+
+
+def reindex(name: str, workers: int = REINDEX_WORKERS, chunk_size: int = REINDEX_CHUNK_SIZE) -> int:
+    """
+    Rebuilds an index from the database without interrupting searches.
+
+    The documents are loaded into a new version of the index, refresh disabled, by `workers`
+    bulk requests in parallel, while searches keep using the current index. The search outbox
+    copies its writes into the new index meanwhile, and the streamed documents never overwrite
+    them. The alias of the index is then moved to the new index in one atomic request.
+
+    Args:
+        name (str): The name of the index.
+        workers (int, optional): The number of bulk requests run in parallel.
+            Defaults to REINDEX_WORKERS.
+        chunk_size (int, optional): The number of rows read and documents sent at a time.
+            Defaults to REINDEX_CHUNK_SIZE.
+
+    Returns:
+        int: The number of documents indexed.
+
+    Raises:
+        ValueError: Raised when the index has no registered source, or when documents could
+            not be indexed, the current index being left in use.
+
+    Example:
+        ```python
+        count = reindex("metadatas", workers=8)
+        ```
+    """
+
+    if name not in _sources:
+        raise ValueError(f"No document source registered for index {name}")
+    model, source = _sources[name]
+
+    new_index = indices.start_rebuild(name)
+    try:
+        streamed, errors = _load(new_index, source, workers, chunk_size)
+        if errors:
+            raise ValueError(f"{errors} documents could not be indexed into {new_index}")
+
+        # * rows deleted after they were streamed, whose deletion the outbox may have missed
+        with Session(db.engine) as session:
+            existing = {str(id_) for id_ in session.scalars(select(model.id))}
+        helpers.bulk(
+            es,
+            (
+                {"_op_type": "delete", "_index": new_index, "_id": id_}
+                for id_ in streamed - existing
+            ),
+            raise_on_error=False,
+        )
+    except Exception:
+        indices.abort_rebuild(new_index)
+        raise
+
+    replaced = indices.finish_rebuild(name, new_index)
+    logger.info(f"{name} rebuilt into {new_index}, replacing {replaced}")
+    return len(streamed & existing)
+
+
+def _load(new_index: str, source: Source, workers: int, chunk_size: int) -> tuple[set[str], int]:
+    streamed: set[str] = set()
+    # * the actions are read by a thread of the bulk pool, outside the app context
+    engine = db.engine
+
+    def actions() -> Iterator[dict]:
+        with Session(engine) as session:
+            for id_, document in source(session, chunk_size):
+                streamed.add(id_)
+                yield {
+                    "_op_type": "create",
+                    "_index": new_index,
+                    "_id": id_,
+                    "_source": document,
+                }
+
+    errors = 0
+    for ok, item in helpers.parallel_bulk(
+        es, actions(), thread_count=workers, chunk_size=chunk_size, raise_on_error=False
+    ):
+        # * documents the outbox wrote meanwhile are newer than the streamed ones
+        if not ok and item.get("create", {}).get("status") != 409:
+            logger.error(f"Error reindexing {new_index}: {item}")
+            errors += 1
+    return streamed, errors
@@ -0,0 +1,233 @@
+# SPDX-License-Identifier: MIT
+# --------------------------------------------------------------
+# |																|
+# |             Copyright 2023 - 2023, Amulya Paritosh			|
+# |																|
+# |  This file is part of Component Library Plugin for FreeCAD.	|
+# |																|
+# |               This file was created as a part of				|
+# |              Google Summer Of Code Program - 2023			|
+# |																|
+# --------------------------------------------------------------
+
+from functools import partial
+from threading import Lock
+from time import monotonic, perf_counter
+
+from elasticsearch import ApiError, TransportError
+from elasticsearch._sync.client._base import NamespacedClient
+from flask import g, has_app_context
+
+# * the calls searches are made of, bounded by the search deadline
+SEARCH_METHODS = ("search", "count", "msearch", "open_point_in_time", "close_point_in_time")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """
+    Raised instead of calling Elasticsearch while the circuit breaker is open.
+    """
+
+
+# * what a search falls back to SQL on, API errors only when `is_search_unavailable`
+SEARCH_UNAVAILABLE_ERRORS = (CircuitOpenError, TransportError, ApiError)
+
+
+def is_search_unavailable(err: Exception) -> bool:
+    """
+    Returns whether an error of an Elasticsearch call means that the cluster is unavailable,
+    rather than that the request is wrong.
+
+    Args:
+        err (Exception): The error raised by the call.
+
+    Returns:
+        bool: True for connection errors, an open circuit breaker, and API errors of status
+            429 or 5xx; False for the other API errors, such as a malformed query.
+    """
+
+    if isinstance(err, ApiError):
+        return err.status_code == 429 or err.status_code >= 500
+    return isinstance(err, (CircuitOpenError, TransportError))
+
+
+class CircuitBreaker:
+    """
+    Stops calling Elasticsearch once it keeps failing or answering slowly, and tries it again
+    after a while.
+
+    A call fails when it raises a transport error, gets a 429 or 5xx response, or takes longer
+    than `latency_threshold` seconds. After `failure_threshold` failures in a row the breaker
+    opens and calls are refused right away; after `reset_timeout` seconds a single call is let
+    through, closing the breaker if it succeeds and opening it again if it fails.
+
+    Attributes:
+        failure_threshold (int): The number of failures in a row opening the breaker.
+        latency_threshold (float): The seconds above which a search call counts as failed.
+        reset_timeout (float): The seconds the breaker stays open before a trial call.
+
+    Methods:
+        allow(): Returns whether a call may be made now.
+        record(seconds, failed): Records the outcome of a call.
+        metrics(): Returns the state and counters of the breaker.
+
+    Example:
+        ```python
+        breaker = CircuitBreaker(failure_threshold=5, latency_threshold=1.0)
+        es = GuardedClient(Elasticsearch(url), breaker, deadline=2.0)
+        ```
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        latency_threshold: float = 1.0,
+        reset_timeout: float = 30.0,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.latency_threshold = latency_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened = 0
+        self.refused = 0
+        self._opened_at = 0.0
+        self._lock = Lock()
+
+    def allow(self) -> bool:
+        """
+        Returns whether a call may be made now, letting a single trial call through once the
+        breaker has been open for `reset_timeout` seconds.
+
+        Returns:
+            bool: False while the breaker is open.
+        """
+
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = HALF_OPEN
+                return True
+            self.refused += 1
+            return False
+
+    def record(self, seconds: float, failed: bool) -> None:
+        """
+        Records the outcome of a call.
+
+        Args:
+            seconds (float): How long the call took.
+            failed (bool): Whether the call failed.
+
+        Returns:
+            None
+        """
+
+        with self._lock:
+            if not failed:
+                self.state = CLOSED
+                self.failures = 0
+                return
+
+            self.failures += 1
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    self.opened += 1
+                self.state = OPEN
+                self._opened_at = monotonic()
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {
+                "state": self.state,
+                "failures": self.failures,
+                "opened": self.opened,
+                "refused": self.refused,
+            }
+
+
+class GuardedClient:
+    """
+    Wraps an Elasticsearch client so that every call goes through a circuit breaker, and
+    search calls are bounded by a deadline.
+
+    The other calls, such as bulk requests, keep the timeout of the client. Namespaces such as
+    `indices` and the clients returned by `options` are wrapped too, so the wrapper can be used
+    wherever the client is, including the bulk helpers.
+
+    Args:
+        client: The Elasticsearch client, or one of its namespaces.
+        breaker (CircuitBreaker): The breaker of the cluster.
+        deadline (float): The timeout of search calls in seconds.
+
+    Raises:
+        CircuitOpenError: Raised by calls made while the breaker is open.
+    """
+
+    def __init__(self, client, breaker: CircuitBreaker, deadline: float) -> None:
+        self._client = client
+        self._breaker = breaker
+        self._deadline = deadline
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._client, name)
+        if isinstance(attr, NamespacedClient):
+            return GuardedClient(attr, self._breaker, self._deadline)
+        if name == "options":
+            return lambda **kwargs: GuardedClient(attr(**kwargs), self._breaker, self._deadline)
+        if callable(attr) and not name.startswith("_"):
+            return partial(self._call, name)
+        return attr
+
+    def _call(self, _method: str, /, *args, **kwargs):
+        # * positional only, Elasticsearch calls take a `name` argument of their own
+        if not self._breaker.allow():
+            raise CircuitOpenError("Elasticsearch is unavailable, its circuit breaker is open")
+
+        client = self._client
+        is_search = _method in SEARCH_METHODS and not isinstance(client, NamespacedClient)
+        if is_search:
+            client = client.options(request_timeout=self._deadline)
+
+        start = perf_counter()
+        try:
+            result = getattr(client, _method)(*args, **kwargs)
+        except TransportError:
+            self._breaker.record(perf_counter() - start, failed=True)
+            raise
+        except ApiError as err:
+            self._breaker.record(perf_counter() - start, failed=is_search_unavailable(err))
+            raise
+
+        seconds = perf_counter() - start
+        self._breaker.record(
+            seconds, failed=is_search and seconds > self._breaker.latency_threshold
+        )
+        return result
+
+
+def mark_degraded() -> None:
+    """
+    Records that the search of the current request fell back to SQL.
+
+    Returns:
+        None
+    """
+
+    if has_app_context():
+        g.search_degraded = True
+
+
+def is_degraded() -> bool:
+    """
+    Returns whether the search of the current request fell back to SQL.
+
+    Returns:
+        bool: True when Elasticsearch was unavailable.
+    """
+
+    return has_app_context() and g.get("search_degraded", False)
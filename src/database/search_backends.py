@@ -0,0 +1,255 @@
+# SPDX-License-Identifier: MIT
+# --------------------------------------------------------------
+# |																|
+# |             Copyright 2023 - 2023, Amulya Paritosh			|
+# |																|
+# |  This file is part of Component Library Plugin for FreeCAD.	|
+# |																|
+# |               This file was created as a part of				|
+# |              Google Summer Of Code Program - 2023			|
+# |																|
+# --------------------------------------------------------------
+
+import re
+
+from flask import Flask
+from sqlalchemy import (
+    DDL,
+    Float,
+    Table,
+    event,
+    func,
+    inspect,
+    literal_column,
+    select,
+    text,
+)
+from sqlalchemy.engine import Connection
+
+from ..log import logger
+from .definations import db
+from .resilience import SEARCH_UNAVAILABLE_ERRORS, is_search_unavailable, mark_degraded
+from .staged_search import staged_search
+
+FULLTEXT_DIALECTS = ("sqlite", "postgresql")
+
+
+class SearchBackend:
+    """
+    Finds the rows of a searchable model matching a search key.
+
+    The backend in use is chosen by `Config.SEARCH_BACKEND` and set on `ElasticSearchBase`
+    by `setup_search`; models are searched through `ElasticSearchBase.search`.
+
+    Methods:
+        setup(app): Prepares the backend for the application.
+        search(model, search_key): Searches the rows of the model.
+    """
+
+    def setup(self, app: Flask) -> None:
+        """
+        Prepares the backend for the application.
+
+        Args:
+            app (Flask): The application.
+
+        Returns:
+            None
+        """
+
+    def search(self, model, search_key: str):
+        """
+        Searches the rows of the model.
+
+        Args:
+            model: The searchable model class.
+            search_key (str): The key to search for.
+
+        Returns:
+            The result of the model's own search method for this backend.
+        """
+
+        raise NotImplementedError
+
+
+class ElasticsearchBackend(SearchBackend):
+    """
+    Searches the Elasticsearch index of the model, through its `elasticsearch` method.
+
+    When Elasticsearch is unavailable or its circuit breaker is open, the model is searched in
+    SQL by its `sql_search` method instead, and the request is marked as degraded. Errors of
+    the request itself, such as a malformed query, are raised.
+    """
+
+    def search(self, model, search_key: str):
+        try:
+            return model.elasticsearch(search_key)
+        except SEARCH_UNAVAILABLE_ERRORS as err:
+            if not is_search_unavailable(err):
+                raise
+            logger.warning(f"Searching {model.__tablename__} in SQL, Elasticsearch failed: {err}")
+            mark_degraded()
+            return model.sql_search(search_key)
+
+
+class FullTextBackend(SearchBackend):
+    """
+    Searches the database itself, through the `fulltext` method of the model.
+
+    Models declaring a `__fulltext__` column are indexed by the database: an FTS5 table kept
+    in sync by triggers on SQLite, and a GIN index over the column's tsvector on PostgreSQL.
+    The indices are created along with the tables, or at setup for existing databases.
+    """
+
+    def setup(self, app: Flask) -> None:
+        with app.app_context():
+            dialect = db.engine.dialect.name
+        if dialect not in FULLTEXT_DIALECTS:
+            raise ValueError(f"Full text search is not supported on {dialect}")
+
+        tables = [
+            (mapper.local_table, mapper.class_.__fulltext__)
+            for mapper in db.Model.registry.mappers
+            if getattr(mapper.class_, "__fulltext__", None)
+        ]
+
+        for table, column in tables:
+            for ddl in _fulltext_ddl(table, column):
+                event.listen(table, "after_create", ddl)
+            event.listen(
+                table,
+                "after_drop",
+                DDL(f"DROP TABLE IF EXISTS {table.name}_fts").execute_if(dialect="sqlite"),
+            )
+
+        with app.app_context(), db.engine.begin() as connection:
+            for table, column in tables:
+                if inspect(connection).has_table(table.name):
+                    _create_fulltext(connection, table, column)
+
+    def search(self, model, search_key: str):
+        return model.fulltext(search_key)
+
+
+BACKENDS: dict[str, type[SearchBackend]] = {
+    "elasticsearch": ElasticsearchBackend,
+    "fts": FullTextBackend,
+}
+
+
+def make_search_backend(name: str) -> SearchBackend:
+    """
+    Creates the search backend selected by name.
+
+    Args:
+        name (str): One of "elasticsearch" or "fts".
+
+    Returns:
+        SearchBackend: The backend.
+
+    Raises:
+        ValueError: Raised when the backend name is unknown.
+    """
+
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown search backend {name}")
+    return BACKENDS[name]()
+
+
+def setup_search(app: Flask) -> None:
+    """
+    Configures the search backend of the models, and the threshold of staged searches, from
+    the application config.
+
+    Args:
+        app (Flask): The application to read the config from.
+
+    Returns:
+        None
+    """
+
+    from .base import ElasticSearchBase
+
+    backend = make_search_backend(app.config["SEARCH_BACKEND"])
+    backend.setup(app)
+    ElasticSearchBase.search_backend = backend
+    staged_search.min_hits = app.config["SEARCH_MIN_HITS"]
+
+
+def fulltext_rank(model, words: list[str]) -> list[tuple[str, float]]:
+    """
+    Ranks the rows of a model whose `__fulltext__` column contains a word starting with one
+    of the given words.
+
+    Args:
+        model: The model class declaring `__fulltext__`.
+        words (list[str]): The words to search for.
+
+    Returns:
+        list[tuple[str, float]]: The ids and scores of the matching rows, best first.
+
+    Example:
+        ```python
+        hits = fulltext_rank(Metadata, ["cable", "tie"])
+        ```
+    """
+
+    words = [word for word in (re.sub(r"\W", "", word) for word in words) if word]
+    if not words:
+        return []
+
+    table: Table = model.__table__
+    if db.engine.dialect.name == "sqlite":
+        fts = f"{table.name}_fts"
+        query = text(
+            f"SELECT id, -bm25({fts}) AS score FROM {fts} "
+            f"WHERE {fts} MATCH :match ORDER BY bm25({fts})"
+        ).columns(id=table.c.id.type, score=Float)
+        match = " OR ".join(f'"{word}"*' for word in words)
+        rows = db.session.execute(query, {"match": match})
+    else:
+        vector = func.to_tsvector(literal_column("'simple'"), table.c[model.__fulltext__])
+        tsquery = func.to_tsquery(
+            literal_column("'simple'"), " | ".join(f"{word}:*" for word in words)
+        )
+        score = func.ts_rank(vector, tsquery)
+        rows = db.session.execute(
+            select(table.c.id, score).where(vector.op("@@")(tsquery)).order_by(score.desc())
+        )
+
+    return [(str(id_), float(score)) for id_, score in rows]
+
+
+def _fulltext_ddl(table: Table, column: str) -> list[DDL]:
+    fts = f"{table.name}_fts"
+    sqlite = [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(id UNINDEXED, {column})",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_insert AFTER INSERT ON {table.name} BEGIN "
+        f"INSERT INTO {fts}(id, {column}) VALUES (new.id, new.{column}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_update AFTER UPDATE OF {column} ON {table.name} "
+        f"BEGIN UPDATE {fts} SET {column} = new.{column} WHERE id = old.id; END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_delete AFTER DELETE ON {table.name} BEGIN "
+        f"DELETE FROM {fts} WHERE id = old.id; END",
+    ]
+    postgresql = [
+        f"CREATE INDEX IF NOT EXISTS {fts} ON {table.name} "
+        f"USING gin (to_tsvector('simple', {column}))",
+    ]
+
+    return [DDL(statement).execute_if(dialect="sqlite") for statement in sqlite] + [
+        DDL(statement).execute_if(dialect="postgresql") for statement in postgresql
+    ]
+
+
+def _create_fulltext(connection: Connection, table: Table, column: str) -> None:
+    fts = f"{table.name}_fts"
+    is_new = connection.dialect.name == "sqlite" and not inspect(connection).has_table(fts)
+
+    for ddl in _fulltext_ddl(table, column):
+        ddl(table, connection)
+
+    if is_new:
+        # * rows written before the triggers existed
+        connection.execute(
+            text(f"INSERT INTO {fts}(id, {column}) SELECT id, {column} FROM {table.name}")
+        )
@@ -0,0 +1,138 @@
+# SPDX-License-Identifier: MIT
+# --------------------------------------------------------------
+# |																|
+# |             Copyright 2023 - 2023, Amulya Paritosh			|
+# |																|
+# |  This file is part of Component Library Plugin for FreeCAD.	|
+# |																|
+# |               This file was created as a part of				|
+# |              Google Summer Of Code Program - 2023			|
+# |																|
+# --------------------------------------------------------------
+
+from threading import Lock
+from time import perf_counter
+from typing import Any, Callable, NamedTuple, Optional
+
+MIN_HITS = 10
+
+
+class SearchStage(NamedTuple):
+    """
+    A stage of a staged search: its name, for the metrics, its Elasticsearch query, and the
+    number of hits under which the search escalates past it, `StagedSearch.min_hits` when None.
+    """
+
+    name: str
+    query: dict
+    min_hits: Optional[int] = None
+
+
+class StagedSearch:
+    """
+    Runs the stages of a search, cheapest first, until one of them finds enough hits, and
+    returns the result of that stage, so that no search is repeated.
+
+    Each stage should match everything the previous ones match and score those hits the same
+    way, so that the hits of the stage a search stops at are ranked consistently; the last
+    stage is returned whatever its number of hits.
+
+    The runs, escalations, hits and latency of every stage are recorded per index.
+
+    Attributes:
+        min_hits (int): The number of hits under which a search escalates to its next stage,
+            for the stages without a threshold of their own.
+
+    Methods:
+        run(index, stages, search, count): Runs the stages until one finds enough hits.
+        metrics(): Returns the recorded statistics of every stage.
+        reset(): Forgets the recorded statistics.
+
+    Example:
+        ```python
+        stage, hits = staged_search.run(
+            "metadatas",
+            Metadata.search_stages("cable tie"),
+            lambda query: Metadata.search_ids("metadatas", query),
+        )
+        ```
+    """
+
+    def __init__(self, min_hits: int = MIN_HITS) -> None:
+        self.min_hits = min_hits
+        self._stats: dict[tuple[str, str], dict] = {}
+        self._lock = Lock()
+
+    def run(
+        self,
+        index: str,
+        stages: list[SearchStage],
+        search: Callable[[dict], Any],
+        count: Callable[[Any], int] = len,
+    ) -> tuple[SearchStage, Any]:
+        """
+        Runs the stages until one finds at least the `min_hits` of the stage.
+
+        Args:
+            index (str): The index searched, under which the statistics are recorded.
+            stages (list[SearchStage]): The stages, cheapest first.
+            search (Callable[[dict], Any]): Runs a query and returns its result.
+            count (Callable[[Any], int], optional): Returns the number of hits of a result.
+                Defaults to `len`, for searches returning their hits.
+
+        Returns:
+            tuple[SearchStage, Any]: The stage the search stopped at, and its result.
+        """
+
+        for position, stage in enumerate(stages):
+            start = perf_counter()
+            result = search(stage.query)
+            hits = count(result)
+            min_hits = self.min_hits if stage.min_hits is None else stage.min_hits
+            escalated = hits < min_hits and position < len(stages) - 1
+            self._record(index, stage.name, perf_counter() - start, hits, escalated)
+            if not escalated:
+                return stage, result
+        raise ValueError("A staged search needs at least one stage")
+
+    def _record(self, index: str, stage: str, seconds: float, hits: int, escalated: bool) -> None:
+        with self._lock:
+            stats = self._stats.setdefault(
+                (index, stage),
+                {"runs": 0, "escalations": 0, "hits": 0, "seconds": 0.0, "max_seconds": 0.0},
+            )
+            stats["runs"] += 1
+            stats["escalations"] += escalated
+            stats["hits"] += hits
+            stats["seconds"] += seconds
+            stats["max_seconds"] = max(stats["max_seconds"], seconds)
+
+    def metrics(self) -> dict:
+        """
+        Returns the recorded statistics of every stage.
+
+        Returns:
+            dict: Per index and stage, the number of runs and escalations, and the mean hits
+                and mean and max latency in milliseconds.
+        """
+
+        with self._lock:
+            stats = {key: dict(value) for key, value in self._stats.items()}
+
+        metrics: dict[str, dict] = {}
+        for (index, stage), value in stats.items():
+            metrics.setdefault(index, {})[stage] = {
+                "runs": value["runs"],
+                "escalations": value["escalations"],
+                "mean_hits": value["hits"] / value["runs"],
+                "mean_ms": 1000 * value["seconds"] / value["runs"],
+                "max_ms": 1000 * value["max_seconds"],
+            }
+        return metrics
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+
+staged_search = StagedSearch()
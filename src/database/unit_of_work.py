@@ -0,0 +1,49 @@
+# SPDX-License-Identifier: MIT
+# --------------------------------------------------------------
+# |																|
+# |             Copyright 2023 - 2023, Amulya Paritosh			|
+# |																|
+# |  This file is part of Component Library Plugin for FreeCAD.	|
+# |																|
+# |               This file was created as a part of				|
+# |              Google Summer Of Code Program - 2023			|
+# |																|
+# --------------------------------------------------------------
+
+from contextlib import contextmanager
+from typing import Iterator
+
+from sqlalchemy.orm import Session
+
+from .definations import db
+
+
+@contextmanager
+def unit_of_work() -> Iterator[Session]:
+    """
+    Runs a block as one transaction: everything it adds to the session is flushed and
+    committed together when it completes, and rolled back when it raises. Queries made in the
+    block do not flush the pending changes.
+
+    The search outbox entries of the written rows are part of the same transaction, so the
+    documents are indexed in one batch once it commits, and not at all when it fails.
+
+    Yields:
+        Session: The session of the application.
+
+    Example:
+        ```python
+        with unit_of_work() as session:
+            session.add(metadata)
+            metadata.files.append(file)
+        ```
+    """
+
+    session = db.session
+    try:
+        with session.no_autoflush:
+            yield session
+        session.commit()
+    except BaseException:
+        session.rollback()
+        raise
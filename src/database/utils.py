@@ -17,7 +17,8 @@ from flask import Flask
 
 from ..config import basedir
 from ..log import logger
-from .definations import db, es
+from .definations import db
+from .indices import indices
 
 
 def setup_db(app: Flask) -> None:
@@ -40,8 +41,8 @@ def clear_db() -> None:
     """
 
     db.drop_all()
-    es.options(ignore_status=[400, 404]).indices.delete(index="metadatas")
-    es.options(ignore_status=[400, 404]).indices.delete(index="attributes")
+    for name in indices.names():
+        indices.delete(name)
 
 
 def clear_data() -> None:
@@ -55,8 +56,7 @@ def clear_data() -> None:
     clear_db()
 
     db.create_all()
-    es.options(ignore_status=[400, 404]).indices.create(index="metadatas")
-    es.options(ignore_status=[400, 404]).indices.create(index="attributes")
+    indices.ensure_all()
 
 
 def pre_entry() -> None:
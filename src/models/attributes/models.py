@@ -1,13 +1,46 @@
 import re
 
-from sqlalchemy.sql.schema import Column, ForeignKey
+from sqlalchemy import or_
+from sqlalchemy.sql.schema import Column, ForeignKey, Index
 from sqlalchemy.types import String
 
 from ...database import ElasticSearchBase
 from ...database.guid import GUID
+from ...database.indices import ANALYSIS_SETTINGS, NORMALIZED_KEYWORD_MAPPING
 from ...log import logger
 
 
+def _parse_filters(search_key: str) -> tuple[dict[str, str], list[str], list[str]]:
+    """
+    Parses the `key:value`, `key:` and `:value` attribute filters of a search key.
+
+    Args:
+        search_key: The key to parse.
+
+    Returns:
+        tuple[dict[str, str], list[str], list[str]]: The key value pairs, the keys only and
+            the values only.
+    """
+
+    search_key += " "
+    pairs: dict[str, str] = {
+        x.split(":")[0].replace("_", " "): x.split(":")[1].replace("_", " ")
+        for x in re.findall(r"(\w+:\w+)", search_key)
+    }
+    keys_only: list[str] = [
+        item.replace("_", " ") for item in re.findall(r"(\w+):[^\w]", search_key)
+    ]
+    values_only: list[str] = [
+        item.replace("_", " ") for item in re.findall(r"[^\w]:(\w+)", search_key)
+    ]
+    # working in (\w* [\w]+:)[^:\w*] for values that catches values that has space(char) in them
+    logger.debug(f"{pairs=}")
+    logger.debug(f"{keys_only=}")
+    logger.debug(f"{values_only=}")
+
+    return pairs, keys_only, values_only
+
+
 class Attribute(ElasticSearchBase):
     """
     Represents an attribute of a component.
@@ -24,63 +57,110 @@ class Attribute(ElasticSearchBase):
 
     __tablename__: str = "attributes"
     __allow_unmapped__ = True
+    __index_settings__: dict = ANALYSIS_SETTINGS
+    __index_mappings__: dict = {
+        "dynamic": False,
+        "properties": {
+            "id": {"type": "keyword", "doc_values": False},
+            "metadata_id": {"type": "keyword", "doc_values": False},
+            "key": NORMALIZED_KEYWORD_MAPPING,
+            "value": NORMALIZED_KEYWORD_MAPPING,
+        },
+    }
 
     key = Column(String(50), nullable=False)
     value = Column(String(200))
 
     metadata_id = Column(GUID(), ForeignKey("metadatas.id"), nullable=False)
 
+    __table_args__ = (
+        Index("ix_attributes_metadata_id", "metadata_id"),
+        # * the `key:value` filters of searches
+        Index("ix_attributes_key_value", "key", "value"),
+    )
+
     @classmethod
     def elasticsearch(cls, search_key: str) -> set[str]:
         """
-        Performs an Elasticsearch search based on the specified search key and returns a set of matching names.
+        Performs an Elasticsearch search based on the specified search key and returns the matching metadata ids.
 
         Args:
             search_key: The key to search for.
 
         Returns:
-            set[str]: A set of matching names.
+            set[str]: The ids of the metadata having a matching attribute.
         """
-        search_key += " "
-        pairs: dict[str, str] = {
-            x.split(":")[0].replace("_", " "): x.split(":")[1].replace("_", " ")
-            for x in re.findall(r"(\w+:\w+)", search_key)
-        }
-        keys_only: list[str] = [
-            item.replace("_", " ") for item in re.findall(r"(\w+):[^\w]", search_key)
-        ]
-        values_only: list[str] = [
-            item.replace("_", " ") for item in re.findall(r"[^\w]:(\w+)", search_key)
-        ]
-        # working in (\w* [\w]+:)[^:\w*] for values that catches values that has space(char) in them
-        logger.debug(f"{pairs=}")
-        logger.debug(f"{keys_only=}")
-        logger.debug(f"{values_only=}")
+
+        query = cls.make_query(search_key)
+        hits = cls.search_ids(cls.__tablename__, query, "metadata_id")
+        logger.debug(f"{hits=}")
+        return {metadata_id for metadata_id, _ in hits}
+
+    @classmethod
+    def fulltext(cls, search_key: str) -> set[str]:
+        """
+        Performs a search of the attributes in the database and returns the matching metadata ids.
+
+        The filters match keys and values exactly, as the index does up to case and accents.
+
+        Args:
+            search_key: The key to search for.
+
+        Returns:
+            set[str]: The ids of the metadata having a matching attribute.
+        """
+
+        pairs, keys_only, values_only = _parse_filters(search_key)
+        keys = [*pairs.keys(), *keys_only]
+        values = [*pairs.values(), *values_only]
+        if not keys and not values:
+            return set()
+
+        query = cls.query.with_entities(cls.metadata_id).filter(
+            or_(cls.key.in_(keys), cls.value.in_(values))
+        )
+        return {str(metadata_id) for metadata_id, in query.distinct()}
+
+    @classmethod
+    def make_query(cls, search_key: str, path: str = "") -> dict:
+        """
+        Makes the Elasticsearch query matching the attributes with the `key:value`, `key:` and
+        `:value` filters of the search key.
+
+        Keys and values are normalized keywords, so the filters are term lookups that ignore
+        case and accents.
+
+        Args:
+            search_key: The key to search for.
+            path: The prefix of the key and value fields, such as "attributes." when the
+                attributes are nested in another document. Defaults to "".
+
+        Returns:
+            dict: The Elasticsearch query.
+        """
+
+        pairs, keys_only, values_only = _parse_filters(search_key)
 
         should_queries = []
 
         if pairs:
             should_queries.extend(
                 [
-                    {"terms": {"key.keyword": list(pairs.keys())}},
-                    {"terms": {"value.keyword": list(pairs.values())}},
+                    {"terms": {f"{path}key": list(pairs.keys())}},
+                    {"terms": {f"{path}value": list(pairs.values())}},
                 ]
             )
         if keys_only:
             should_queries.append(
-                {"terms": {"key.keyword": keys_only}},
+                {"terms": {f"{path}key": keys_only}},
             )
         if values_only:
             should_queries.append(
-                {"terms": {"value.keyword": values_only}},
+                {"terms": {f"{path}value": values_only}},
             )
         # ! when empty list is passed to must, it returns all the attributes
-        query = {
+        return {
             "bool": {
                 "should": should_queries,
             },
         }
-
-        response = super().elasticsearch(cls.__tablename__, query)
-        logger.debug(f"{response=}")
-        return {hit["_source"]["metadata_id"] for hit in response["hits"]["hits"]}
@@ -0,0 +1,3 @@
+from .index import AutocompleteIndex, autocomplete, completion_keys
+from .spelling import SpellingSuggester, SymSpell, spelling, words_of
+from .trie import MAX_COMPLETIONS, PrefixTrie
@@ -0,0 +1,255 @@
+# SPDX-License-Identifier: MIT
+# --------------------------------------------------------------
+# |																|
+# |             Copyright 2023 - 2023, Amulya Paritosh			|
+# |																|
+# |  This file is part of Component Library Plugin for FreeCAD.	|
+# |																|
+# |               This file was created as a part of				|
+# |              Google Summer Of Code Program - 2023			|
+# |																|
+# --------------------------------------------------------------
+
+import re
+from collections import Counter
+from threading import Lock
+
+from sqlalchemy import event, func, inspect, select
+from sqlalchemy.orm import Session
+
+from ...database import db, generations
+from ..metadatas import Metadata
+from ..metadatas.models import metadata_tag
+from ..tags import Tag
+from .trie import MAX_COMPLETIONS, PrefixTrie
+
+WATCHED_TABLES = ("metadatas", "tags")
+
+
+def completion_keys(text: str) -> list[str]:
+    """
+    Returns the keys a text is completed from: the text and every suffix of it starting at a
+    word, lowercased, so that "Cable Tie" completes both "cab" and "tie".
+
+    Args:
+        text (str): The text.
+
+    Returns:
+        list[str]: The keys.
+    """
+
+    text = text.lower()
+    return list(dict.fromkeys(text[match.start() :] for match in re.finditer(r"\w+", text)))
+
+
+class AutocompleteIndex:
+    """
+    Completes prefixes with component names, ranked by rating, and tag labels, ranked by the
+    number of components having them, without reading the database.
+
+    Names are updated in place when a transaction writing metadata commits, and counted so
+    that a name stays completed while any component has it. Tags are reloaded
+    with one grouped query on the next completion after a write changes them, as their
+    popularity depends on the components. Writes made by other processes are seen through
+    the table generations, and trigger a full reload.
+
+    Methods:
+        complete(prefix, kind, limit): Returns the best completions of a prefix.
+        reload(): Reloads both tries from the database.
+        invalidate(): Makes the next completion reload both tries.
+
+    Example:
+        ```python
+        autocomplete.complete("cab", kind="metadata", limit=5)
+        ```
+    """
+
+    def __init__(self) -> None:
+        self._names = PrefixTrie()
+        self._name_counts: Counter[str] = Counter()
+        self._tags = PrefixTrie()
+        self._loaded = False
+        self._tags_stale = False
+        self._seen: tuple[int, ...] = ()
+        self._lock = Lock()
+
+    def complete(self, prefix: str, kind: str = "all", limit: int = 10) -> list[dict]:
+        """
+        Returns the best completions of a prefix.
+
+        Args:
+            prefix (str): The prefix typed.
+            kind (str, optional): "metadata", "tag" or "all". Defaults to "all".
+            limit (int, optional): The most completions per kind. Defaults to 10.
+
+        Returns:
+            list[dict]: The completions, with their kind, value and score, the best first
+                within each kind.
+        """
+
+        prefix = " ".join(prefix.lower().split())
+        limit = min(limit, MAX_COMPLETIONS)
+
+        if not self._loaded or generations.current(*WATCHED_TABLES) != self._seen:
+            self.reload()
+        elif self._tags_stale:
+            self._reload_tags()
+
+        completions = []
+        with self._lock:
+            if kind in ("metadata", "all"):
+                completions += [
+                    {"kind": "metadata", "value": value, "score": score}
+                    for value, score in self._names.complete(prefix, limit)
+                ]
+            if kind in ("tag", "all"):
+                completions += [
+                    {"kind": "tag", "value": value, "score": score}
+                    for value, score in self._tags.complete(prefix, limit)
+                ]
+        return completions
+
+    def reload(self) -> None:
+        """
+        Reloads both tries from the database.
+
+        Returns:
+            None
+        """
+
+        seen = generations.current(*WATCHED_TABLES)
+        names = PrefixTrie()
+        name_counts: Counter[str] = Counter()
+        for name, rating in db.session.execute(select(Metadata.name, Metadata.rating)):
+            name_counts[name] += 1
+            for key in completion_keys(name):
+                names.add(key, name, rating or 0.0)
+        tags = self._load_tags()
+
+        with self._lock:
+            self._names, self._name_counts, self._tags = names, name_counts, tags
+            self._tags_stale = False
+            self._loaded = True
+            self._seen = seen
+
+    def _reload_tags(self) -> None:
+        tags = self._load_tags()
+        with self._lock:
+            self._tags = tags
+            self._tags_stale = False
+
+    def _load_tags(self) -> PrefixTrie:
+        tags = PrefixTrie()
+        rows = db.session.execute(
+            select(Tag.label, func.count(metadata_tag.c.metadata_id))
+            .outerjoin(metadata_tag, metadata_tag.c.tag_id == Tag.id)
+            .group_by(Tag.id, Tag.label)
+        )
+        for label, popularity in rows:
+            for key in completion_keys(label):
+                tags.add(key, label, float(popularity))
+        return tags
+
+    def apply(self, changes: list[tuple], tags_changed: bool) -> None:
+        """
+        Applies the name changes of a committed transaction.
+
+        A name is removed once no component has it anymore, so the operations may come in any
+        order.
+
+        Args:
+            changes (list[tuple]): `("add", name, rating)`, `("score", name, rating)` and
+                `("remove", name)` operations, for components given, rated or losing a name.
+            tags_changed (bool): Whether the transaction changed tags or their components.
+
+        Returns:
+            None
+        """
+
+        with self._lock:
+            if not self._loaded:
+                return
+            for op, name, *rating in changes:
+                if op == "remove":
+                    self._name_counts[name] -= 1
+                    if self._name_counts[name] > 0:
+                        continue
+                    del self._name_counts[name]
+                elif op == "add":
+                    self._name_counts[name] += 1
+                elif not self._name_counts[name]:
+                    continue
+                for key in completion_keys(name):
+                    if op == "remove":
+                        self._names.remove(key, name)
+                    else:
+                        self._names.add(key, name, rating[0] or 0.0)
+            self._tags_stale = self._tags_stale or tags_changed
+            self._seen = generations.current(*WATCHED_TABLES)
+
+    def invalidate(self) -> None:
+        """
+        Makes the next completion reload both tries.
+
+        Returns:
+            None
+        """
+
+        with self._lock:
+            self._loaded = False
+
+
+autocomplete = AutocompleteIndex()
+
+
+def _name_changes(instance: Metadata, is_deleted: bool) -> list[tuple]:
+    state = inspect(instance)
+    if is_deleted:
+        return [("remove", instance.name)]
+    if state.attrs.name.history.deleted or not state.attrs.name.history.unchanged:
+        # * renamed or new
+        removed = [("remove", name) for name in state.attrs.name.history.deleted if name]
+        return removed + [("add", instance.name, instance.rating)]
+    if state.attrs.rating.history.has_changes():
+        return [("score", instance.name, instance.rating)]
+    return []
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_autocomplete_changes(session: Session, flush_context) -> None:
+    changes: list = session.info.setdefault("autocomplete_changes", [])
+    if "metadata_tag" in session.info.get("written_tables", ()):
+        # * tags linked with statements, see `Metadata.add_tags`
+        session.info["autocomplete_tags_changed"] = True
+    for instance in session.new | session.dirty | session.deleted:
+        if isinstance(instance, Metadata):
+            history = inspect(instance).attrs.name.history
+            if history.added and not history.deleted and instance not in session.new:
+                # * renamed without the old name being loaded, it cannot be removed
+                session.info["autocomplete_stale"] = True
+            changes.extend(_name_changes(instance, instance in session.deleted))
+            if (
+                instance in session.new
+                or instance in session.deleted
+                or inspect(instance).attrs.tags.history.has_changes()
+            ):
+                session.info["autocomplete_tags_changed"] = True
+        elif isinstance(instance, Tag):
+            session.info["autocomplete_tags_changed"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_autocomplete_changes(session: Session) -> None:
+    changes = session.info.pop("autocomplete_changes", [])
+    tags_changed = session.info.pop("autocomplete_tags_changed", False)
+    if session.info.pop("autocomplete_stale", False):
+        autocomplete.invalidate()
+    elif changes or tags_changed:
+        autocomplete.apply(changes, tags_changed)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_autocomplete_changes(session: Session) -> None:
+    session.info.pop("autocomplete_changes", None)
+    session.info.pop("autocomplete_tags_changed", None)
+    session.info.pop("autocomplete_stale", None)
@@ -0,0 +1,41 @@
+# SPDX-License-Identifier: MIT
+# --------------------------------------------------------------
+# |																|
+# |             Copyright 2023 - 2023, Amulya Paritosh			|
+# |																|
+# |  This file is part of Component Library Plugin for FreeCAD.	|
+# |																|
+# |               This file was created as a part of				|
+# |              Google Summer Of Code Program - 2023			|
+# |																|
+# --------------------------------------------------------------
+
+from flask import abort
+
+from .index import autocomplete
+
+KINDS = ("all", "metadata", "tag")
+
+
+def complete(prefix: str, kind: str = "all", limit: int = 10):
+    """
+    Completes a prefix typed in a search box with component names and tag labels.
+
+    Args:
+            prefix (str): The prefix typed.
+            kind (str): "metadata", "tag" or "all". Defaults to "all".
+            limit (int): The most completions per kind. Defaults to 10.
+
+    Returns:
+            list[dict]: The completions, with their kind, value and score.
+
+    Example:
+            ```python
+            completions = complete(prefix="cab", kind="metadata")
+            ```
+    """
+
+    if kind not in KINDS:
+        abort(400, f"Unknown kind {kind}")
+
+    return autocomplete.complete(prefix, kind, limit)
@@ -0,0 +1,309 @@
+# SPDX-License-Identifier: MIT
+# --------------------------------------------------------------
+# |																|
+# |             Copyright 2023 - 2023, Amulya Paritosh			|
+# |																|
+# |  This file is part of Component Library Plugin for FreeCAD.	|
+# |																|
+# |               This file was created as a part of				|
+# |              Google Summer Of Code Program - 2023			|
+# |																|
+# --------------------------------------------------------------
+
+import re
+from collections import Counter
+from itertools import chain
+from threading import Lock
+from typing import Iterable, Optional
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+
+from ...database import db, generations
+from ..attributes import Attribute
+from ..metadatas import Metadata
+from ..tags import Tag
+
+MAX_DISTANCE = 2
+PREFIX_LENGTH = 7
+MIN_WORD_LENGTH = 3
+
+WATCHED_TABLES = ("metadatas", "tags", "attributes")
+
+# * the model attribute whose words make the dictionary
+_WORD_SOURCES = ((Metadata, "name"), (Tag, "label"), (Attribute, "key"))
+
+
+def words_of(text: Optional[str]) -> list[str]:
+    """
+    Splits a text into the lowercased words the dictionary is made of.
+
+    Args:
+        text (str | None): The text.
+
+    Returns:
+        list[str]: The words.
+    """
+
+    return re.findall(r"[a-z0-9]+", (text or "").lower())
+
+
+class SymSpell:
+    """
+    A dictionary of words with their frequency, indexed by the words they give when up to
+    `max_distance` characters are deleted from them, as SymSpell does.
+
+    Looking a word up only generates the deletes of the word itself, so it costs the same
+    whatever the size of the dictionary. Only the first `prefix_length` characters of the
+    words are indexed, which bounds the index while long words still differ by their end.
+
+    Attributes:
+        max_distance (int): The largest edit distance of a correction.
+        prefix_length (int): The number of leading characters indexed.
+
+    Methods:
+        add(word, count): Adds occurrences of a word.
+        remove(word, count): Removes occurrences of a word.
+        correct(word): Returns the closest, then most frequent, word of the dictionary.
+
+    Example:
+        ```python
+        symspell = SymSpell()
+        symspell.add("cable")
+        symspell.correct("cabel")  # "cable"
+        ```
+    """
+
+    def __init__(self, max_distance: int = MAX_DISTANCE, prefix_length: int = PREFIX_LENGTH):
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        self._counts: Counter[str] = Counter()
+        self._deletes: dict[str, set[str]] = {}
+
+    def add(self, word: str, count: int = 1) -> None:
+        if not self._counts[word]:
+            for variant in self._variants(word):
+                self._deletes.setdefault(variant, set()).add(word)
+        self._counts[word] += count
+
+    def remove(self, word: str, count: int = 1) -> None:
+        self._counts[word] -= count
+        if self._counts[word] > 0:
+            return
+
+        del self._counts[word]
+        for variant in self._variants(word):
+            words = self._deletes.get(variant)
+            if words is not None:
+                words.discard(word)
+                if not words:
+                    del self._deletes[variant]
+
+    def correct(self, word: str) -> Optional[str]:
+        """
+        Returns the closest word of the dictionary, the most frequent among equally close ones.
+
+        Args:
+            word (str): The word, lowercased.
+
+        Returns:
+            str | None: The word itself when known, its correction, or None when no word of
+                the dictionary is within `max_distance`.
+        """
+
+        if word in self._counts:
+            return word
+
+        best: Optional[tuple[int, int, str]] = None
+        candidates = set(
+            chain.from_iterable(self._deletes.get(v, ()) for v in self._variants(word))
+        )
+        for candidate in candidates:
+            distance = _edit_distance(word, candidate, self.max_distance)
+            if distance is None:
+                continue
+            key = (distance, -self._counts[candidate], candidate)
+            if best is None or key < best:
+                best = key
+        return None if best is None else best[2]
+
+    def _variants(self, word: str) -> set[str]:
+        variants = {word[: self.prefix_length]}
+        edge = set(variants)
+        for _ in range(self.max_distance):
+            edge = {
+                variant[:i] + variant[i + 1 :]
+                for variant in edge
+                if len(variant) > 1
+                for i in range(len(variant))
+            }
+            variants |= edge
+        return variants
+
+
+def _edit_distance(a: str, b: str, limit: int) -> Optional[int]:
+    """
+    Returns the optimal string alignment distance of two words, None when above `limit`.
+    """
+
+    if abs(len(a) - len(b)) > limit:
+        return None
+
+    previous2: list[int] = []
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return None
+        previous2, previous = previous, current
+
+    return previous[-1] if previous[-1] <= limit else None
+
+
+class SpellingSuggester:
+    """
+    Suggests corrections of misspelled searches from the words of component names, tag labels
+    and attribute keys.
+
+    The dictionary is loaded on first use, updated in place when transactions writing these
+    commit, and reloaded when other processes wrote them, as seen through the table
+    generations.
+
+    Methods:
+        suggest(search_str): Returns the search string with its misspelled words corrected.
+        reload(): Reloads the dictionary from the database.
+        invalidate(): Makes the next suggestion reload the dictionary.
+
+    Example:
+        ```python
+        spelling.suggest("cabel tei")  # "cable tie"
+        ```
+    """
+
+    def __init__(self) -> None:
+        self._symspell = SymSpell()
+        self._loaded = False
+        self._seen: tuple[int, ...] = ()
+        self._lock = Lock()
+
+    def suggest(self, search_str: str) -> Optional[str]:
+        """
+        Returns the search string with its misspelled words corrected.
+
+        Args:
+            search_str (str): The search string.
+
+        Returns:
+            str | None: The corrected search string, or None when no word was corrected.
+        """
+
+        if not self._loaded or generations.current(*WATCHED_TABLES) != self._seen:
+            self.reload()
+
+        words = words_of(search_str)
+        with self._lock:
+            corrected = [
+                (self._symspell.correct(word) or word)
+                if len(word) >= MIN_WORD_LENGTH and not word.isdigit()
+                else word
+                for word in words
+            ]
+        return " ".join(corrected) if corrected != words else None
+
+    def reload(self) -> None:
+        """
+        Reloads the dictionary from the database.
+
+        Returns:
+            None
+        """
+
+        seen = generations.current(*WATCHED_TABLES)
+        symspell = SymSpell()
+        for model, column in _WORD_SOURCES:
+            for text in db.session.scalars(select(getattr(model, column))):
+                for word in words_of(text):
+                    symspell.add(word)
+
+        with self._lock:
+            self._symspell = symspell
+            self._loaded = True
+            self._seen = seen
+
+    def apply(self, added: Iterable[str], removed: Iterable[str]) -> None:
+        """
+        Applies the word changes of a committed transaction.
+
+        Args:
+            added (Iterable[str]): The texts written.
+            removed (Iterable[str]): The texts overwritten or deleted.
+
+        Returns:
+            None
+        """
+
+        with self._lock:
+            if not self._loaded:
+                return
+            for text in added:
+                for word in words_of(text):
+                    self._symspell.add(word)
+            for text in removed:
+                for word in words_of(text):
+                    self._symspell.remove(word)
+            self._seen = generations.current(*WATCHED_TABLES)
+
+    def invalidate(self) -> None:
+        """
+        Makes the next suggestion reload the dictionary.
+
+        Returns:
+            None
+        """
+
+        with self._lock:
+            self._loaded = False
+
+
+spelling = SpellingSuggester()
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_spelling_changes(session: Session, flush_context) -> None:
+    added: list = session.info.setdefault("spelling_added", [])
+    removed: list = session.info.setdefault("spelling_removed", [])
+    for instance in session.new | session.dirty | session.deleted:
+        for model, column in _WORD_SOURCES:
+            if not isinstance(instance, model):
+                continue
+            if instance in session.deleted:
+                removed.append(getattr(instance, column))
+                continue
+            history = inspect(instance).attrs[column].history
+            if history.added and not history.deleted and instance not in session.new:
+                # * overwritten without being loaded, the words it had are unknown
+                session.info["spelling_stale"] = True
+            added.extend(history.added)
+            removed.extend(text for text in history.deleted if text)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_spelling_changes(session: Session) -> None:
+    added = session.info.pop("spelling_added", [])
+    removed = session.info.pop("spelling_removed", [])
+    if session.info.pop("spelling_stale", False):
+        spelling.invalidate()
+    elif added or removed:
+        spelling.apply(added, removed)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_spelling_changes(session: Session) -> None:
+    session.info.pop("spelling_added", None)
+    session.info.pop("spelling_removed", None)
+    session.info.pop("spelling_stale", None)
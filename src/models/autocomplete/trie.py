@@ -0,0 +1,172 @@
+# SPDX-License-Identifier: MIT
+# --------------------------------------------------------------
+# |																|
+# |             Copyright 2023 - 2023, Amulya Paritosh			|
+# |																|
+# |  This file is part of Component Library Plugin for FreeCAD.	|
+# |																|
+# |               This file was created as a part of				|
+# |              Google Summer Of Code Program - 2023			|
+# |																|
+# --------------------------------------------------------------
+
+from heapq import nsmallest
+from typing import Optional
+
+MAX_COMPLETIONS = 20
+
+
+class _Node:
+    __slots__ = ("children", "entries", "top")
+
+    def __init__(self) -> None:
+        # * first character of the edge -> (edge label, child)
+        self.children: dict[str, tuple[str, "_Node"]] = {}
+        self.entries: dict[str, float] = {}
+        self.top: list[tuple[float, str]] = []
+
+
+class PrefixTrie:
+    """
+    A compressed prefix trie of keys, each holding values with a score, that keeps the best
+    values of every subtree so that completions are read without walking the subtree.
+
+    Completing a prefix costs a walk of the prefix, whatever the number of keys below it;
+    writing a key costs a walk of the key and the merge of the best values of its path.
+
+    Attributes:
+        size (int): The number of best values kept per node, the most completions returned.
+
+    Methods:
+        add(key, value, score): Adds a value under a key, or changes its score.
+        remove(key, value): Removes a value from under a key.
+        complete(prefix, limit): Returns the best values under the keys starting with a prefix.
+
+    Example:
+        ```python
+        trie = PrefixTrie()
+        trie.add("cable tie", "Cable Tie", 4.5)
+        trie.complete("cab")  # [("Cable Tie", 4.5)]
+        ```
+    """
+
+    def __init__(self, size: int = MAX_COMPLETIONS) -> None:
+        self.size = size
+        self._root = _Node()
+
+    def add(self, key: str, value: str, score: float) -> None:
+        """
+        Adds a value under a key, or changes its score.
+
+        Args:
+            key (str): The key, matched by its prefixes.
+            value (str): The value completed.
+            score (float): The score of the value, the higher the better.
+
+        Returns:
+            None
+        """
+
+        path = [self._root]
+        node, rest = self._root, key
+        while rest:
+            edge = node.children.get(rest[0])
+            if edge is None:
+                child = _Node()
+                node.children[rest[0]] = (rest, child)
+                node, rest = child, ""
+                path.append(node)
+                break
+
+            label, child = edge
+            common = _common_prefix_length(label, rest)
+            if common < len(label):
+                # * split the edge where the key leaves it
+                middle = _Node()
+                middle.children[label[common]] = (label[common:], child)
+                middle.top = list(child.top)
+                node.children[rest[0]] = (label[:common], middle)
+                child = middle
+            node, rest = child, rest[common:]
+            path.append(node)
+
+        node.entries[value] = score
+        self._update_path(path)
+
+    def remove(self, key: str, value: str) -> None:
+        """
+        Removes a value from under a key, if it is there.
+
+        Args:
+            key (str): The key.
+            value (str): The value.
+
+        Returns:
+            None
+        """
+
+        path = self._find(key, exact=True)
+        if path is None or value not in path[-1][1].entries:
+            return
+
+        del path[-1][1].entries[value]
+        nodes = [node for _, node in path]
+        self._update_path(nodes)
+
+        # * prune the nodes left without any value below them
+        for (first, node), (_, parent) in zip(reversed(path), reversed(path[:-1])):
+            if node.entries or node.children:
+                break
+            del parent.children[first]
+
+    def complete(self, prefix: str, limit: int = 10) -> list[tuple[str, float]]:
+        """
+        Returns the best values under the keys starting with a prefix.
+
+        Args:
+            prefix (str): The prefix of the keys.
+            limit (int, optional): The most values returned, at most `size`. Defaults to 10.
+
+        Returns:
+            list[tuple[str, float]]: The values and their scores, the best first.
+        """
+
+        path = self._find(prefix, exact=False)
+        if path is None:
+            return []
+        return [(value, -score) for score, value in path[-1][1].top[:limit]]
+
+    def _find(self, key: str, exact: bool) -> Optional[list[tuple[str, _Node]]]:
+        path = [("", self._root)]
+        node, rest = self._root, key
+        while rest:
+            edge = node.children.get(rest[0])
+            if edge is None:
+                return None
+            label, child = edge
+            if rest.startswith(label):
+                rest = rest[len(label) :]
+            elif not exact and label.startswith(rest):
+                rest = ""
+            else:
+                return None
+            path.append((label[0], child))
+            node = child
+        return path
+
+    def _update_path(self, path: list[_Node]) -> None:
+        for node in reversed(path):
+            best: dict[str, float] = dict(node.entries)
+            for _, child in node.children.values():
+                for score, value in child.top:
+                    best[value] = max(best.get(value, float("-inf")), -score)
+            node.top = nsmallest(self.size, ((-score, value) for value, score in best.items()))
+
+
+def _common_prefix_length(a: str, b: str) -> int:
+    length = 0
+    for x, y in zip(a, b):
+        if x != y:
+            break
+        length += 1
+    return length
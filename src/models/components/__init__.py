@@ -0,0 +1 @@
+from .documents import COMPONENTS_INDEX, index_all_components, sync_components
@@ -0,0 +1,428 @@
+# SPDX-License-Identifier: MIT
+# --------------------------------------------------------------
+# |																|
+# |             Copyright 2023 - 2023, Amulya Paritosh			|
+# |																|
+# |  This file is part of Component Library Plugin for FreeCAD.	|
+# |																|
+# |               This file was created as a part of				|
+# |              Google Summer Of Code Program - 2023			|
+# |																|
+# --------------------------------------------------------------
+
+from typing import Iterable, Iterator, Optional
+
+from elasticsearch import helpers
+from flask_sqlalchemy.pagination import Pagination
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+
+from ...database import SearchStage, db, es
+from ...database.indices import (
+    ANALYSIS_SETTINGS,
+    NAME_MAPPING,
+    NORMALIZED_KEYWORD_MAPPING,
+    indices,
+)
+from ...database.outbox import register_collector, register_index
+from ...database.rebuild import register_source
+from ...log import logger
+from ..attributes import Attribute
+from ..files import File
+from ..metadatas import Metadata
+from ..metadatas.models import metadata_tag
+from ..tags import Tag
+from .query import ALL_FILE_TYPES, RELEVANCE, component_load_options
+
+COMPONENTS_INDEX = "components"
+COMPONENTS_VERSION = 2
+SYNC_CHUNK_SIZE = 500
+FACET_SIZE = 100
+
+# * doc values only on the fields sorted on or aggregated
+COMPONENTS_MAPPINGS: dict = {
+    "dynamic": False,
+    "properties": {
+        "id": {"type": "keyword"},
+        "name": NAME_MAPPING,
+        "version": {"type": "keyword"},
+        "maintainer": {"type": "keyword"},
+        "author": {"type": "keyword"},
+        "rating": {"type": "float"},
+        "created_at": {"type": "date"},
+        "updated_at": {"type": "date"},
+        "license": {"type": "keyword"},
+        "tags": {"type": "keyword"},
+        "file_types": {"type": "keyword"},
+        "attributes": {
+            "type": "nested",
+            "properties": {
+                "key": NORMALIZED_KEYWORD_MAPPING,
+                "value": NORMALIZED_KEYWORD_MAPPING,
+            },
+        },
+    },
+}
+
+SORT_FIELDS: dict[str, str] = {
+    "name": "name.keyword",
+    "version": "version",
+    "maintainer": "maintainer",
+    "author": "author",
+    "rating": "rating",
+    "created_at": "created_at",
+    "updated_at": "updated_at",
+}
+
+
+def component_document(metadata: Metadata) -> dict:
+    """
+    Denormalizes a component into the document it is searched by in the components index.
+
+    Args:
+        metadata (Metadata): The metadata of the component, with its relationships loaded.
+
+    Returns:
+        dict: The component document.
+    """
+
+    return {
+        "id": str(metadata.id),
+        "name": metadata.name,
+        "version": metadata.version,
+        "maintainer": metadata.maintainer,
+        "author": metadata.author,
+        "description": metadata.description,
+        "rating": metadata.rating,
+        "created_at": metadata.created_at and metadata.created_at.isoformat(),
+        "updated_at": metadata.updated_at and metadata.updated_at.isoformat(),
+        "license": metadata.license and metadata.license.identifier,
+        "tags": sorted(tag.label for tag in metadata.tags),
+        "file_types": sorted({file.type.name for file in metadata.files}),
+        "attributes": [
+            {"key": attribute.key, "value": attribute.value} for attribute in metadata.attributes
+        ],
+    }
+
+
+def component_actions(session: Session, ids: list[str]) -> list[dict]:
+    """
+    Makes the bulk actions bringing the documents of the given components in line with the
+    database: existing components are indexed from their current rows, the others deleted.
+
+    Args:
+        session (Session): The session to read the components with.
+        ids (list[str]): The ids of the components.
+
+    Returns:
+        list[dict]: The bulk actions.
+    """
+
+    metadatas = session.scalars(
+        select(Metadata).where(Metadata.id.in_(ids)).options(*component_load_options())
+    ).unique()
+
+    actions = [
+        {
+            "_op_type": "index",
+            "_index": COMPONENTS_INDEX,
+            "_id": str(metadata.id),
+            "_source": component_document(metadata),
+        }
+        for metadata in metadatas
+    ]
+    indexed = {action["_id"] for action in actions}
+    actions.extend(
+        {"_op_type": "delete", "_index": COMPONENTS_INDEX, "_id": id_}
+        for id_ in ids
+        if id_ not in indexed
+    )
+    return actions
+
+
+def iter_component_documents(session: Session, chunk_size: int) -> Iterator[tuple[str, dict]]:
+    """
+    Streams the document of every component, for `reindex`.
+
+    Args:
+        session (Session): The session to read the components with.
+        chunk_size (int): The number of components fetched at a time, along with their
+            relationships.
+
+    Returns:
+        Iterator[tuple[str, dict]]: The id and source of every component document.
+    """
+
+    metadatas = session.scalars(
+        select(Metadata).options(*component_load_options()).execution_options(yield_per=chunk_size)
+    )
+    for metadata in metadatas:
+        yield str(metadata.id), component_document(metadata)
+
+
+def sync_components(ids: Iterable[str]) -> None:
+    """
+    Brings the documents of the given components in line with the database right away,
+    instead of through the search outbox.
+
+    Each chunk of ids costs one query per relationship and one bulk request.
+
+    Args:
+        ids (Iterable[str]): The ids of the components to sync.
+
+    Returns:
+        None
+    """
+
+    ids = sorted(set(ids))
+    if not ids:
+        return
+
+    indices.ensure(COMPONENTS_INDEX)
+    with Session(db.engine) as session:
+        for start in range(0, len(ids), SYNC_CHUNK_SIZE):
+            actions = component_actions(session, ids[start : start + SYNC_CHUNK_SIZE])
+            _, errors = helpers.bulk(es, actions, raise_on_error=False)
+            for error in errors:
+                if error.get("delete", {}).get("status") != 404:
+                    logger.error(f"Error syncing component document: {error}")
+
+
+def index_all_components() -> int:
+    """
+    Indexes every component of the database into the components index.
+
+    Returns:
+        int: The number of components indexed.
+    """
+
+    ids = [str(id_) for id_ in db.session.scalars(select(Metadata.id))]
+    sync_components(ids)
+    return len(ids)
+
+
+def components_query(
+    search_str: str,
+    tags: Optional[list] = None,
+    file_types: Optional[list] = None,
+    name_query: Optional[dict] = None,
+) -> dict:
+    """
+    Makes the query of the components matching a search string and the listing filters.
+
+    The name part of the search string scores the components, while its `key:value` part and
+    the tag and file type filters only select them, as the SQL listing does.
+
+    Args:
+        search_str (str): The search string.
+        tags (list, optional): The tag labels, any of which a component must have.
+            Defaults to None.
+        file_types (list, optional): The file types, any of which a component must have.
+            Defaults to None, all types.
+        name_query (dict, optional): The query of the names, a stage of
+            `Metadata.search_stages`. Defaults to None, its last stage.
+
+    Returns:
+        dict: The Elasticsearch query.
+    """
+
+    must = [name_query or Metadata.make_query(search_str)]
+    if ":" in search_str:
+        must.append(
+            {
+                "nested": {
+                    "path": "attributes",
+                    "query": Attribute.make_query(search_str, "attributes."),
+                }
+            }
+        )
+
+    filters = []
+    if tags:
+        filters.append({"terms": {"tags": list(tags)}})
+    if file_types is not None and not ALL_FILE_TYPES <= set(file_types):
+        filters.append({"terms": {"file_types": list(file_types)}})
+    else:
+        filters.append({"exists": {"field": "file_types"}})
+
+    return {"bool": {"must": must, "filter": filters}}
+
+
+def components_stages(
+    search_str: str, tags: Optional[list] = None, file_types: Optional[list] = None
+) -> list[SearchStage]:
+    """
+    Makes the stages of a components search, those of the name search with the listing
+    filters, see `Metadata.search_stages`.
+
+    Args:
+        search_str (str): The search string.
+        tags (list, optional): The tag labels, any of which a component must have.
+            Defaults to None.
+        file_types (list, optional): The file types, any of which a component must have.
+            Defaults to None, all types.
+
+    Returns:
+        list[SearchStage]: The stages, to run with `staged_search`.
+    """
+
+    return [
+        stage._replace(query=components_query(search_str, tags, file_types, stage.query))
+        for stage in Metadata.search_stages(search_str)
+    ]
+
+
+def components_sort(sort_by: str, sort_ord: str) -> list:
+    """
+    Makes the sort of a components search, with the id as tiebreaker so that it is total.
+
+    Args:
+        sort_by (str): The column to sort by, or "relevance".
+        sort_ord (str): The sort order, "asc" or "desc".
+
+    Returns:
+        list: The Elasticsearch sort.
+    """
+
+    if sort_by == RELEVANCE:
+        return [{"_score": "desc"}, {"id": "asc"}]
+
+    # * missing values sort the way SQL sorts NULLs
+    missing = "_first" if sort_ord == "asc" else "_last"
+    return [
+        {SORT_FIELDS[sort_by]: {"order": sort_ord, "missing": missing}},
+        {"id": sort_ord},
+    ]
+
+
+def components_aggs(facets: list[str]) -> dict:
+    """
+    Makes the aggregations counting the components of a search per facet value.
+
+    Args:
+        facets (list[str]): The facets to count, validated by `validate_facets`.
+
+    Returns:
+        dict: The Elasticsearch aggregations, one terms aggregation per facet.
+    """
+
+    return {facet: {"terms": {"field": facet, "size": FACET_SIZE}} for facet in facets}
+
+
+def facets_of(aggregations: dict) -> dict:
+    """
+    Reads the facet counts out of the aggregations of `components_aggs`.
+
+    Args:
+        aggregations (dict): The aggregations of the Elasticsearch response.
+
+    Returns:
+        dict: For each facet, its values and their number of components, the most common first.
+    """
+
+    return {
+        facet: [
+            {"value": bucket["key"], "count": bucket["doc_count"]}
+            for bucket in aggregation["buckets"]
+        ]
+        for facet, aggregation in aggregations.items()
+    }
+
+
+def search_components(query: dict, sort: list, size: int, **kwargs) -> dict:
+    """
+    Searches the components index, reading only the ids of the hits.
+
+    Args:
+        query (dict): The Elasticsearch query.
+        sort (list): The Elasticsearch sort.
+        size (int): The number of hits to return.
+        **kwargs: The other search parameters, such as `from_`, `search_after` or
+            `track_total_hits`.
+
+    Returns:
+        dict: The Elasticsearch response.
+    """
+
+    return es.search(
+        index=COMPONENTS_INDEX, query=query, sort=sort, size=size, source=["id"], **kwargs
+    )
+
+
+class SearchPagination(Pagination):
+    """
+    A page of components index hits, read along with their total, and the facet counts of
+    `aggs` when given, in one search request.
+
+    Example:
+        ```python
+        pagination = SearchPagination(query=query, sort=sort, aggs=None, page=2, per_page=20)
+        ```
+    """
+
+    def _query_items(self) -> list:
+        aggs = self._query_args.get("aggs")
+        response = search_components(
+            self._query_args["query"],
+            self._query_args["sort"],
+            self.per_page,
+            from_=self._query_offset,
+            track_total_hits=True,
+            **({"aggs": aggs} if aggs else {}),
+        )
+        self._total = response["hits"]["total"]["value"]
+        self.facets = facets_of(response.get("aggregations", {}))
+        return response["hits"]["hits"]
+
+    def _query_count(self) -> int:
+        return self._total
+
+
+@event.listens_for(Session, "before_flush")
+def _remember_deleted_tag_components(session: Session, flush_context, instances) -> None:
+    # * the links of a deleted tag are gone by the time the flushed instances are collected
+    tag_ids = [tag.id for tag in session.deleted if isinstance(tag, Tag)]
+    if not tag_ids:
+        session.info.pop("deleted_tag_components", None)
+        return
+
+    components: dict[str, set[str]] = {}
+    rows = session.connection().execute(
+        select(metadata_tag.c.tag_id, metadata_tag.c.metadata_id).where(
+            metadata_tag.c.tag_id.in_(tag_ids)
+        )
+    )
+    for tag_id, metadata_id in rows:
+        components.setdefault(str(tag_id), set()).add(str(metadata_id))
+    session.info["deleted_tag_components"] = components
+
+
+def _component_ids_of(session: Session, instance) -> set[str]:
+    if isinstance(instance, Metadata):
+        return {str(instance.id)}
+    if isinstance(instance, (File, Attribute)):
+        return {str(instance.metadata_id)} if instance.metadata_id else set()
+    if isinstance(instance, Tag) and instance in session.deleted:
+        return session.info.get("deleted_tag_components", {}).pop(str(instance.id), set())
+    if (
+        isinstance(instance, Tag)
+        # * new tags have no components, nor have those of bulk writes, which are transient
+        and inspect(instance).persistent
+        and inspect(instance).attrs.label.history.has_changes()
+    ):
+        # * a renamed tag changes the documents of all its components
+        ids = session.connection().scalars(
+            select(metadata_tag.c.metadata_id).where(metadata_tag.c.tag_id == instance.id)
+        )
+        return {str(id_) for id_ in ids}
+    return set()
+
+
+@register_collector
+def _collect_component_documents(session: Session, instance) -> list[tuple[str, str]]:
+    return [(COMPONENTS_INDEX, id_) for id_ in _component_ids_of(session, instance)]
+
+
+indices.register(COMPONENTS_INDEX, COMPONENTS_MAPPINGS, ANALYSIS_SETTINGS, COMPONENTS_VERSION)
+register_index(COMPONENTS_INDEX, component_actions)
+register_source(COMPONENTS_INDEX, Metadata, iter_component_documents)
@@ -10,11 +10,12 @@
 # |																|
 # --------------------------------------------------------------
 
+from dataclasses import replace
 from typing import Literal, Optional
 
 import jwt
-from flask import request
-from flask_sqlalchemy.query import Query
+from flask import abort, request
+from sqlalchemy.exc import IntegrityError
 from werkzeug.exceptions import HTTPException
 
 from src.models.users.models import User
@@ -22,18 +23,61 @@ from src.models.users.models import User
 from src.models.users.models import User
 
 from ...authentication.utils import decode_auth_token
+from ...cache import response_cache
+from ...config import Config
+from ...database import (
+    SEARCH_UNAVAILABLE_ERRORS,
+    is_degraded,
+    is_search_unavailable,
+    is_unique_violation,
+    mark_degraded,
+    staged_search,
+    unit_of_work,
+)
 from ...log import logger
-from ..attributes import Attribute
-from ..files import File, FileType
-from ..files.operations import upload_to_github
+from ..attributes import Attribute, attribute_schema
+from ..autocomplete import spelling
+from ..files import FileType
+from ..files.operations import upload_files
+from ..files.utils import undo_uploads_on_error
 from ..metadatas import Metadata
 from ..metadatas import _create as create_metadata
-from ..metadatas import add_attributes, add_tags, metadata_schema, metadatas_schema
-from ..tags import Tag
-from ..utils import paginated_schema
-from ..utils.pagination import MAX_PER_PAGE
+from ..metadatas import find_tags, metadata_schema, metadatas_schema
+from ..utils import (
+    KeysetPagination,
+    QueryPagination,
+    keyset_paginate,
+    paginate_query,
+    paginated_schema,
+)
+from ..utils.pagination import (
+    DEFAULT_PER_PAGE,
+    MAX_PER_PAGE,
+    decode_cursor,
+    encode_cursor,
+)
+from .documents import (
+    COMPONENTS_INDEX,
+    SearchPagination,
+    components_aggs,
+    components_sort,
+    components_stages,
+    facets_of,
+    search_components,
+)
+from .query import (
+    RELEVANCE,
+    ComponentQuerySpec,
+    component_load_options,
+    facet_counts,
+    validate_facets,
+)
 from .schema import ComponentSchema, component_schema
 
+COMPONENT_TABLES = ("metadatas", "files", "tags", "attributes", "spdx_licenses")
+# * searches read the indices, which catch up with the tables when the outbox is drained
+SEARCH_TABLES = (*COMPONENT_TABLES, "search_outbox")
+
 
 def read(
     page: Optional[int] = None,
@@ -44,6 +88,9 @@ def read(
     file_types: list = [t.name for t in FileType],
     tags: Optional[list] = None,
     columns: Optional[list] = None,
+    cursor: Optional[str] = None,
+    count: Literal["exact"] | Literal["cached"] | Literal["none"] = "exact",
+    facets: Optional[list] = None,
 ):
     """
     Reads components from the database based on the specified parameters.
@@ -66,6 +113,14 @@ def read(
                     The list of tags to filter components by. Defaults to None.
     columns : Optional[list], optional
                     The list of columns to include in the query result. Defaults to None.
+    cursor : Optional[str], optional
+                    The `next_cursor` of a previous page. When given, even empty, the components are
+                    paginated by keyset on `sort_by` and id instead of by page number. Defaults to None.
+    count : Literal["exact"] | Literal["cached"] | Literal["none"], optional
+                    How the total of page-number mode is computed, see `paginate_query`. Defaults to "exact".
+    facets : Optional[list], optional
+                    The facets among "tags", "file_types" and "license" whose counts over the whole
+                    filtered result set are returned in `facets`. Defaults to None.
 
     Returns
     -------
@@ -75,34 +130,107 @@ def read(
     Notes
     -----
     This function reads components from the database based on the specified parameters. It applies filters, sorting, and pagination to the query.
+    Responses are cached by their normalized parameters until a table they are read from is written;
+    search responses also until the search outbox is drained.
+    When Elasticsearch is unavailable, searches fall back to SQL and the response has `degraded`
+    set; such responses are not cached. Searches finding fewer than `SEARCH_MIN_HITS` components
+    have a `suggestion`, the search string with its misspelled words corrected, or null.
     """
 
-    # ! if the given page number is greater that available, there is an unhandled error(404)
+    params = {
+        "page": page,
+        "page_size": page_size,
+        "search_str": search_str.strip().lower() if search_str else None,
+        "sort_by": sort_by,
+        "sort_ord": sort_ord,
+        "file_types": sorted(set(file_types)),
+        "tags": sorted(set(tags)) if tags else None,
+        "columns": sorted(set(columns)) if columns else None,
+        "cursor": cursor,
+        "count": count,
+        "facets": sorted(set(facets)) if facets else None,
+    }
 
-    query: Query = Metadata.query
+    components_resp = response_cache.get_or_compute(
+        "component",
+        params,
+        SEARCH_TABLES if params["search_str"] else COMPONENT_TABLES,
+        lambda: _read(**params),
+        cacheable=lambda resp: not resp.get("degraded"),
+    )
+    return components_resp, 200
 
-    if tags:
-        query = query.filter(Metadata.tags.any(Tag.label.in_(tags)))
 
-    query = query.filter(Metadata.files.any(File.type.in_(file_types)))
+def _read(
+    page,
+    page_size,
+    search_str,
+    sort_by,
+    sort_ord,
+    file_types,
+    tags,
+    columns,
+    cursor,
+    count,
+    facets,
+) -> dict:
+    """
+    Queries and serializes a page of components, bypassing the response cache.
 
-    if search_str:
-        query = query.filter(
-            Metadata.name.in_(Metadata.elasticsearch(search_str.lower()))
-        )
-        if ":" in search_str:
-            matching_attrs = Attribute.elasticsearch(search_str.lower())
-            logger.debug(f"{matching_attrs}")
-            query = query.filter(Metadata.id.in_(matching_attrs))
+    The parameters are those of `read`, already normalized.
 
-    if columns:
-        query = query.with_entities(*[eval(f"Metadata.{col}") for col in columns])
+    Returns
+    -------
+    dict
+                    The paginated components response.
+    """
 
-    order_exp = eval(f"Metadata.{sort_by}.{sort_ord}()")
-    query = query.order_by(order_exp)
-    paginated_query = query.paginate(
-        page=page, per_page=page_size, max_per_page=MAX_PER_PAGE
-    )
+    # ! if the given page number is greater that available, there is an unhandled error(404)
+
+    try:
+        facets = validate_facets(facets)
+    except ValueError as err:
+        abort(400, str(err))
+
+    paginated_query = None
+    if (
+        search_str
+        and Config.SEARCH_BACKEND == "elasticsearch"
+        and Config.SEARCH_COMPONENT_DOCUMENTS
+    ):
+        try:
+            paginated_query, facet_resp = _search_components(
+                search_str,
+                sort_by,
+                sort_ord,
+                tags,
+                file_types,
+                columns,
+                page,
+                page_size,
+                cursor,
+                facets,
+            )
+        except SEARCH_UNAVAILABLE_ERRORS as err:
+            if not is_search_unavailable(err):
+                raise
+            # * the listing below then searches the names in SQL as well
+            logger.warning(f"Searching components in SQL, Elasticsearch failed: {err}")
+            mark_degraded()
+    if paginated_query is None:
+        paginated_query, facet_resp = _query_components(
+            search_str,
+            sort_by,
+            sort_ord,
+            tags,
+            file_types,
+            columns,
+            page,
+            page_size,
+            cursor,
+            count,
+            facets,
+        )
 
     components_resp = paginated_schema(ComponentSchema).dump(paginated_query)
     metadata_resp = metadatas_schema.dump(paginated_query)
@@ -111,7 +239,249 @@ def read(
         component["metadata"] = metadata
         component["id"] = metadata["id"]
 
-    return components_resp, 200
+    if facets:
+        components_resp["facets"] = facet_resp
+    if search_str and _hits(components_resp) < staged_search.min_hits:
+        components_resp["suggestion"] = spelling.suggest(search_str)
+    if is_degraded():
+        components_resp["degraded"] = True
+    return components_resp
+
+
+def _hits(components_resp: dict) -> int:
+    """
+    Returns the number of components a search found, or at least how many, when the page
+    does not count them.
+    """
+
+    if components_resp.get("total") is not None:
+        return components_resp["total"]
+    if components_resp.get("has_next"):
+        return staged_search.min_hits
+    return len(components_resp.get("items", []))
+
+
+def _query_components(
+    search_str,
+    sort_by,
+    sort_ord,
+    tags,
+    file_types,
+    columns,
+    page,
+    page_size,
+    cursor,
+    count,
+    facets,
+) -> tuple[QueryPagination | KeysetPagination, dict]:
+    """
+    Filters, sorts and paginates the components in SQL, the search string only selecting
+    the ids matched by the search backend.
+
+    The parameters are those of `read`, already normalized.
+
+    Returns
+    -------
+    tuple[QueryPagination | KeysetPagination, dict]
+                    The requested page of components, and the facet counts of the filtered components.
+    """
+
+    ranked = None
+    if search_str:
+        ranked = Metadata.search(search_str)
+        if ":" in search_str:
+            matching_attrs = Attribute.search(search_str)
+            logger.debug(f"{matching_attrs}")
+            ranked = [hit for hit in ranked if hit[0] in matching_attrs]
+    ids = None if ranked is None else [id_ for id_, _ in ranked]
+
+    try:
+        spec = ComponentQuerySpec.make(
+            columns=columns,
+            sort_by=sort_by,
+            sort_ord=sort_ord,
+            keyset=cursor is not None,
+            tags=tags,
+            file_types=file_types,
+            ids=ids,
+        )
+    except ValueError as err:
+        abort(400, str(err))
+
+    values = {"tags": tags, "file_types": file_types, "ids": ids}
+    load_options = () if columns else component_load_options()
+
+    if spec.by_relevance:
+        paginated_query = _paginate_by_relevance(
+            spec, values, ranked, page, page_size, cursor
+        )
+    elif cursor is not None:
+        query = spec.query(**values).options(*load_options)
+        paginated_query = keyset_paginate(
+            query, spec.sort_column, Metadata.id, cursor, page_size, sort_ord
+        )
+    else:
+        query = spec.ordered_query(**values).options(*load_options)
+        paginated_query = paginate_query(query, page, page_size, count)
+
+    return paginated_query, facet_counts(spec, facets, **values)
+
+
+def _search_components(
+    search_str,
+    sort_by,
+    sort_ord,
+    tags,
+    file_types,
+    columns,
+    page,
+    page_size,
+    cursor,
+    facets,
+) -> tuple[SearchPagination | KeysetPagination, dict]:
+    """
+    Searches, filters, sorts and paginates the components, and counts their facets, with a
+    single request to the components index; SQL only loads the components of the page.
+
+    The request is made with the cheapest stage of the name search first, see
+    `Metadata.search_stages`, and only repeated with the next stage when it finds too few
+    components.
+
+    The parameters are those of `read`, already normalized.
+
+    Returns
+    -------
+    tuple[SearchPagination | KeysetPagination, dict]
+                    The requested page of components, and the facet counts of the matching components.
+    """
+
+    try:
+        # * the filters run in Elasticsearch, the spec only validates and loads the hits
+        spec = ComponentQuerySpec.make(
+            columns=columns, sort_by=sort_by, sort_ord=sort_ord, ids=[]
+        )
+    except ValueError as err:
+        abort(400, str(err))
+
+    stages = components_stages(search_str, tags, file_types)
+    sort = components_sort(sort_by, sort_ord)
+    aggs = components_aggs(facets)
+    per_page = min(page_size or DEFAULT_PER_PAGE, MAX_PER_PAGE)
+    last = None if cursor is None else decode_cursor(cursor, (None,) * len(sort))
+
+    def search(query: dict) -> tuple[SearchPagination | KeysetPagination, dict, int]:
+        if cursor is None:
+            paginated = SearchPagination(
+                page=page,
+                per_page=page_size,
+                max_per_page=MAX_PER_PAGE,
+                query=query,
+                sort=sort,
+                aggs=aggs,
+            )
+            return paginated, paginated.facets, paginated.total
+
+        # * counting up to the largest threshold of the stages tells whether to escalate
+        kwargs = {
+            "track_total_hits": max(staged_search.min_hits, *(s.min_hits or 0 for s in stages))
+        }
+        if last is not None:
+            kwargs["search_after"] = list(last)
+        if aggs:
+            kwargs["aggs"] = aggs
+        response = search_components(query, sort, per_page + 1, **kwargs)
+        hits = response["hits"]["hits"]
+        next_cursor = None
+        if len(hits) > per_page:
+            hits = hits[:per_page]
+            next_cursor = encode_cursor(tuple(hits[-1]["sort"]))
+        paginated = KeysetPagination(per_page, hits, next_cursor)
+        return (
+            paginated,
+            facets_of(response.get("aggregations", {})),
+            response["hits"]["total"]["value"],
+        )
+
+    _, (paginated, facet_resp, _) = staged_search.run(
+        COMPONENTS_INDEX,
+        stages,
+        search,
+        count=lambda result: result[2],
+    )
+
+    page_ids = [hit["_id"] for hit in paginated.items]
+    paginated.items = _load_components(replace(spec, sort_by=RELEVANCE), {}, page_ids)
+    return paginated, facet_resp
+
+
+def _paginate_by_relevance(
+    spec: ComponentQuerySpec,
+    values: dict,
+    ranked: list[tuple[str, float]],
+    page: Optional[int],
+    page_size: Optional[int],
+    cursor: Optional[str],
+) -> QueryPagination | KeysetPagination:
+    """
+    Paginates the search hits that pass the SQL filters, in the order the search backend ranked them.
+
+    Only the ids of the filtered hits are read first; the components of the requested page are
+    then fetched by id and put back in relevance order. In cursor mode the cursor holds the
+    score and id of the last hit served.
+
+    Returns
+    -------
+    QueryPagination | KeysetPagination
+                    The requested page of components.
+    """
+
+    matching = {str(id_) for id_, in spec.query(**values).with_entities(Metadata.id)}
+    hits = [hit for hit in ranked if hit[0] in matching]
+
+    if cursor is None:
+        paginated = QueryPagination(hits, page=page, per_page=page_size)
+        page_hits = paginated.items
+    else:
+        per_page = min(page_size or DEFAULT_PER_PAGE, MAX_PER_PAGE)
+        last = decode_cursor(cursor, (None, Metadata.id))
+        start = 0
+        if last is not None:
+            last_score, last_id = last
+            # * resume after the last hit, or at the first lower score if it left the hits
+            start = next(
+                (
+                    i + 1 if id_ == last_id else i
+                    for i, (id_, score) in enumerate(hits)
+                    if id_ == last_id or score < last_score
+                ),
+                len(hits),
+            )
+        page_hits = hits[start : start + per_page]
+        next_cursor = None
+        if start + per_page < len(hits):
+            last_id, last_score = page_hits[-1]
+            next_cursor = encode_cursor((last_score, last_id))
+        paginated = KeysetPagination(per_page, page_hits, next_cursor)
+
+    paginated.items = _load_components(spec, values, [id_ for id_, _ in page_hits])
+    return paginated
+
+
+def _load_components(spec: ComponentQuerySpec, values: dict, ids: list[str]) -> list:
+    """
+    Loads the components of a page by id, in the order of the ids.
+
+    Returns
+    -------
+    list
+                    The components, or their selected columns, of the ids that pass the spec.
+    """
+
+    query = spec.query(**{**values, "ids": ids})
+    if not spec.columns:
+        query = query.options(*component_load_options())
+    rows = {str(row.id): row for row in query}
+    return [rows[id_] for id_ in ids if id_ in rows]
 
 
 def create(component_data: dict):
@@ -131,6 +501,8 @@ def create(component_data: dict):
     Notes
     -----
     This function creates a component by creating metadata, adding tags, and uploading to GitHub. It returns the component response along with the HTTP status code.
+    The metadata, tags, attributes and files are committed together, once the files are uploaded; nothing is kept when any step fails, the files already uploaded to GitHub being deleted.
+    The metadata is flushed before the upload, so that a duplicate name is refused by its unique constraint before anything reaches GitHub.
     """
 
     token = request.headers.get("Token")
@@ -163,18 +535,25 @@ def create(component_data: dict):
     }
 
     try:
-        metadata: Metadata = create_metadata(metadata_data)
+        with undo_uploads_on_error() as uploads, unit_of_work() as session:
+            metadata: Metadata = create_metadata(metadata_data, commit=False)
+            metadata.tags = find_tags(component_data.get("tags") or [])
+            metadata.attributes = [
+                attribute_schema.load(attribute_data)
+                for attribute_data in component_data.get("attributes") or []
+            ]
+            # * a duplicate name fails here, before anything is uploaded
+            session.flush()
+            upload_files(metadata, component_data, uploads)
+    except IntegrityError as err:
+        if not is_unique_violation(err):
+            raise
+        logger.error(f"Error creating component: {err}")
+        return f"Component {metadata_data['name']} already exists!", 406
     except ValueError as err:
         logger.error(f"Error creating component: {err}")
         return str(err), 406
 
-    user.metadatas.append(metadata)
-    user.commit()
-    add_tags(metadata.id, component_data.get("tags"))
-    add_attributes(metadata.id, component_data.get("attributes"))
-    component_data["metadata_id"] = str(metadata.id)
-    upload_to_github(component_data)
-
     compo_response: dict = component_schema.dump(metadata)
     compo_response["metadata"] = metadata_schema.dump(metadata)
 
@@ -0,0 +1,332 @@
+# SPDX-License-Identifier: MIT
+# --------------------------------------------------------------
+# |																|
+# |             Copyright 2023 - 2023, Amulya Paritosh			|
+# |																|
+# |  This file is part of Component Library Plugin for FreeCAD.	|
+# |																|
+# |               This file was created as a part of				|
+# |              Google Summer Of Code Program - 2023			|
+# |																|
+# --------------------------------------------------------------
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+
+from flask_sqlalchemy.query import Query
+from sqlalchemy import String, bindparam, cast, func, literal, select, union_all
+from sqlalchemy.orm import InstrumentedAttribute, joinedload, selectinload
+
+from ...database import db
+from ..files import File, FileType
+from ..licenses import SPDX
+from ..metadatas import Metadata
+from ..metadatas.models import metadata_tag
+from ..tags import Tag
+
+SELECTABLE_COLUMNS: frozenset[str] = frozenset(Metadata.__table__.columns.keys())
+SORTABLE_COLUMNS: frozenset[str] = frozenset(
+    ("name", "version", "maintainer", "author", "rating", "created_at", "updated_at")
+)
+ALL_FILE_TYPES: frozenset[str] = frozenset(t.name for t in FileType)
+RELEVANCE = "relevance"
+FACETS: tuple[str, ...] = ("tags", "file_types", "license")
+
+
+def component_load_options() -> tuple:
+    """
+    Returns the eager-loading plan for the relationships serialized by `ComponentSchema`.
+
+    Collections are loaded with one `SELECT ... IN` per relationship for the whole page, while
+    the many-to-one license is joined into the page query itself. A page therefore costs a fixed
+    number of statements no matter how many components it holds.
+
+    Returns:
+        tuple: The loader options to pass to `Query.options`.
+    """
+
+    return (
+        selectinload(Metadata.files),
+        selectinload(Metadata.tags),
+        selectinload(Metadata.attributes),
+        joinedload(Metadata.license),
+    )
+
+
+@dataclass(frozen=True)
+class ComponentQuerySpec:
+    """
+    The shape of a component listing query, independent of its filter values.
+
+    Requests that differ only by the values they filter on share a spec, and therefore
+    share the compiled query built by `compile_component_query` as well as SQLAlchemy's
+    cached SQL for it: filter values are passed as bound parameters at execution time.
+
+    Attributes:
+        columns (tuple[str, ...]): The columns to select, empty for whole components.
+        sort_by (str): The column to sort by, or "relevance" to keep the order of the search hits.
+        sort_ord (str): The sort order, "asc" or "desc".
+        keyset (bool): Whether the query is paginated by keyset, which needs the id and sort column.
+        by_tags (bool): Whether to filter by the `tags` parameter.
+        by_file_types (bool): Whether to filter by the `file_types` parameter.
+        by_ids (bool): Whether to filter by the `ids` parameter.
+
+    Example:
+        ```python
+        spec = ComponentQuerySpec.make(sort_by="rating", tags=["cable"])
+        query = spec.query(tags=["cable"])
+        ```
+    """
+
+    columns: tuple[str, ...] = ()
+    sort_by: str = "name"
+    sort_ord: str = "asc"
+    keyset: bool = False
+    by_tags: bool = False
+    by_file_types: bool = False
+    by_ids: bool = False
+
+    @classmethod
+    def make(
+        cls,
+        columns: Optional[list] = None,
+        sort_by: str = "name",
+        sort_ord: str = "asc",
+        keyset: bool = False,
+        tags: Optional[list] = None,
+        file_types: Optional[list] = None,
+        ids: Optional[list] = None,
+    ) -> "ComponentQuerySpec":
+        """
+        Validates the request parameters and makes the spec of their query.
+
+        Filters that cannot exclude anything are left out of the spec.
+
+        Args:
+            columns (list, optional): The columns to select. Defaults to None, whole components.
+            sort_by (str, optional): The column to sort by. Defaults to "name".
+            sort_ord (str, optional): The sort order. Defaults to "asc".
+            keyset (bool, optional): Whether the query is paginated by keyset. Defaults to False.
+            tags (list, optional): The tag labels to filter by. Defaults to None.
+            file_types (list, optional): The file types to filter by. Defaults to None, all types.
+            ids (list, optional): The metadata ids to restrict to. Defaults to None.
+
+        Returns:
+            ComponentQuerySpec: The spec of the query.
+
+        Raises:
+            ValueError: Raised when a column or the sort key is not allowed, or when sorting
+                by relevance without a search.
+        """
+
+        unknown = set(columns or ()) - SELECTABLE_COLUMNS
+        if unknown:
+            raise ValueError(f"Unknown columns {', '.join(sorted(unknown))}")
+        if sort_by == RELEVANCE:
+            if ids is None:
+                raise ValueError("Sorting by relevance needs a search_str")
+        elif sort_by not in SORTABLE_COLUMNS:
+            raise ValueError(f"Cannot sort components by {sort_by}")
+        if sort_ord not in ("asc", "desc"):
+            raise ValueError(f"Unknown sort order {sort_ord}")
+
+        return cls(
+            columns=tuple(columns or ()),
+            sort_by=sort_by,
+            sort_ord=sort_ord,
+            keyset=keyset,
+            by_tags=bool(tags),
+            by_file_types=file_types is not None and not ALL_FILE_TYPES <= set(file_types),
+            by_ids=ids is not None,
+        )
+
+    @property
+    def by_relevance(self) -> bool:
+        return self.sort_by == RELEVANCE
+
+    @property
+    def sort_column(self) -> Optional[InstrumentedAttribute]:
+        return None if self.by_relevance else getattr(Metadata, self.sort_by)
+
+    def query(self, **values) -> Query:
+        """
+        Returns a query of this shape bound to the given filter values.
+
+        Args:
+            **values: The values of the enabled filters: `tags`, `file_types` and `ids`.
+
+        Returns:
+            Query: The unordered, unpaginated query.
+        """
+
+        compiled = compile_component_query(self)
+        query = Metadata.query.filter(*compiled.criteria)
+        if compiled.entities:
+            query = query.with_entities(*compiled.entities)
+        return query.params(**{name: list(values[name]) for name in compiled.params})
+
+    def ordered_query(self, **values) -> Query:
+        """
+        Returns a query of this shape bound to the given filter values and ordered by the spec.
+
+        Relevance ordering comes from the search hits, the query is then left unordered.
+
+        Args:
+            **values: The values of the enabled filters.
+
+        Returns:
+            Query: The ordered, unpaginated query.
+        """
+
+        order_by = compile_component_query(self).order_by
+        query = self.query(**values)
+        return query if order_by is None else query.order_by(order_by)
+
+
+@dataclass(frozen=True)
+class CompiledComponentQuery:
+    criteria: tuple
+    entities: tuple
+    order_by: object
+    params: tuple[str, ...]
+
+
+@lru_cache(maxsize=256)
+def compile_component_query(spec: ComponentQuerySpec) -> CompiledComponentQuery:
+    """
+    Builds the SQL expressions of a spec once; later requests of the same shape reuse them.
+
+    Args:
+        spec (ComponentQuerySpec): The spec of the query.
+
+    Returns:
+        CompiledComponentQuery: The criteria, entities, ordering and parameter names of the query.
+    """
+
+    criteria, params = [], []
+
+    if spec.by_tags:
+        criteria.append(Metadata.tags.any(Tag.label.in_(bindparam("tags", expanding=True))))
+        params.append("tags")
+
+    if spec.by_file_types:
+        criteria.append(Metadata.files.any(File.type.in_(bindparam("file_types", expanding=True))))
+        params.append("file_types")
+    else:
+        # * every type is allowed, only components without any file are left out
+        criteria.append(Metadata.files.any())
+
+    if spec.by_ids:
+        criteria.append(Metadata.id.in_(bindparam("ids", expanding=True)))
+        params.append("ids")
+
+    entities = [getattr(Metadata, col) for col in spec.columns]
+    if entities and spec.by_relevance:
+        if "id" not in spec.columns:
+            # * rows are put back in the order of the hits by their id
+            entities.append(Metadata.id)
+    elif entities and spec.keyset:
+        # * the keyset of the last item has to be read back from the row
+        entities.extend(
+            getattr(Metadata, col) for col in (spec.sort_by, "id") if col not in spec.columns
+        )
+
+    sort_column = spec.sort_column
+    if sort_column is None:
+        order_by = None
+    elif spec.sort_ord == "desc":
+        order_by = sort_column.desc()
+    else:
+        order_by = sort_column.asc()
+
+    return CompiledComponentQuery(
+        criteria=tuple(criteria),
+        entities=tuple(entities),
+        order_by=order_by,
+        params=tuple(params),
+    )
+
+
+def validate_facets(facets: Optional[list]) -> list[str]:
+    """
+    Validates the requested facets.
+
+    Args:
+        facets (list, optional): The facets to count, among FACETS.
+
+    Returns:
+        list[str]: The distinct facets, in the order of FACETS.
+
+    Raises:
+        ValueError: Raised when a facet is unknown.
+    """
+
+    unknown = set(facets or ()) - set(FACETS)
+    if unknown:
+        raise ValueError(f"Unknown facets {', '.join(sorted(unknown))}")
+    return [facet for facet in FACETS if facet in (facets or ())]
+
+
+def facet_counts(spec: ComponentQuerySpec, facets: list[str], **values) -> dict:
+    """
+    Counts the components of the whole filtered result set per tag, file type and license,
+    with a single grouped query.
+
+    Args:
+        spec (ComponentQuerySpec): The spec of the listing query.
+        facets (list[str]): The facets to count, validated by `validate_facets`.
+        **values: The values of the enabled filters of the spec.
+
+    Returns:
+        dict: For each facet, its values and their number of components, the most common first.
+
+    Example:
+        ```python
+        facets = facet_counts(spec, ["tags", "license"], tags=["cable"])
+        # {"tags": [{"value": "cable", "count": 12}, ...], "license": [...]}
+        ```
+    """
+
+    if not facets:
+        return {}
+
+    compiled = compile_component_query(spec)
+    matching = select(Metadata.id).where(*compiled.criteria)
+
+    groups = {
+        "tags": select(
+            literal("tags").label("facet"),
+            Tag.label.label("value"),
+            func.count(metadata_tag.c.metadata_id.distinct()).label("count"),
+        )
+        .join_from(metadata_tag, Tag, metadata_tag.c.tag_id == Tag.id)
+        .where(metadata_tag.c.metadata_id.in_(matching))
+        .group_by(Tag.label),
+        "file_types": select(
+            literal("file_types").label("facet"),
+            cast(File.type, String).label("value"),
+            func.count(File.metadata_id.distinct()).label("count"),
+        )
+        .where(File.metadata_id.in_(matching))
+        .group_by(File.type),
+        "license": select(
+            literal("license").label("facet"),
+            SPDX.identifier.label("value"),
+            func.count(Metadata.id).label("count"),
+        )
+        .join_from(Metadata, SPDX, Metadata.license_id == SPDX.id)
+        .where(Metadata.id.in_(matching))
+        .group_by(SPDX.identifier),
+    }
+
+    statement = union_all(*(groups[facet] for facet in facets))
+    params = {name: list(values[name]) for name in compiled.params}
+    rows = db.session.execute(statement, params)
+
+    counts: dict[str, list] = {facet: [] for facet in facets}
+    for facet, value, count in rows:
+        counts[facet].append({"value": value, "count": count})
+    for buckets in counts.values():
+        buckets.sort(key=lambda bucket: (-bucket["count"], bucket["value"]))
+    return counts
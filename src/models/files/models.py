@@ -15,7 +15,7 @@ from __future__ import annotations
 from enum import Enum
 
 from sqlalchemy.orm import validates
-from sqlalchemy.sql.schema import Column, ForeignKey
+from sqlalchemy.sql.schema import Column, ForeignKey, Index
 from sqlalchemy.types import Enum as dbEnum
 from sqlalchemy.types import Integer, String
 
@@ -50,8 +50,8 @@ class FileType(Enum):
         """
         Converts a string value to the corresponding `FileType` enumeration member.
 
-        This class method takes a string value and evaluates it as an attribute of the `FileType` enumeration.
-        The evaluated attribute is returned as the corresponding `FileType` enumeration member.
+        This class method takes a string value and looks it up by name in the `FileType` enumeration.
+        The member found is returned as the corresponding `FileType` enumeration member.
 
         Args:
             value (str): The string value to be serialized.
@@ -59,6 +59,9 @@ class FileType(Enum):
         Returns:
             FileType: The corresponding `FileType` enumeration member.
 
+        Raises:
+            ValueError: If the value is not the name of a file type.
+
         Example:
             ```python
             value = "step"
@@ -67,7 +70,10 @@ class FileType(Enum):
             ```
         """
 
-        return eval(f"FileType.{value}")
+        try:
+            return cls[value]
+        except KeyError:
+            raise ValueError(f"Unknown file type {value}") from None
 
 
 class File(Base):
@@ -97,6 +103,12 @@ class File(Base):
 
     metadata_id = Column(GUID(), ForeignKey("metadatas.id"), nullable=False)
 
+    __table_args__ = (
+        # * the files of a component, and its `Metadata.files.any(File.type.in_(...))` filter
+        Index("ix_files_metadata_id_type", "metadata_id", "type"),
+        Index("ix_files_type", "type"),
+    )
+
     def __repr__(self) -> str:
         return f'<File "{self.url}", "{self.type}">'
 
@@ -14,14 +14,20 @@ from pathlib import Path
 from typing import Literal
 
 from flask import Response, abort, make_response, request
+from sqlalchemy.exc import IntegrityError
 from werkzeug.datastructures import FileStorage
 
+from ...database import is_unique_violation, unit_of_work
 from ..metadatas import Metadata, metadata_schema
-from ..utils import PsudoPagination, paginated_schema
-from ..utils.pagination import MAX_PER_PAGE
+from ..utils import (
+    PsudoPagination,
+    keyset_paginate,
+    paginate_query,
+    paginated_schema,
+)
 from .models import File, FileType
 from .schemas import file_schema, files_schema
-from .utils import get_repository, upload_new_file
+from .utils import get_repository, undo_uploads_on_error, upload_new_file
 
 
 def read_all():
@@ -45,15 +51,17 @@ def read_all():
     return paginated_schema(files_schema).dump(psudo_paged_query)
 
 
-def read_page(page=None, page_size=None) -> list[dict[str, str]]:
+def read_page(page=None, page_size=None, cursor=None, count="exact") -> list[dict[str, str]]:
     """
     Reads a page of files from the database and returns them in a paginated format.
 
-    If both `page` and `page_size` are not provided, it calls the `read_all()` function to retrieve all files. Otherwise, it queries the files using pagination parameters `page` and `page_size` with a maximum per page limit of `MAX_PER_PAGE`. The paginated result is serialized using `files_schema` and returned.
+    If `cursor` is given, even empty, the files are paginated by keyset on their creation time instead of by page number. Otherwise, if both `page` and `page_size` are not provided, it calls the `read_all()` function to retrieve all files. Otherwise, it queries the files using pagination parameters `page` and `page_size` with a maximum per page limit of `MAX_PER_PAGE`. The paginated result is serialized using `files_schema` and returned.
 
     Args:
             page (int, optional): The page number. Defaults to None.
             page_size (int, optional): The number of items per page. Defaults to None.
+            cursor (str, optional): The `next_cursor` of a previous page. Defaults to None.
+            count (str, optional): How the total is computed, see `paginate_query`. Defaults to "exact".
 
     Returns:
             list[dict[str, str]]: The paginated result of files.
@@ -65,12 +73,14 @@ def read_page(page=None, page_size=None) -> list[dict[str, str]]:
             ```
     """
 
+    if cursor is not None:
+        query = keyset_paginate(File.query, File.created_at, File.id, cursor, page_size)
+        return paginated_schema(files_schema).dump(query)
+
     if not all((page, page_size)):
         return read_all()
 
-    query = File.query.paginate(
-        page=page, per_page=page_size, max_per_page=MAX_PER_PAGE
-    )
+    query = paginate_query(File.query, page, page_size, count)
     return paginated_schema(files_schema).dump(query)
 
 
@@ -116,7 +126,7 @@ def create(file_data, metadata_id=None) -> tuple[dict[str, str], Literal[201]]:
             tuple[dict[str, str], Literal[201]]: A tuple containing the serialized new file and the HTTP status code 201.
 
     Raises:
-            HTTPException: If a file with the same URL already exists.
+            HTTPException: If the file type is unknown or a file with the same URL already exists.
 
     Example:
             ```python
@@ -132,18 +142,21 @@ def create(file_data, metadata_id=None) -> tuple[dict[str, str], Literal[201]]:
 
     url = file_data.get("url")
 
-    file_data["type"] = FileType.serialize(file_data.get("type"))
-
-    existing_file: File | None = File.query.filter(File.url == url).one_or_none()
-
-    if existing_file is not None:
-        abort(406, f"File with url:{url} already exists")
+    try:
+        file_data["type"] = FileType.serialize(file_data.get("type"))
+    except ValueError as err:
+        abort(406, str(err))
 
     if metadata_id is not None:
         file_data["metadata_id"] = metadata_id
 
     new_file: File = file_schema.load(file_data)
-    new_file.create()
+    try:
+        new_file.create()
+    except IntegrityError as err:
+        if not is_unique_violation(err):
+            raise
+        abort(406, f"File with url:{url} already exists")
 
     return file_schema.dump(new_file), 201
 
@@ -177,10 +190,65 @@ def delete(pk) -> Response:
     return make_response(f"{existing_file.url}:{pk} successfully deleted", 200)
 
 
+def upload_files(metadata: Metadata, upload_info: dict, uploads: list) -> list[File]:
+    """
+    Uploads the files and the thumbnail image of the request to a GitHub repository, and adds
+    them to a metadata without committing.
+
+    Args:
+                    metadata (Metadata): The metadata the files belong to.
+                    upload_info (dict): The upload information, with the branch and repository.
+                    uploads (list): The list of `undo_uploads_on_error` the uploads are recorded in,
+                                    so that they are deleted when the transaction fails.
+
+    Returns:
+                    list[File]: The new files.
+
+    Raises:
+                    ValueError: If a file has an unknown type, before anything is uploaded.
+    """
+
+    files = request.files.getlist("component_files")
+    thumbnail_file: FileStorage = request.files.get("thumbnail_image")
+    access_token = request.headers.get("X-Access-Token", "")
+
+    repo = get_repository(access_token, upload_info.get("repository"))
+
+    # * the types are checked before anything is uploaded
+    file_types = [FileType.serialize(file.filename.rsplit(".", 1)[-1]) for file in files]
+
+    new_files = []
+    for file, file_type in zip(files, file_types):
+        content = upload_new_file(
+            repo,
+            upload_info.get("branch"),
+            file.stream.read(),
+            f"{metadata.name}/{file.filename.rsplit('/', 1)[-1]}",
+        )
+        uploads.append((repo, upload_info.get("branch"), content))
+        new_files.append(File(url=content.download_url, size=content.size, type=file_type))
+    metadata.files.extend(new_files)
+
+    if thumbnail_file is not None:
+        content = upload_new_file(
+            repo,
+            upload_info.get("branch"),
+            thumbnail_file.stream.read(),
+            f"{metadata.name}/thumbnail{Path(thumbnail_file.filename).suffix}",
+        )
+        uploads.append((repo, upload_info.get("branch"), content))
+        metadata.thumbnail = content.download_url
+    else:
+        metadata.thumbnail = None
+    return new_files
+
+
 def upload_to_github(upload_info):
     """
     Uploads files and a thumbnail image to a GitHub repository and updates the metadata.
 
+    The files uploaded are deleted from the repository when the new rows fail to commit.
+
     Args:
                     upload_info (dict): The upload information.
 
@@ -188,7 +256,8 @@ def upload_to_github(upload_info):
                     tuple[dict, Literal[201]]: A tuple containing the response dictionary and the HTTP status code 201.
 
     Raises:
-                    HTTPException: If the metadata with the specified ID is not found.
+                    HTTPException: If the metadata with the specified ID is not found, a file has an
+                                    unknown type, or a file or thumbnail with the same URL already exists.
 
     Example:
                     ```python
@@ -202,51 +271,25 @@ def upload_to_github(upload_info):
                     ```
     """
 
-    files = request.files.getlist("component_files")
-    thumbnail_file: FileStorage = request.files.get("thumbnail_image")
-    access_token = request.headers.get("X-Access-Token", "")
-
     metadata: Metadata | None = Metadata.query.filter(
         Metadata.id == upload_info.get("metadata_id")
     ).one_or_none()
     if metadata is None:
         abort(404, f"Metadata with id {upload_info.get('metadata_id')} not found")
 
-    repo = get_repository(access_token, upload_info.get("repository"))
+    try:
+        with undo_uploads_on_error() as uploads, unit_of_work():
+            new_files = upload_files(metadata, upload_info, uploads)
+    except IntegrityError as err:
+        if not is_unique_violation(err):
+            raise
+        abort(406, f"A file or the thumbnail of {metadata.name} already exists")
+    except ValueError as err:
+        abort(406, str(err))
 
     response = {
-        "files": [],
-        "metadata": None,
+        "files": files_schema.dump(new_files),
+        "metadata": metadata_schema.dump(metadata),
     }
-    for file in files:
-        content = upload_new_file(
-            repo,
-            upload_info.get("branch"),
-            file.stream.read(),
-            f"{metadata.name}/{file.filename.rsplit('/', 1)[-1]}",
-        )
-
-        resp, _ = create(
-            {
-                "metadata_id": str(metadata.id),
-                "size": content.size,
-                "type": file.filename.rsplit(".", 1)[-1],
-                "url": content.download_url,
-            }
-        )
-        response["files"].append(resp)
-
-    if thumbnail_file is not None:
-        content = upload_new_file(
-            repo,
-            upload_info.get("branch"),
-            thumbnail_file.stream.read(),
-            f"{metadata.name}/thumbnail{Path(thumbnail_file.filename).suffix}",
-        )
-        metadata.thumbnail = content.download_url
-    else:
-        metadata.thumbnail = None
-    metadata.commit()
-    response["metadata"] = metadata_schema.dump(metadata)
 
     return response, 201
@@ -10,9 +10,11 @@
 # |																|
 # --------------------------------------------------------------
 
+from contextlib import contextmanager
 from functools import lru_cache
+from typing import Iterator
 
-from github import ContentFile, Github, Repository
+from github import ContentFile, Github, GithubException, Repository
 
 from ...log import logger
 
@@ -137,3 +139,34 @@ def upload_new_file(
         raw_file_data,
         branch=branch,
     )["content"]
+
+
+@contextmanager
+def undo_uploads_on_error() -> Iterator[list]:
+    """
+    Yields a list to record the uploads of a block in, and deletes the uploaded files from
+    their repository when the block raises, such as when the transaction adding their rows
+    fails to commit.
+
+    Yields:
+        list: The `(repository, branch, content)` of each uploaded file.
+
+    Example:
+        ```python
+        with undo_uploads_on_error() as uploads, unit_of_work():
+            upload_files(metadata, upload_info, uploads)
+        ```
+    """
+
+    uploads: list[tuple[Repository.Repository, str, ContentFile.ContentFile]] = []
+    try:
+        yield uploads
+    except BaseException:
+        for repository, branch, content in reversed(uploads):
+            try:
+                repository.delete_file(
+                    content.path, "removing files of a failed upload", content.sha, branch=branch
+                )
+            except GithubException as err:
+                logger.error(f"Error deleting the uploaded file {content.path}: {err}")
+        raise
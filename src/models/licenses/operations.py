@@ -14,7 +14,9 @@
 from typing import Literal
 
 from flask import abort
+from sqlalchemy.exc import IntegrityError
 
+from ...database import is_unique_violation
 from ..utils import PsudoPagination, paginated_schema
 from .models import SPDX
 from .schemas import spdx_schema, spdxs_schema
@@ -100,11 +102,11 @@ def create(spdx_license) -> tuple[dict[str, str], Literal[201]]:
 		```
 	"""
 
-	existing_license = SPDX.query.filter(SPDX.fullname == spdx_license["fullname"]).one_or_none()
-
-	if existing_license is not None:
-		abort(406, f"License {spdx_license['fullname']} already exists")
-
 	new_license: SPDX = spdx_schema.load(spdx_license)
-	new_license.create()
+	try:
+		new_license.create()
+	except IntegrityError as err:
+		if not is_unique_violation(err):
+			raise
+		abort(406, f"License {spdx_license['fullname']} already exists")
 	return spdx_schema.dump(new_license), 201
@@ -1,3 +1,3 @@
 from .models import Metadata
-from .operations import _create, add_attributes, add_tags
+from .operations import _create, add_attributes, add_tags, find_tags
 from .schemas import MetadataSchema, metadata_schema, metadatas_schema
@@ -12,26 +12,45 @@
 
 import re
 
-from sqlalchemy import Column, ForeignKey
+from sqlalchemy import Column, ForeignKey, Index, exists, insert, literal, select
 from sqlalchemy.orm import relationship, validates
 from sqlalchemy.types import Float, String
 
 from ...config import Config
-from ...database import ElasticSearchBase, db
+from ...database import (
+    ElasticSearchBase,
+    SearchStage,
+    db,
+    fulltext_rank,
+    record_written_tables,
+    staged_search,
+)
 from ...database.guid import GUID
-from ...database.utils import make_fuzzy_query
+from ...database.indices import ANALYSIS_SETTINGS, NAME_MAPPING
 from ...log import logger
 from ...validation import email_validator, url_validator
 from ..files import File  # * Never remove this import.
 from ..tags import Tag  # * Never remove this import.
+from ..utils import ranked_query
 
 metadata_tag = db.Table(
     "metadata_tag",
     Column("metadata_id", GUID(), ForeignKey("metadatas.id")),
     Column("tag_id", GUID(), ForeignKey("tags.id")),
+    # * the tags of a component, and the components of a tag
+    Index("ix_metadata_tag_metadata_id_tag_id", "metadata_id", "tag_id"),
+    Index("ix_metadata_tag_tag_id_metadata_id", "tag_id", "metadata_id"),
 )
 
 
+def _name_part(search_key: str) -> str:
+    """
+    Returns the part of a search key matched against names, before any `key:value` filter.
+    """
+
+    return re.findall(r"([\w ]*)[^\w:][\w*:.*$]*", search_key + " ")[0]
+
+
 class InvalidRating(Exception):
     """
     Exception class for representing an invalid rating.
@@ -69,6 +88,15 @@ class Metadata(ElasticSearchBase):
     """
 
     __tablename__: str = "metadatas"
+    __fulltext__: str = "name"
+    __index_settings__: dict = ANALYSIS_SETTINGS
+    __index_mappings__: dict = {
+        "dynamic": False,
+        "properties": {
+            "id": {"type": "keyword", "doc_values": False},
+            "name": NAME_MAPPING,
+        },
+    }
     # __allow_unmapped__ = True
 
     name = Column(String(200), nullable=False, unique=True)
@@ -92,9 +120,17 @@ class Metadata(ElasticSearchBase):
         "Attribute", backref="metadata", cascade="all, delete, delete-orphan"
     )
 
+    __table_args__ = (
+        # * the sortable columns, with the id keyset pages are ordered by after them
+        Index("ix_metadatas_name_id", "name", "id"),
+        Index("ix_metadatas_rating_id", "rating", "id"),
+        Index("ix_metadatas_created_at_id", "created_at", "id"),
+    )
+
     @validates("attributes")
     def validate_tool(self, key, attribute):
-        assert attribute.key not in [att.name for att in self.attributes]
+        if any(att.key == attribute.key for att in self.attributes if att is not attribute):
+            raise ValueError(f"Attribute {attribute.key} already exists!")
         return attribute
 
     @validates("maintainer")
@@ -236,6 +272,46 @@ class Metadata(ElasticSearchBase):
         self.tags.append(tag)
         self.commit()
 
+    def add_tags(self, tag_ids) -> None:
+        """
+        Adds tags to the metadata with a single insert, skipping those it already has.
+
+        The links are inserted with `INSERT ... SELECT` guarded by `NOT EXISTS`, so adding a
+        tag twice needs no lookup of the current tags. When tags were added, `updated_at` is
+        touched so that the metadata is reindexed and cached reads of it are invalidated. The
+        changes are committed.
+
+        Args:
+            tag_ids: The ids of the tags to add.
+
+        Returns:
+            None
+
+        Example:
+            ```python
+            metadata.add_tags([tag.id for tag in tags])
+            ```
+        """
+
+        session = db.session
+        result = session.execute(
+            insert(metadata_tag).from_select(
+                ["metadata_id", "tag_id"],
+                select(literal(self.id, GUID()), Tag.id).where(
+                    Tag.id.in_(tag_ids),
+                    ~exists().where(
+                        metadata_tag.c.metadata_id == self.id,
+                        metadata_tag.c.tag_id == Tag.id,
+                    ),
+                ),
+            )
+        )
+        if result.rowcount:
+            record_written_tables(session, "metadata_tag")
+            session.expire(self, ["tags"])
+            self.updated_at = db.func.current_timestamp()
+        self.commit()
+
     def add_file(self, file):
         """
         Adds a file to the metadata.
@@ -269,7 +345,7 @@ class Metadata(ElasticSearchBase):
         """
         Deletes the metadata.
 
-        This method calls the `delete` method of the superclass, passing the `"name"` key and the `name` attribute of the instance.
+        Its search document is deleted through the search outbox.
 
         Returns:
             The result of the `delete` method.
@@ -282,13 +358,13 @@ class Metadata(ElasticSearchBase):
             ```
         """
 
-        return super().delete("name", self.name)
+        return super().delete()
 
     def update(self):
         """
         Updates the metadata.
 
-        This method calls the `update` method of the superclass, passing the `"name"` key and the `name` attribute of the instance.
+        Its search document is reindexed through the search outbox.
 
         Returns:
             The result of the `update` method.
@@ -301,30 +377,110 @@ class Metadata(ElasticSearchBase):
             ```
         """
 
-        return super().update("name", self.name)
+        return super().update()
 
     def __repr__(self) -> str:
         return f'<Metadata "{self.name}">'
 
     @classmethod
-    def elasticsearch(cls, search_key: str) -> set[str]:
+    def elasticsearch(cls, search_key: str) -> list[tuple[str, float]]:
+        """
+        Performs an Elasticsearch search based on the specified search key and returns the matching ids.
+
+        The stages of `search_stages` are tried in turn, fuzzy matching only running when the
+        exact lookup finds nothing and the prefix one too few names.
+
+        Args:
+            search_key: The key to search for.
+
+        Returns:
+            list[tuple[str, float]]: The ids and scores of the matching metadata, most relevant first.
+        """
+
+        _, hits = staged_search.run(
+            cls.__tablename__,
+            cls.search_stages(search_key),
+            lambda query: cls.search_ids(cls.__tablename__, query, "id"),
+        )
+        return hits
+
+    @classmethod
+    def fulltext(cls, search_key: str) -> list[tuple[str, float]]:
         """
-        Performs an Elasticsearch search based on the specified search key and returns a set of matching names.
+        Performs a full text search of the names in the database and returns the matching ids.
 
         Args:
             search_key: The key to search for.
 
         Returns:
-            set[str]: A set of matching names.
+            list[tuple[str, float]]: The ids and scores of the matching metadata, most relevant first.
         """
 
-        search_key += " "
-        match: str = re.findall(r"([\w ]*)[^\w:][\w*:.*$]*", search_key)[0]
+        return fulltext_rank(cls, _name_part(search_key).split())
 
-        # value_list = re.split(r" |,|\||-|_|\.", search_key)
-        query_list = [make_fuzzy_query(value) for value in match.split(" ")]
-        # query_list.extend(make_regexp_query(value) for value in value_list)
-        query_list.append(
+    @classmethod
+    def sql_search(cls, search_key: str) -> list[tuple[str, float]]:
+        """
+        Searches the names in SQL for the whole search key and its words, when Elasticsearch
+        is unavailable.
+
+        Args:
+            search_key: The key to search for.
+
+        Returns:
+            list[tuple[str, float]]: The ids of the matching metadata, the best first, with
+                decreasing scores.
+        """
+
+        match: str = " ".join(_name_part(search_key).split())
+        if not match:
+            return []
+
+        ids = ranked_query(cls, cls.name, match, None).with_entities(cls.id).all()
+        return [(str(id_), float(len(ids) - rank)) for rank, (id_,) in enumerate(ids)]
+
+    @classmethod
+    def search_stages(cls, search_key: str) -> list[SearchStage]:
+        """
+        Makes the stages of the Elasticsearch search of names, from the cheapest to the most
+        expensive.
+
+        - exact: the whole name as a term of `name.keyword`, or as a phrase; a search stops
+          there as soon as it matches.
+        - prefix: adds every word as a prefix, through the edge n-grams of `name.prefix`.
+        - fuzzy: adds fuzzy matching of the words and `more_like_this`.
+
+        Each stage keeps the clauses of the previous ones, so the best matches rank first
+        whichever stage a search stops at. The attribute filters of the search key, such as
+        `key:value`, are left out.
+
+        Args:
+            search_key: The key to search for.
+
+        Returns:
+            list[SearchStage]: The stages.
+        """
+
+        match: str = _name_part(search_key).strip()
+
+        exact = [
+            {"term": {"name.keyword": {"value": match, "boost": 10}}},
+            {"match_phrase": {"name": {"query": match, "boost": 5}}},
+        ]
+        prefix = [
+            {"match": {"name.prefix": {"query": match, "operator": "and", "boost": 3}}},
+        ]
+        fuzzy = [
+            {
+                "match": {
+                    "name": {
+                        "query": match,
+                        "fuzziness": "AUTO",
+                        "prefix_length": 1,
+                        "max_expansions": 50,
+                    }
+                }
+            },
             {
                 "more_like_this": {
                     "fields": ["name"],
@@ -332,14 +488,26 @@ class Metadata(ElasticSearchBase):
                     "min_term_freq": 1,
                     "max_query_terms": 12,
                 }
-            }
-        )
+            },
+        ]
+
+        return [
+            SearchStage("exact", {"bool": {"should": exact}}, min_hits=1),
+            SearchStage("prefix", {"bool": {"should": exact + prefix}}),
+            SearchStage("fuzzy", {"bool": {"should": exact + prefix + fuzzy}}),
+        ]
 
-        query = {
-            "bool": {
-                "should": query_list,
-            }
-        }
-        response = super().elasticsearch(cls.__tablename__, query)
+    @classmethod
+    def make_query(cls, search_key: str) -> dict:
+        """
+        Makes the Elasticsearch query matching the names of the metadata with the search key,
+        the query of the last stage of `search_stages`.
+
+        Args:
+            search_key: The key to search for.
+
+        Returns:
+            dict: The Elasticsearch query.
+        """
 
-        return {hit["_source"]["name"] for hit in response["hits"]["hits"]}
+        return cls.search_stages(search_key)[-1].query
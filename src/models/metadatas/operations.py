@@ -13,13 +13,22 @@
 from typing import Literal
 
 from flask import Response, abort, make_response
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
 
+from ...database import db, is_unique_violation
 from ...log import logger
 from ..attributes import Attribute, attribute_schema, attributes_schema
 from ..files import File, files_schema
 from ..tags import Tag, tags_schema
-from ..utils import PsudoPagination, paginated_schema, search_query
-from ..utils.pagination import MAX_PER_PAGE
+from ..utils import (
+    SEARCH_LIMIT,
+    PsudoPagination,
+    keyset_paginate,
+    paginate_query,
+    paginated_schema,
+    search_query,
+)
 from .models import Metadata
 from .schemas import metadata_schema, metadatas_schema
 
@@ -46,16 +55,19 @@ def read_all():
     return paginated_schema(metadatas_schema).dump(psudo_paged_query)
 
 
-def read_page(page=None, page_size=None):
+def read_page(page=None, page_size=None, cursor=None, count="exact"):
     """
     Reads a page of metadata.
 
-    If `page` and `page_size` are not provided, it calls the `read_all` function to retrieve all metadata.
+    If `cursor` is given, even empty, the metadata is paginated by keyset on its creation time.
+    Otherwise, if `page` and `page_size` are not provided, it calls the `read_all` function to retrieve all metadata.
     Otherwise, it queries the specified page of metadata using pagination and serializes the result using the `metadatas_schema` schema.
 
     Args:
             page (int): The page number to retrieve.
             page_size (int): The number of items per page.
+            cursor (str): The `next_cursor` of a previous page.
+            count (str): How the total is computed, see `paginate_query`.
 
     Returns:
             dict: The serialized paginated metadata.
@@ -67,12 +79,16 @@ def read_page(page=None, page_size=None):
             ```
     """
 
+    if cursor is not None:
+        query = keyset_paginate(
+            Metadata.query, Metadata.created_at, Metadata.id, cursor, page_size
+        )
+        return paginated_schema(metadatas_schema).dump(query)
+
     if not all((page, page_size)):
         return read_all()
 
-    query = Metadata.query.paginate(
-        page=page, per_page=page_size, max_per_page=MAX_PER_PAGE
-    )
+    query = paginate_query(Metadata.query, page, page_size, count)
     return paginated_schema(metadatas_schema).dump(query)
 
 
@@ -108,18 +124,21 @@ def read_one(pk) -> tuple[dict[str, str], Literal[200]]:
     return metadata_schema.dump(metadata), 200
 
 
-def _create(metadata: dict) -> Metadata:
+def _create(metadata: dict, commit: bool = True) -> Metadata:
     """
     Creates a new metadata entry.
 
     Args:
             metadata (dict): The metadata to create.
+            commit (bool, optional): Whether to commit the entry, rather than only adding it to
+                    the session, where a duplicate name raises `IntegrityError` on flush.
+                    Defaults to True.
 
     Returns:
             Metadata: The created metadata entry.
 
     Raises:
-            HTTPException: Raised when the metadata with the same name already exists.
+            ValueError: Raised when the metadata with the same name already exists.
 
     Example:
             ```python
@@ -132,17 +151,19 @@ def _create(metadata: dict) -> Metadata:
             ```
     """
 
-    existing_metadata = Metadata.query.filter(
-        Metadata.name == metadata.get("name")
-    ).one_or_none()
-
-    if existing_metadata is not None:
-        raise ValueError(f"Metadata with name {metadata.get('name')} already exists!")
-
     logger.info(metadata)
 
     new_metadata: Metadata = metadata_schema.load(metadata)
-    new_metadata.create()
+    if not commit:
+        db.session.add(new_metadata)
+        return new_metadata
+
+    try:
+        new_metadata.create()
+    except IntegrityError as err:
+        if not is_unique_violation(err):
+            raise
+        raise ValueError(f"Metadata with name {metadata.get('name')} already exists!") from err
     return new_metadata
 
 
@@ -233,21 +254,25 @@ def read_tags(pk) -> list[dict[str, str]]:
 
 def add_tags(pk, tags) -> Response:
     """
-    Retrieves the tags of a metadata entry.
+    Adds tags to a metadata entry, by their labels.
+
+    All labels are looked up with one query, and tags the metadata already has are skipped.
+    Nothing is added when one of the labels is not a tag.
 
     Args:
             pk: The primary key of the metadata entry.
+            tags (list): The labels of the tags to add.
 
     Returns:
-            list: A list of dictionaries representing the tags of the metadata entry.
+            Response: A response indicating that the tags were added.
 
     Raises:
-            HTTPException: Raised when the metadata with the specified primary key is not found.
+            HTTPException: Raised when the metadata with the specified primary key is not found,
+                    or when some labels are not tags.
 
     Example:
             ```python
-            result = read_tags(pk=1)
-            print(result)
+            response = add_tags(pk=1, tags=["screw", "m3"])
             ```
     """
 
@@ -258,15 +283,36 @@ def add_tags(pk, tags) -> Response:
     if existing_metadata is None:
         abort(404, f"Metadata with id {pk} not found")
 
-    for tag in tags:
-        existing_tag: Tag | None = Tag.query.filter(Tag.label == tag).one_or_none()
+    if existing_tags := find_tags(tags or []):
+        existing_metadata.add_tags([tag.id for tag in existing_tags])
+
+    return make_response("tags added successfully", 200)
 
-        if existing_tag is None:
-            abort(404, f"tag {tag} does not exist!")
 
-        existing_metadata.add_tag(existing_tag)
+def find_tags(labels: list[str]) -> list[Tag]:
+    """
+    Looks tags up by their labels, with one query.
 
-    return make_response("tags added successfully", 200)
+    Args:
+            labels (list[str]): The labels of the tags.
+
+    Returns:
+            list[Tag]: The tags, once each.
+
+    Raises:
+            HTTPException: Raised when some labels are not tags.
+    """
+
+    labels = list(dict.fromkeys(labels))
+    if not labels:
+        return []
+
+    existing_tags = {
+        tag.label: tag for tag in db.session.scalars(select(Tag).where(Tag.label.in_(labels)))
+    }
+    if missing := [label for label in labels if label not in existing_tags]:
+        abort(404, f"tags {', '.join(missing)} do not exist!")
+    return list(existing_tags.values())
 
 
 def add_files(pk, file_ids: list) -> Response:
@@ -338,24 +384,25 @@ def read_files(pk) -> list[dict[str, str]]:
     return files_schema.dump(existing_metadata.files)
 
 
-def search(search_key):
+def search(search_str, limit=SEARCH_LIMIT):
     """
     Searches for metadata entries based on a search key.
 
     Args:
-            search_key: The search key to match against the metadata name.
+            search_str: The search string to match against the metadata name.
+            limit: The maximum number of results.
 
     Returns:
             list: A list of dictionaries representing the matched metadata entries.
 
     Example:
             ```python
-            result = search(search_key="example")
+            result = search(search_str="example")
             print(result)
             ```
     """
 
-    metadatas = search_query(Metadata, Metadata.name, search_key)
+    metadatas = search_query(Metadata, Metadata.name, search_str, limit)
     return metadatas_schema.dump(metadatas)
 
 
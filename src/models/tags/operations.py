@@ -13,10 +13,18 @@
 from typing import Literal
 
 from flask import Response, abort, make_response
+from sqlalchemy.exc import IntegrityError
 
+from ...database import is_unique_violation
 from ...log import logger
-from ..utils import PsudoPagination, paginated_schema, search_query
-from ..utils.pagination import MAX_PER_PAGE
+from ..utils import (
+    SEARCH_LIMIT,
+    PsudoPagination,
+    keyset_paginate,
+    paginate_query,
+    paginated_schema,
+    search_query,
+)
 from .models import Tag
 from .schemas import tag_schema, tags_schema
 
@@ -40,13 +48,17 @@ def read_all():
     return paginated_schema(tags_schema).dump(psudo_paged_query)
 
 
-def read_page(page=None, page_size=None):
+def read_page(page=None, page_size=None, cursor=None, count="exact"):
     """
     Retrieves a paginated result of tags.
 
+    If `cursor` is given, even empty, the tags are paginated by keyset on their creation time instead of by page number.
+
     Args:
             page (int): The page number.
             page_size (int): The number of tags per page.
+            cursor (str): The `next_cursor` of a previous page.
+            count (str): How the total is computed, see `paginate_query`.
 
     Returns:
             dict: A dictionary representing the paginated result of tags.
@@ -58,9 +70,13 @@ def read_page(page=None, page_size=None):
             ```
     """
 
+    if cursor is not None:
+        query = keyset_paginate(Tag.query, Tag.created_at, Tag.id, cursor, page_size)
+        return paginated_schema(tags_schema).dump(query)
+
     if not all((page, page_size)):
         return read_all()
-    query = Tag.query.paginate(page=page, per_page=page_size, max_per_page=MAX_PER_PAGE)
+    query = paginate_query(Tag.query, page, page_size, count)
     return paginated_schema(tags_schema).dump(query)
 
 
@@ -113,13 +129,14 @@ def create(tag) -> tuple[dict[str, str], Literal[201]]:
     """
 
     label: str = tag.get("label")
-    existing_tag: Tag | None = Tag.query.filter(Tag.label == label).one_or_none()
-
-    if existing_tag is not None:
-        abort(406, f"Tag with label {label} already exists")
 
     new_tag: Tag = tag_schema.load(tag)
-    new_tag.create()
+    try:
+        new_tag.create()
+    except IntegrityError as err:
+        if not is_unique_violation(err):
+            raise
+        abort(406, f"Tag with label {label} already exists")
     return tag_schema.dump(new_tag), 201
 
 
@@ -176,22 +193,23 @@ def get_metadatas(tag):
         logger.info(existing_tag)
 
 
-def search(search_key):
+def search(search_str, limit=SEARCH_LIMIT):
     """
     Searches for tags based on a search key.
 
     Args:
-            search_key: The search key to match against tag labels.
+            search_str: The search string to match against tag labels.
+            limit: The maximum number of results.
 
     Returns:
             list: A list of tags matching the search key.
 
     Example:
             ```python
-            result = search(search_key="example")
+            result = search(search_str="example")
             print(result)
             ```
     """
 
-    tags = search_query(Tag, Tag.label, search_key)
+    tags = search_query(Tag, Tag.label, search_str, limit)
     return tags_schema.dump(tags)
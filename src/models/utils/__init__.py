@@ -10,5 +10,12 @@
 # |																|
 # --------------------------------------------------------------
 
-from .pagination import PsudoPagination, QueryPagination, paginated_schema
-from .search import search_query
+from .pagination import (
+    KeysetPagination,
+    PsudoPagination,
+    QueryPagination,
+    keyset_paginate,
+    paginate_query,
+    paginated_schema,
+)
+from .search import SEARCH_LIMIT, ranked_query, search_query
@@ -11,13 +11,31 @@
 #|																|
 # --------------------------------------------------------------
 
+import base64
+import binascii
+import json
+from collections import OrderedDict
 from dataclasses import dataclass
+from datetime import datetime
+from threading import Lock
+from typing import Any, Literal
 
+from flask import abort
 from flask_sqlalchemy.pagination import Pagination
+from flask_sqlalchemy.pagination import QueryPagination as SQLQueryPagination
+from flask_sqlalchemy.query import Query
 from marshmallow import Schema, fields
 from marshmallow_sqlalchemy.schema import SQLAlchemyAutoSchemaMeta
+from sqlalchemy import and_, func, or_
+from sqlalchemy.orm import InstrumentedAttribute
+
+from ...database.events import generations
 
 MAX_PER_PAGE = 50
+DEFAULT_PER_PAGE = 20
+
+COUNT_CACHE_SIZE = 256
+COUNTED_TABLES = ("metadatas", "files", "tags", "attributes")
 
 @dataclass()
 class PsudoPagination:
@@ -42,6 +60,199 @@ class PsudoPagination:
 	total: int
 
 
+@dataclass()
+class KeysetPagination:
+	"""
+	Data class representing one page of keyset (cursor) pagination.
+
+	Attributes:
+		per_page (int): The number of items per page.
+		items (list): The list of items on the current page.
+		next_cursor (str | None): The opaque cursor of the next page, or None on the last page.
+
+	Example:
+		```python
+		pagination = KeysetPagination(per_page=10, items=[...], next_cursor="WyJhIiwgIjEiXQ==")
+		```
+	"""
+
+	per_page: int
+	items: list
+	next_cursor: str | None
+
+	def __iter__(self):
+		return iter(self.items)
+
+	@property
+	def has_next(self) -> bool:
+		return self.next_cursor is not None
+
+
+def encode_cursor(values: tuple) -> str:
+	"""
+	Encodes the keyset values of the last item of a page into an opaque cursor.
+
+	Args:
+		values (tuple): The sort column value and the id of the last item.
+
+	Returns:
+		str: The url safe cursor.
+	"""
+
+	raw = json.dumps(values, default=str).encode("utf-8")
+	return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(
+	cursor: str | None, columns: tuple[InstrumentedAttribute | None, ...]
+) -> tuple | None:
+	"""
+	Decodes a cursor made by `encode_cursor` back into typed keyset values.
+
+	Each value is coerced to the python type of its column, so that it binds to the
+	query the same way the original column value would.
+
+	Args:
+		cursor (str | None): The cursor to decode. An empty cursor denotes the first page.
+		columns (tuple[InstrumentedAttribute, ...]): The keyset columns, in cursor order. A None
+			column leaves its value as decoded from json.
+
+	Returns:
+		tuple | None: The keyset values, or None for the first page.
+
+	Raises:
+		HTTPException: Raised with 400 when the cursor is malformed.
+	"""
+
+	if not cursor:
+		return None
+
+	try:
+		values = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+		if len(values) != len(columns):
+			raise ValueError(cursor)
+		return tuple(_coerce(column, value) for column, value in zip(columns, values))
+	except (binascii.Error, UnicodeError, TypeError, ValueError):
+		abort(400, f"Invalid cursor {cursor}")
+
+
+def python_type_of(column: InstrumentedAttribute) -> type | None:
+	"""
+	Returns the python type of a column, or None for custom types that do not declare one.
+
+	Args:
+		column (InstrumentedAttribute): The column to inspect.
+
+	Returns:
+		type | None: The python type of the column values.
+	"""
+
+	try:
+		return column.type.python_type
+	except NotImplementedError:
+		return None
+
+
+def _coerce(column: InstrumentedAttribute | None, value: Any) -> Any:
+	python_type = None if column is None else python_type_of(column)
+	if value is None or python_type is None:
+		# * custom types such as GUID bind their json value as is
+		return value
+	if python_type is datetime:
+		return datetime.fromisoformat(value)
+	return python_type(value)
+
+
+def keyset_paginate(
+	query: Query,
+	sort_column: InstrumentedAttribute,
+	id_column: InstrumentedAttribute,
+	cursor: str | None = None,
+	per_page: int | None = None,
+	sort_ord: Literal["desc"] | Literal["asc"] = "asc",
+	max_per_page: int = MAX_PER_PAGE,
+) -> KeysetPagination:
+	"""
+	Paginates a query by seeking past the last item of the previous page.
+
+	The query is ordered by `sort_column` and then `id_column` as a tie breaker, and the
+	cursor holds both values of the last item served. Seeking with a WHERE clause instead
+	of an OFFSET keeps every page as cheap as the first one, and no COUNT is issued.
+	NULL sort values are ordered first when ascending and last when descending.
+
+	Args:
+		query (Query): The unordered query to paginate.
+		sort_column (InstrumentedAttribute): The column the items are sorted by.
+		id_column (InstrumentedAttribute): The unique column used as a tie breaker.
+		cursor (str | None, optional): The cursor of the page to read. Defaults to None, the first page.
+		per_page (int | None, optional): The number of items per page. Defaults to DEFAULT_PER_PAGE.
+		sort_ord (Literal["desc"] | Literal["asc"], optional): The sort order. Defaults to "asc".
+		max_per_page (int, optional): The maximum number of items per page. Defaults to MAX_PER_PAGE.
+
+	Returns:
+		KeysetPagination: The requested page with the cursor of the next one.
+
+	Example:
+		```python
+		page = keyset_paginate(Tag.query, Tag.created_at, Tag.id, cursor=None, per_page=10)
+		```
+	"""
+
+	per_page = min(per_page or DEFAULT_PER_PAGE, max_per_page)
+	last = decode_cursor(cursor, (sort_column, id_column))
+
+	if sort_ord == "desc":
+		ordering = (sort_column.desc().nulls_last(), id_column.desc())
+	else:
+		ordering = (sort_column.asc().nulls_first(), id_column.asc())
+
+	if last is not None:
+		seek_column, (last_value, last_id) = sort_column, last
+		is_sqlite = query.session.get_bind().dialect.name == "sqlite"
+		if is_sqlite and python_type_of(sort_column) is datetime:
+			# * SQLite stores server side timestamps without the fractional seconds that bound
+			# * datetimes carry, so both sides are compared through its datetime() function
+			seek_column = func.datetime(sort_column)
+			if last_value is not None:
+				last_value = func.datetime(last_value)
+		query = query.filter(
+			_seek_condition(seek_column, id_column, last_value, last_id, sort_ord)
+		)
+
+	rows = query.order_by(*ordering).limit(per_page + 1).all()
+	items = rows[:per_page]
+
+	next_cursor = None
+	if len(rows) > per_page:
+		last_item = items[-1]
+		next_cursor = encode_cursor(
+			(getattr(last_item, sort_column.key), getattr(last_item, id_column.key))
+		)
+
+	return KeysetPagination(per_page=per_page, items=items, next_cursor=next_cursor)
+
+
+def _seek_condition(sort_column, id_column, last_value, last_id, sort_ord):
+	if sort_ord == "desc":
+		if last_value is None:
+			return and_(sort_column.is_(None), id_column < last_id)
+		return or_(
+			sort_column < last_value,
+			and_(sort_column == last_value, id_column < last_id),
+			sort_column.is_(None),
+		)
+
+	if last_value is None:
+		return or_(
+			and_(sort_column.is_(None), id_column > last_id),
+			sort_column.is_not(None),
+		)
+	return or_(
+		sort_column > last_value,
+		and_(sort_column == last_value, id_column > last_id),
+	)
+
+
 class QueryPagination(Pagination):
 	"""
 	A subclass of Pagination that provides querying functionality.
@@ -116,6 +327,126 @@ class QueryPagination(Pagination):
 		return len(self.queried_list)
 
 
+class CountCache:
+	"""
+	A bounded LRU of COUNT(*) results keyed by the compiled count query and its parameters.
+
+	Every entry remembers the generations of `COUNTED_TABLES` it was computed at, and is
+	discarded on read once any of those tables has been written since.
+
+	Methods:
+		get(key): Returns the cached total of a query, or None when missing or stale.
+		set(key, total): Caches the total of a query at the current generations.
+	"""
+
+	def __init__(self, size: int = COUNT_CACHE_SIZE) -> None:
+		self.size = size
+		self._entries: OrderedDict[str, tuple[tuple[int, ...], int]] = OrderedDict()
+		self._lock = Lock()
+
+	def get(self, key: str) -> int | None:
+		with self._lock:
+			entry = self._entries.get(key)
+			if entry is None:
+				return None
+			generation, total = entry
+			if generation != generations.current(*COUNTED_TABLES):
+				del self._entries[key]
+				return None
+			self._entries.move_to_end(key)
+			return total
+
+	def set(self, key: str, total: int) -> None:
+		with self._lock:
+			self._entries[key] = (generations.current(*COUNTED_TABLES), total)
+			self._entries.move_to_end(key)
+			while len(self._entries) > self.size:
+				self._entries.popitem(last=False)
+
+
+count_cache = CountCache()
+
+
+class CachedCountPagination(SQLQueryPagination):
+	"""
+	A query pagination that reuses the total of an identical query until its tables are written.
+	"""
+
+	def _query_count(self) -> int:
+		compiled = self._query_args["query"].order_by(None).statement.compile()
+		key = f"{compiled}{sorted(compiled.params.items())!r}"
+
+		total = count_cache.get(key)
+		if total is None:
+			total = super()._query_count()
+			count_cache.set(key, total)
+		return total
+
+
+class ProbePagination(SQLQueryPagination):
+	"""
+	A query pagination that never counts. It reads one row past the page instead, to tell
+	whether a next page exists, and leaves `total` as None.
+	"""
+
+	def _query_items(self) -> list:
+		query = self._query_args["query"]
+		items = query.limit(self.per_page + 1).offset(self._query_offset).all()
+		self._has_next = len(items) > self.per_page
+		return items[: self.per_page]
+
+	@property
+	def has_next(self) -> bool:
+		return self._has_next
+
+
+PAGINATIONS: dict[str, type[SQLQueryPagination]] = {
+	"exact": SQLQueryPagination,
+	"cached": CachedCountPagination,
+	"none": ProbePagination,
+}
+
+
+def paginate_query(
+	query: Query,
+	page: int | None = None,
+	per_page: int | None = None,
+	count: Literal["exact"] | Literal["cached"] | Literal["none"] = "exact",
+	max_per_page: int = MAX_PER_PAGE,
+) -> Pagination:
+	"""
+	Paginates a query by page number with the given count strategy.
+
+	`exact` counts the filtered query on every call, like `Query.paginate`. `cached` reuses
+	the count of an identical query until a Metadata, File, Tag or Attribute row is written.
+	`none` skips the count and probes one extra row to fill `has_next` instead.
+
+	Args:
+		query (Query): The ordered query to paginate.
+		page (int | None, optional): The page number. Defaults to None.
+		per_page (int | None, optional): The number of items per page. Defaults to None.
+		count (str, optional): The count strategy, one of `PAGINATIONS`. Defaults to "exact".
+		max_per_page (int, optional): The maximum number of items per page. Defaults to MAX_PER_PAGE.
+
+	Returns:
+		Pagination: The requested page.
+
+	Example:
+		```python
+		page = paginate_query(Tag.query, page=3, per_page=10, count="none")
+		```
+	"""
+
+	return PAGINATIONS[count](
+		query=query,
+		page=page,
+		per_page=per_page,
+		max_per_page=max_per_page,
+		error_out=True,
+		count=count != "none",
+	)
+
+
 def paginated_schema(schema: SQLAlchemyAutoSchemaMeta|Schema):
 	"""
 	Creates a pagination schema for the provided schema.
@@ -141,12 +472,16 @@ def paginated_schema(schema: SQLAlchemyAutoSchemaMeta|Schema):
 			page (Integer): The current page number.
 			per_page (Integer): The number of items per page.
 			items (Nested): The nested schema representing the items on the current page.
-			total (Integer): The total count of items.
+			total (Integer): The total count of items, null when it was not counted.
+			has_next (Boolean): Whether a next page exists.
+			next_cursor (String): The cursor of the next page, only present in cursor mode.
 		"""
 
 		page = fields.Integer()
 		per_page = fields.Integer()
 		items = fields.Nested(schema, many=True)
 		total = fields.Integer()
+		has_next = fields.Boolean()
+		next_cursor = fields.String()
 
 	return PaginationSchema()
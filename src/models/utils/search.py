@@ -12,17 +12,24 @@
 
 import re
 
-from flask_sqlalchemy.query import Query
+from sqlalchemy import case, literal, or_
 
+SEARCH_LIMIT = 100
 
-def search_query(model, model_attribute, search_str: str):
+
+def search_query(model, model_attribute, search_str: str, limit: int | None = SEARCH_LIMIT):
     """
     Searches for tags in the given model based on a search string.
 
+    The rows containing the whole search string or any of its words are read with a single
+    query, ranked by how many of these they contain, the best first.
+
     Args:
             model: The model to search in.
             model_attribute: The attribute of the model to search in.
             search_str (str): The search string.
+            limit (int | None, optional): The maximum number of rows returned, None for all of them.
+                    Defaults to SEARCH_LIMIT.
 
     Returns:
             list[model]: The list of tags matching the search criteria.
@@ -33,10 +40,36 @@ def search_query(model, model_attribute, search_str: str):
             ```
     """
 
-    tags: list[model] = model.query.filter(model_attribute.contains(search_str)).all()
+    return ranked_query(model, model_attribute, search_str, limit).all()
+
+
+def ranked_query(model, model_attribute, search_str: str, limit: int | None = SEARCH_LIMIT):
+    """
+    Makes the query of `search_query`, to be refined before it is run.
+
+    Args:
+            model: The model to search in.
+            model_attribute: The attribute of the model to search in.
+            search_str (str): The search string.
+            limit (int | None, optional): The maximum number of rows returned, None for all of them.
+                    Defaults to SEARCH_LIMIT.
+
+    Returns:
+            Query: The query of the matching rows, the best first.
+
+    Example:
+            ```python
+            ids = ranked_query(Metadata, Metadata.name, "cable").with_entities(Metadata.id)
+            ```
+    """
 
-    for word in search_str.split(" "):
-        query: list[Query] = model.query.filter(model_attribute.contains(word)).all()
-        tags.extend(q for q in query if q not in tags)
+    # * the whole string is a token too, duplicates would only count twice
+    tokens: list[str] = list(dict.fromkeys([search_str, *search_str.split(" ")]))
+    matches = [model_attribute.contains(token) for token in tokens]
+    matched_count = sum((case((match, 1), else_=0) for match in matches), start=literal(0))
 
-    return tags
+    return (
+        model.query.filter(or_(*matches))
+        .order_by(matched_count.desc(), model_attribute)
+        .limit(limit)
+    )
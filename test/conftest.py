@@ -0,0 +1,106 @@
+# SPDX-License-Identifier: MIT
+# --------------------------------------------------------------
+# |																|
+# |             Copyright 2023 - 2023, Amulya Paritosh			|
+# |																|
+# |  This file is part of Component Library Plugin for FreeCAD.	|
+# |																|
+# |               This file was created as a part of				|
+# |              Google Summer Of Code Program - 2023			|
+# |																|
+# --------------------------------------------------------------
+
+import os
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+# * the config is read on import: an in-memory database, searches without Elasticsearch
+os.environ["SQLALCHEMY_DATABASE_URI"] = "sqlite://"
+os.environ["SEARCH_BACKEND"] = "fts"
+os.environ["SEARCH_OUTBOX_WORKER"] = "0"
+
+from src import create_app  # noqa: E402
+from src.database import db  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def app():
+    return create_app()
+
+
+@pytest.fixture
+def database(app):
+    with app.app_context():
+        db.create_all()
+        yield db
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app, database):
+    return app.test_client()
+
+
+@pytest.fixture
+def statements(database):
+    """
+    Returns a context manager recording the SQL statements executed within it.
+    """
+
+    @contextmanager
+    def record():
+        executed: list[str] = []
+
+        def on_execute(conn, cursor, statement, parameters, context, executemany):
+            executed.append(statement)
+
+        event.listen(db.engine, "before_cursor_execute", on_execute)
+        try:
+            yield executed
+        finally:
+            event.remove(db.engine, "before_cursor_execute", on_execute)
+
+    return record
+
+
+@pytest.fixture
+def components(database):
+    """
+    Seeds components, each with two files, three tags and an attribute, and returns their
+    metadata.
+    """
+
+    from src.models.attributes import Attribute
+    from src.models.files import File, FileType
+    from src.models.licenses import SPDX
+    from src.models.metadatas import Metadata
+    from src.models.tags import Tag
+
+    def seed(count: int) -> list[Metadata]:
+        spdx = SPDX(fullname="MIT License", identifier="mit", license_page="https://x.org/mit")
+        tags = [Tag(label=f"tag{i}") for i in range(10)]
+        metadatas = [
+            Metadata(
+                name=f"component {i:04d}",
+                version="1",
+                maintainer="maintainer@example.com",
+                author="author@example.com",
+                rating=float(i % 5),
+                license=spdx,
+                tags=[tags[i % 10], tags[(i + 1) % 10], tags[(i + 2) % 10]],
+                files=[
+                    File(url=f"https://x.org/{i}.{ext}", type=FileType[ext], size=10)
+                    for ext in ("step", "stl")
+                ],
+                attributes=[Attribute(key="size", value=f"m{i % 8}")],
+            )
+            for i in range(count)
+        ]
+        db.session.add_all([spdx, *tags, *metadatas])
+        db.session.commit()
+        return metadatas
+
+    return seed
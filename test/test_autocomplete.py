@@ -0,0 +1,70 @@
+# SPDX-License-Identifier: MIT
+# --------------------------------------------------------------
+# |																|
+# |             Copyright 2023 - 2023, Amulya Paritosh			|
+# |																|
+# |  This file is part of Component Library Plugin for FreeCAD.	|
+# |																|
+# |               This file was created as a part of				|
+# |              Google Summer Of Code Program - 2023			|
+# |																|
+# --------------------------------------------------------------
+
+import pytest
+
+from src.database import db
+from src.models.autocomplete import autocomplete
+from src.models.autocomplete.index import AutocompleteIndex
+from src.models.metadatas import Metadata
+
+
+def completed_names(index: AutocompleteIndex, prefix: str) -> list[str]:
+    return [completion["value"] for completion in index.complete(prefix, kind="metadata")]
+
+
+@pytest.fixture
+def loaded(components):
+    metadatas = components(3)
+    autocomplete.reload()
+    return metadatas
+
+
+def test_a_name_stays_completed_while_a_component_has_it(loaded):
+    index = AutocompleteIndex()
+    index.reload()
+
+    # * the operations of a flush come in any order
+    index.apply([("add", "component 0001", 4.0), ("remove", "component 0001")], False)
+
+    assert completed_names(index, "component 0001") == ["component 0001"]
+
+
+def test_a_renamed_name_given_to_another_component_stays_completed(loaded):
+    renamed = loaded[1]
+    assert renamed.name == "component 0001"
+    renamed.name = "renamed"
+    db.session.add(
+        Metadata(
+            name="component 0001",
+            version="1",
+            maintainer="maintainer@example.com",
+            author="author@example.com",
+            license=renamed.license,
+        )
+    )
+    db.session.commit()
+
+    assert completed_names(autocomplete, "component 0001") == ["component 0001"]
+    assert completed_names(autocomplete, "renamed") == ["renamed"]
+
+
+def test_a_rated_component_is_not_counted_twice(loaded):
+    rated = loaded[2]
+    rated.rating = 4.5
+    db.session.commit()
+    assert completed_names(autocomplete, "component 0002") == ["component 0002"]
+
+    db.session.delete(rated)
+    db.session.commit()
+
+    assert completed_names(autocomplete, "component 0002") == []
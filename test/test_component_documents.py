@@ -0,0 +1,62 @@
+# SPDX-License-Identifier: MIT
+# --------------------------------------------------------------
+# |																|
+# |             Copyright 2023 - 2023, Amulya Paritosh			|
+# |																|
+# |  This file is part of Component Library Plugin for FreeCAD.	|
+# |																|
+# |               This file was created as a part of				|
+# |              Google Summer Of Code Program - 2023			|
+# |																|
+# --------------------------------------------------------------
+
+import pytest
+
+from src.database import db, outbox
+from src.database.outbox import OutboxEntry
+from src.models.components.documents import COMPONENTS_INDEX
+from src.models.tags import Tag
+
+
+@pytest.fixture
+def outbox_entries(monkeypatch):
+    monkeypatch.setattr(outbox, "enabled", True)
+
+    def documents(index: str) -> set[str]:
+        return {entry.doc_id for entry in OutboxEntry.query.filter(OutboxEntry.index == index)}
+
+    return documents
+
+
+def test_deleting_a_tag_syncs_its_components(components, outbox_entries):
+    metadatas = components(12)
+    tag = metadatas[0].tags[0]
+    tagged = {str(metadata.id) for metadata in metadatas if tag in metadata.tags}
+    OutboxEntry.query.delete()
+    db.session.commit()
+
+    db.session.delete(tag)
+    db.session.commit()
+
+    assert outbox_entries(COMPONENTS_INDEX) == tagged
+
+
+def test_renaming_a_tag_syncs_its_components(components, outbox_entries):
+    metadatas = components(12)
+    tag = metadatas[0].tags[0]
+    tagged = {str(metadata.id) for metadata in metadatas if tag in metadata.tags}
+    OutboxEntry.query.delete()
+    db.session.commit()
+
+    tag.label = "renamed"
+    db.session.commit()
+
+    assert outbox_entries(COMPONENTS_INDEX) == tagged
+
+
+def test_bulk_created_tags_are_collected_without_queries(database, statements, outbox_entries):
+    with statements() as executed:
+        Tag.bulk_create([{"label": f"tag{i}"} for i in range(50)])
+
+    assert len(executed) <= 2
+    assert outbox_entries(COMPONENTS_INDEX) == set()
@@ -0,0 +1,43 @@
+# SPDX-License-Identifier: MIT
+# --------------------------------------------------------------
+# |																|
+# |             Copyright 2023 - 2023, Amulya Paritosh			|
+# |																|
+# |  This file is part of Component Library Plugin for FreeCAD.	|
+# |																|
+# |               This file was created as a part of				|
+# |              Google Summer Of Code Program - 2023			|
+# |																|
+# --------------------------------------------------------------
+
+import pytest
+
+from src.database import db
+
+PAGE_SIZE = 50
+MAX_STATEMENTS = 5
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "page=1",
+        "page=2&sort_by=rating&sort_ord=desc",
+        "page=1&sort_by=created_at&file_types=step",
+    ],
+)
+def test_reading_a_page_of_components_takes_a_bounded_number_of_statements(
+    client, components, statements, query
+):
+    components(120)
+    # * nothing of the seeded components is left for the request to reuse
+    db.session.expunge_all()
+
+    with statements() as executed:
+        response = client.get(f"/api/component?{query}&page_size={PAGE_SIZE}")
+
+    assert response.status_code == 200
+    items = response.json["items"]
+    assert len(items) == PAGE_SIZE
+    assert all(item["tags"] and item["files"] and item["attributes"] for item in items)
+    assert len(executed) <= MAX_STATEMENTS
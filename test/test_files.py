@@ -0,0 +1,72 @@
+# SPDX-License-Identifier: MIT
+# --------------------------------------------------------------
+# |																|
+# |             Copyright 2023 - 2023, Amulya Paritosh			|
+# |																|
+# |  This file is part of Component Library Plugin for FreeCAD.	|
+# |																|
+# |               This file was created as a part of				|
+# |              Google Summer Of Code Program - 2023			|
+# |																|
+# --------------------------------------------------------------
+
+from io import BytesIO
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+
+from src.models.files import File
+
+
+@pytest.fixture
+def github():
+    def upload_new_file(repository, branch, raw_file_data, destination_file_path):
+        return SimpleNamespace(
+            path=destination_file_path,
+            sha="0" * 40,
+            download_url=f"https://github.test/{destination_file_path}",
+            size=len(raw_file_data),
+        )
+
+    with mock.patch("src.models.files.operations.get_repository") as repository, mock.patch(
+        "src.models.files.operations.upload_new_file", side_effect=upload_new_file
+    ) as upload:
+        yield SimpleNamespace(repository=repository.return_value, upload=upload)
+
+
+def upload(client, metadata_id, *filenames):
+    return client.post(
+        "/api/file/upload",
+        data={
+            "metadata_id": metadata_id.hex,
+            "repository": "library",
+            "branch": "main",
+            "component_files": [(BytesIO(b"solid"), filename) for filename in filenames],
+        },
+        content_type="multipart/form-data",
+    )
+
+
+def test_upload_of_an_existing_file_is_rejected(client, components, github):
+    metadata_id = components(1)[0].id
+
+    assert upload(client, metadata_id, "part.step").status_code == 201
+    response = upload(client, metadata_id, "part.step")
+
+    assert response.status_code == 406
+    assert File.query.filter(File.url.endswith("/part.step")).count() == 1
+    # * the second upload is undone, the file of the first one is kept
+    github.repository.delete_file.assert_called_once()
+    assert github.repository.delete_file.call_args.args[0].endswith("/part.step")
+
+
+def test_upload_of_an_unknown_file_type_is_rejected_before_uploading(client, components, github):
+    metadata = components(1)[0]
+
+    response = upload(client, metadata.id, "part.step", "notes.txt")
+
+    assert response.status_code == 406
+    assert b"Unknown file type txt" in response.data
+    github.upload.assert_not_called()
+    assert File.query.filter(File.metadata_id == metadata.id).count() == 2
@@ -0,0 +1,87 @@
+# SPDX-License-Identifier: MIT
+# --------------------------------------------------------------
+# |																|
+# |             Copyright 2023 - 2023, Amulya Paritosh			|
+# |																|
+# |  This file is part of Component Library Plugin for FreeCAD.	|
+# |																|
+# |               This file was created as a part of				|
+# |              Google Summer Of Code Program - 2023			|
+# |																|
+# --------------------------------------------------------------
+
+import pytest
+from sqlalchemy import select, text
+
+from src.database import create_missing_indexes, db
+from src.models.attributes import Attribute
+from src.models.components.query import ComponentQuerySpec
+from src.models.metadatas import Metadata
+from src.models.metadatas.models import metadata_tag
+
+
+def query_plan(statement) -> str:
+    compiled = statement.compile(db.engine, compile_kwargs={"literal_binds": True})
+    rows = db.session.execute(text(f"EXPLAIN QUERY PLAN {compiled}"))
+    return "\n".join(row.detail for row in rows)
+
+
+@pytest.fixture
+def indexed(components):
+    """
+    Seeds components in a database whose indexes were dropped, then created again by
+    `create_missing_indexes`.
+    """
+
+    components(100)
+    names = db.session.scalars(
+        text("SELECT name FROM sqlite_master WHERE type = 'index' AND name LIKE 'ix_%'")
+    ).all()
+    for name in names:
+        db.session.execute(text(f'DROP INDEX "{name}"'))
+    db.session.commit()
+
+    assert sorted(create_missing_indexes(db.engine)) == sorted(names)
+    assert create_missing_indexes(db.engine) == []
+    db.session.execute(text("ANALYZE"))
+
+
+@pytest.mark.parametrize(
+    "sort_by, index",
+    [
+        ("name", "ix_metadatas_name_id"),
+        ("rating", "ix_metadatas_rating_id"),
+        ("created_at", "ix_metadatas_created_at_id"),
+    ],
+)
+@pytest.mark.parametrize("sort_ord", ["asc", "desc"])
+def test_component_pages_are_read_in_index_order(indexed, sort_by, sort_ord, index):
+    spec = ComponentQuerySpec.make(sort_by=sort_by, sort_ord=sort_ord, keyset=True)
+
+    plan = query_plan(spec.ordered_query().limit(50).statement)
+
+    assert f"SCAN metadatas USING INDEX {index}" in plan
+    assert "TEMP B-TREE" not in plan
+
+
+def test_tag_and_file_type_filters_use_indexes(indexed):
+    values = {"tags": ["tag1", "tag2"], "file_types": ["step"]}
+    spec = ComponentQuerySpec.make(sort_by="rating", keyset=True, **values)
+
+    plan = query_plan(spec.ordered_query(**values).limit(50).statement)
+
+    assert "SCAN metadatas USING INDEX ix_metadatas_rating_id" in plan
+    assert "ix_metadata_tag_tag_id_metadata_id" in plan
+    assert "ix_files_metadata_id_type" in plan
+
+
+def test_relationships_of_a_page_are_loaded_through_indexes(indexed):
+    page = select(Metadata.id).where(Metadata.name == "component 0001")
+
+    tags_plan = query_plan(
+        select(metadata_tag.c.tag_id).where(metadata_tag.c.metadata_id.in_(page))
+    )
+    attributes_plan = query_plan(select(Attribute).where(Attribute.metadata_id.in_(page)))
+
+    assert "ix_metadata_tag_metadata_id_tag_id" in tags_plan
+    assert "ix_attributes_metadata_id" in attributes_plan
@@ -0,0 +1,51 @@
+# SPDX-License-Identifier: MIT
+# --------------------------------------------------------------
+# |																|
+# |             Copyright 2023 - 2023, Amulya Paritosh			|
+# |																|
+# |  This file is part of Component Library Plugin for FreeCAD.	|
+# |																|
+# |               This file was created as a part of				|
+# |              Google Summer Of Code Program - 2023			|
+# |																|
+# --------------------------------------------------------------
+
+from unittest import mock
+
+from sqlalchemy import inspect
+
+from src.cache import response_cache
+from src.database import OutboxIndexer, db, outbox, setup_outbox
+from src.database.outbox import OutboxEntry
+from src.models.components.operations import COMPONENT_TABLES, SEARCH_TABLES
+
+
+def test_setup_creates_the_outbox_of_an_existing_database(app, components, monkeypatch):
+    monkeypatch.setattr(outbox, "enabled", False)
+    monkeypatch.setitem(app.config, "SEARCH_BACKEND", "elasticsearch")
+    monkeypatch.setitem(app.config, "SEARCH_OUTBOX_WORKER", False)
+    OutboxEntry.__table__.drop(db.engine)
+
+    setup_outbox(app)
+
+    assert inspect(db.engine).has_table(OutboxEntry.__tablename__)
+    metadata = components(1)[0]
+    assert OutboxEntry.query.filter(OutboxEntry.doc_id == str(metadata.id)).count() > 0
+
+
+def test_draining_makes_cached_searches_stale(app, components, monkeypatch):
+    monkeypatch.setattr(outbox, "enabled", True)
+    monkeypatch.setattr(outbox, "indices", mock.MagicMock(**{"rebuilding.return_value": {}}))
+    monkeypatch.setattr(outbox, "es", mock.MagicMock())
+    monkeypatch.setattr(outbox.helpers, "bulk", lambda es, actions, **kwargs: (len(actions), []))
+    components(2)
+    search_key = response_cache.make_key("component", {"search_str": "cable"}, SEARCH_TABLES)
+    listing_key = response_cache.make_key("component", {}, COMPONENT_TABLES)
+
+    assert OutboxIndexer(app).drain() > 0
+
+    outbox.es.indices.refresh.assert_called_once()
+    assert response_cache.make_key("component", {"search_str": "cable"}, SEARCH_TABLES) != (
+        search_key
+    )
+    assert response_cache.make_key("component", {}, COMPONENT_TABLES) == listing_key
@@ -0,0 +1,80 @@
+# SPDX-License-Identifier: MIT
+# --------------------------------------------------------------
+# |																|
+# |             Copyright 2023 - 2023, Amulya Paritosh			|
+# |																|
+# |  This file is part of Component Library Plugin for FreeCAD.	|
+# |																|
+# |               This file was created as a part of				|
+# |              Google Summer Of Code Program - 2023			|
+# |																|
+# --------------------------------------------------------------
+
+from unittest import mock
+
+import pytest
+from elasticsearch import (
+    ApiError,
+    BadRequestError,
+    ConnectionError,
+    Elasticsearch,
+    NotFoundError,
+)
+
+from src.database.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    GuardedClient,
+    is_degraded,
+    is_search_unavailable,
+)
+from src.database.search_backends import ElasticsearchBackend
+from src.models.attributes import Attribute
+
+
+def test_calls_taking_a_name_go_through_the_guarded_client():
+    guarded = GuardedClient(Elasticsearch("http://localhost:9200"), CircuitBreaker(), deadline=1.0)
+
+    with mock.patch.object(Elasticsearch, "perform_request", return_value={}) as request:
+        guarded.indices.put_index_template(name="metadatas", index_patterns=["metadatas-*"])
+        guarded.indices.get_alias(name="metadatas")
+
+    paths = [call.args[1] for call in request.call_args_list]
+    assert paths == ["/_index_template/metadatas", "/_alias/metadatas"]
+    assert guarded._breaker.state == "closed"
+
+
+def test_searches_fall_back_to_sql_when_elasticsearch_is_unavailable(components):
+    metadatas = components(16)
+    expected = {str(metadata.id) for metadata in metadatas if metadata.attributes[0].value == "m3"}
+
+    with mock.patch.object(Attribute, "elasticsearch", side_effect=CircuitOpenError("open")):
+        found = ElasticsearchBackend().search(Attribute, "cable :m3")
+
+    assert found == expected
+    assert is_degraded()
+
+
+def test_searches_raise_the_errors_of_their_request(components):
+    components(2)
+    error = BadRequestError("parsing_exception", mock.Mock(status=400), {})
+
+    with mock.patch.object(Attribute, "elasticsearch", side_effect=error):
+        with pytest.raises(BadRequestError):
+            ElasticsearchBackend().search(Attribute, "cable :m3")
+
+    assert not is_degraded()
+
+
+@pytest.mark.parametrize(
+    "error, unavailable",
+    [
+        (CircuitOpenError("open"), True),
+        (ConnectionError("refused"), True),
+        (ApiError("too_many_requests", mock.Mock(status=429), {}), True),
+        (ApiError("unavailable", mock.Mock(status=503), {}), True),
+        (NotFoundError("index_not_found_exception", mock.Mock(status=404), {}), False),
+    ],
+)
+def test_only_unavailable_clusters_degrade_searches(error, unavailable):
+    assert is_search_unavailable(error) is unavailable
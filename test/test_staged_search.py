@@ -0,0 +1,60 @@
+# SPDX-License-Identifier: MIT
+# --------------------------------------------------------------
+# |																|
+# |             Copyright 2023 - 2023, Amulya Paritosh			|
+# |																|
+# |  This file is part of Component Library Plugin for FreeCAD.	|
+# |																|
+# |               This file was created as a part of				|
+# |              Google Summer Of Code Program - 2023			|
+# |																|
+# --------------------------------------------------------------
+
+from unittest import mock
+
+import pytest
+
+from src.database import StagedSearch
+from src.models.components import documents
+from src.models.components.operations import _search_components
+from src.models.metadatas import Metadata
+
+
+def response(metadatas) -> dict:
+    hits = [{"_id": str(metadata.id), "sort": [1.0, str(metadata.id)]} for metadata in metadatas]
+    return {"hits": {"hits": hits, "total": {"value": len(hits), "relation": "eq"}}}
+
+
+def test_an_exact_match_stops_the_search():
+    search = mock.Mock(return_value=[("1", 10.0)])
+
+    stage, hits = StagedSearch(min_hits=10).run(
+        "metadatas", Metadata.search_stages("cable tie"), search
+    )
+
+    assert stage.name == "exact"
+    assert hits == [("1", 10.0)]
+    search.assert_called_once()
+
+
+def test_a_stage_finding_too_few_hits_escalates():
+    search = mock.Mock(side_effect=[[], [("1", 3.0)], [("1", 3.0), ("2", 1.0)]])
+
+    stage, hits = StagedSearch(min_hits=10).run("metadatas", Metadata.search_stages("cab"), search)
+
+    assert stage.name == "fuzzy"
+    assert len(hits) == 2
+    assert search.call_count == 3
+
+
+@pytest.mark.parametrize("cursor", [None, ""])
+def test_components_found_by_the_exact_stage_take_one_search(components, cursor):
+    metadata = components(3)[1]
+
+    with mock.patch.object(documents.es, "search", return_value=response([metadata])) as search:
+        paginated, _ = _search_components(
+            metadata.name, "relevance", "desc", None, None, None, 1, 20, cursor, []
+        )
+
+    search.assert_called_once()
+    assert [item.id for item in paginated.items] == [metadata.id]